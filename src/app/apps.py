@@ -1,4 +1,7 @@
+from unittest.mock import MagicMock
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AppConfig(AppConfig):
@@ -10,3 +13,9 @@ class AppConfig(AppConfig):
     def ready(self):
         """Import signals when the app is ready."""
         import app.signals  # noqa: F401, PLC0415
+
+        # Disable the prefetch_search task when testing
+        if settings.TESTING:
+            from app.tasks import prefetch_search  # noqa: PLC0415
+
+            prefetch_search.delay = MagicMock()
@@ -7,16 +7,23 @@ from app.templatetags import app_tags
 
 
 def process_history_entries(history_records, media_type, media_entry_number):
-    """Process all history records into timeline entries."""
+    """Process all history records into timeline entries.
+
+    The records are ordered from the newest, so each one is compared with the
+    next one instead of querying its prev_record.
+    """
+    history_records = list(history_records)
     timeline_entries = []
-    last = history_records.first()
 
-    for _ in range(history_records.count()):
-        entry = process_history_entry((last, last.prev_record), media_type)
+    for new_record, old_record in zip(
+        history_records,
+        [*history_records[1:], None],
+        strict=True,
+    ):
+        entry = process_history_entry((new_record, old_record), media_type)
         if entry["changes"]:
             entry["media_entry_number"] = media_entry_number
             timeline_entries.append(entry)
-        last = last.prev_record
 
     return timeline_entries
 
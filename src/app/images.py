@@ -0,0 +1,136 @@
+import io
+import logging
+import tempfile
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import requests
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes of the stored thumbnails, the aspect ratio is kept
+IMAGE_SIZES = {
+    "grid": (300, 450),
+    "detail": (600, 900),
+}
+IMAGE_FORMAT = "webp"
+IMAGE_QUALITY = 80
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Only the images of the providers' CDNs are proxied, other URLs like the ones
+# of manual items are loaded by the browser so the server never fetches them
+IMAGE_HOSTS = frozenset(
+    {
+        "assets.hardcover.app",
+        "cdn.mangaupdates.com",
+        "cdn.myanimelist.net",
+        "comicvine.gamespot.com",
+        "covers.openlibrary.org",
+        "image.tmdb.org",
+        "images.igdb.com",
+        "media.kitsu.app",
+        "media.kitsu.io",
+        "media.steampowered.com",
+        "media.themoviedb.org",
+        "s4.anilist.co",
+        "static.tvmaze.com",
+    },
+)
+
+
+def get_image_name(url):
+    """Return the file name of the cached image of the URL.
+
+    The name is a keyed hash of the source URL, so it can be computed when
+    rendering without a lookup and only URLs from our pages can be proxied.
+    """
+    digest = salted_hmac("image_proxy", url, algorithm="sha256").hexdigest()
+    return f"{digest[:40]}.{IMAGE_FORMAT}"
+
+
+def get_image_path(size, name):
+    """Return the path on disk of a cached image."""
+    return Path(settings.IMAGE_CACHE_ROOT) / size / name
+
+
+def is_proxied(url):
+    """Return whether the URL is an image of a provider's CDN."""
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and parts.hostname in IMAGE_HOSTS
+
+
+def get_proxy_url(url, size):
+    """Return the local URL of the image, served from disk once generated."""
+    if not settings.IMAGE_PROXY or not url or not is_proxied(url):
+        return url
+
+    path = reverse("image_proxy", args=[size, get_image_name(url)])
+    return f"{path}?url={quote(url, safe='')}"
+
+
+def fetch_image(url):
+    """Download the original image from the provider's CDN."""
+    response = requests.get(
+        url,
+        timeout=settings.REQUEST_TIMEOUT,
+        stream=True,
+    )
+    response.raise_for_status()
+
+    content = response.raw.read(MAX_IMAGE_BYTES + 1, decode_content=True)
+    if len(content) > MAX_IMAGE_BYTES:
+        msg = f"Image larger than {MAX_IMAGE_BYTES} bytes"
+        raise ValueError(msg)
+    return content
+
+
+def create_thumbnail(content, size):
+    """Return the image resized to fit the size, encoded for the web."""
+    with Image.open(io.BytesIO(content)) as original:
+        original.draft("RGB", IMAGE_SIZES[size])  # faster decoding of large JPEGs
+        image = original
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        image.thumbnail(IMAGE_SIZES[size], Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, IMAGE_FORMAT, quality=IMAGE_QUALITY, method=4)
+        return buffer.getvalue()
+
+
+def store_image(path, data):
+    """Write the image atomically, so a partial file is never served."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as temp_file:
+        temp_file.write(data)
+    temp_path = Path(temp_file.name)
+    temp_path.chmod(0o644)
+    temp_path.replace(path)
+
+
+def get_cached_image(url, size):
+    """Return the path of the thumbnail of the URL, generating it if needed."""
+    path = get_image_path(size, get_image_name(url))
+
+    if not path.exists():
+        content = fetch_image(url)
+        try:
+            data = create_thumbnail(content, size)
+        except (
+            Image.DecompressionBombError,
+            UnidentifiedImageError,
+            OSError,
+            SyntaxError,
+            EOFError,
+            ValueError,
+        ) as error:
+            msg = f"Couldn't process image {url}"
+            raise ValueError(msg) from error
+        store_image(path, data)
+        logger.debug("Stored %s thumbnail of %s", size, url)
+
+    return path
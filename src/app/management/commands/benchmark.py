@@ -0,0 +1,178 @@
+import json
+import logging
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """Time the slowest code paths on a large synthetic library."""
+
+    help = (
+        "Generate a synthetic library in a test database and time the startup, "
+        "media lists, calendar, statistics, notifications, export and imports. "
+        "Fails when a benchmark is slower than the baseline by more than the "
+        "threshold."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark options."""
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Size of the library, 1 is 5k shows, 100k episodes and 2k movies.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1,
+            help="Number of users tracking the library.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs of each benchmark, the fastest one is kept.",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Run only the named benchmark, can be repeated.",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            help="Results of a previous run to compare with.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed slowdown over the baseline, 0.2 is 20%%.",
+        )
+        parser.add_argument(
+            "--save",
+            type=Path,
+            help="File where the results are saved, to be used as a baseline.",
+        )
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Delete a leftover benchmark database without asking.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ARG002
+        """Run the benchmarks and compare them with the baseline."""
+        # the synthetic library and provider stubs aren't part of the app,
+        # they're only in a source checkout
+        try:
+            from benchmarks import suite  # noqa: PLC0415
+        except ImportError as error:
+            msg = "The benchmarks are only available in a source checkout."
+            raise CommandError(msg) from error
+
+        baseline = self.load_baseline(options)
+
+        connection = connections[DEFAULT_DB_ALIAS]
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=not options["interactive"],
+        )
+        # the logs of the imports would be included in their durations
+        logging.disable(logging.INFO)
+        try:
+            results = self.run_benchmarks(suite, options)
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["save"]:
+            options["save"].write_text(
+                json.dumps(
+                    {
+                        "scale": options["scale"],
+                        "users": options["users"],
+                        "results": results,
+                    },
+                    indent=2,
+                ),
+            )
+            self.stdout.write(f"Results saved to {options['save']}")
+
+        self.report(results, baseline)
+
+        regressions = suite.find_regressions(
+            results,
+            baseline,
+            options["threshold"],
+        )
+        if regressions:
+            names = ", ".join(sorted(regressions))
+            msg = f"Benchmarks slower than the baseline: {names}"
+            raise CommandError(msg)
+
+    def load_baseline(self, options):
+        """Return the baseline durations, checking they're for the same library."""
+        if not options["baseline"]:
+            return {}
+
+        try:
+            baseline = json.loads(options["baseline"].read_text())
+        except (OSError, ValueError) as error:
+            msg = f"Invalid baseline {options['baseline']}: {error}"
+            raise CommandError(msg) from error
+
+        if (baseline["scale"], baseline["users"]) != (
+            options["scale"],
+            options["users"],
+        ):
+            msg = (
+                f"The baseline is for scale {baseline['scale']} with "
+                f"{baseline['users']} users, run with the same options."
+            )
+            raise CommandError(msg)
+        return baseline["results"]
+
+    def run_benchmarks(self, suite, options):
+        """Generate the library and time the benchmarks."""
+        with suite.stub_providers():
+            self.stdout.write("Generating the library...")
+            users = suite.generate_library(options["scale"], options["users"])
+            benchmarks = suite.get_benchmarks(users[0])
+
+            unknown = set(options["only"] or []) - benchmarks.keys()
+            if unknown:
+                msg = f"Unknown benchmarks: {', '.join(sorted(unknown))}"
+                raise CommandError(msg)
+
+            results = {}
+            for name, (func, setup) in benchmarks.items():
+                if options["only"] and name not in options["only"]:
+                    continue
+                results[name] = suite.run_benchmark(
+                    func,
+                    setup,
+                    options["repeat"],
+                )
+                self.stdout.write(f"{name:<20} {results[name] * 1000:>10.1f} ms")
+        return results
+
+    def report(self, results, baseline):
+        """Write the change of each benchmark compared with the baseline."""
+        if not baseline:
+            return
+
+        self.stdout.write("\nCompared with the baseline:")
+        for name, duration in results.items():
+            if name not in baseline:
+                continue
+            change = (duration / baseline[name] - 1) * 100
+            self.stdout.write(
+                f"{name:<20} {baseline[name] * 1000:>10.1f} ms -> "
+                f"{duration * 1000:>10.1f} ms ({change:+.1f}%)",
+            )
@@ -0,0 +1,217 @@
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Prometheus counters, aggregated in Redis across web and worker processes
+PROMETHEUS_KEY = "metrics"
+
+current_metrics = ContextVar("current_metrics", default=None)
+# Provider API calls made in this context, even without a collection in progress
+provider_calls = ContextVar("provider_calls", default=0)
+
+
+class Metrics:
+    """Database, Redis and provider usage of a request or a task."""
+
+    def __init__(self):
+        """Start with empty counters."""
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.redis_commands = 0
+        self.redis_time = 0.0
+        self.provider_calls = 0
+        self.providers = defaultdict(Counter)
+
+
+def record_query(execute, sql, params, many, context):
+    """Time a database query, installed on every connection when it's created.
+
+    The metrics are looked up for every query, so the queries of async views
+    run in sync_to_async threads are also counted.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+@contextmanager
+def collect():
+    """Collect the metrics of the code run inside the block."""
+    metrics = Metrics()
+    token = current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current_metrics.reset(token)
+
+
+@contextmanager
+def provider_call(provider):
+    """Time a request made to a provider's API."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        provider_calls.set(provider_calls.get() + 1)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.provider_calls += 1
+            metrics.providers[provider]["calls"] += 1
+            metrics.providers[provider]["time"] += time.perf_counter() - start
+
+
+@contextmanager
+def provider_lookup(provider):
+    """Count a lookup as a cache hit when it didn't call the provider's API.
+
+    The yielded lookup tells afterwards whether the result was fetched.
+    """
+    lookup = SimpleNamespace(fetched=False)
+    calls = provider_calls.get()
+    yield lookup
+    lookup.fetched = provider_calls.get() > calls
+
+    metrics = current_metrics.get()
+    if metrics is not None:
+        result = "misses" if lookup.fetched else "hits"
+        metrics.providers[provider][result] += 1
+
+
+class TimedConnectionMixin:
+    """Redis connection that records the time spent on commands."""
+
+    def send_packed_command(self, command, check_health=True):  # noqa: FBT002
+        """Send the command, timing it."""
+        start = time.perf_counter()
+        try:
+            return super().send_packed_command(command, check_health)
+        finally:
+            record_redis(time.perf_counter() - start)
+
+    def read_response(self, *args, **kwargs):
+        """Read the reply of a command, timing it."""
+        start = time.perf_counter()
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            record_redis(time.perf_counter() - start, commands=1)
+
+
+def record_redis(duration, commands=0):
+    """Add the Redis time to the current metrics."""
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.redis_commands += commands
+        metrics.redis_time += duration
+
+
+def instrument_redis_pool(pool):
+    """Make the connections of a Redis pool record their time."""
+    connection_class = pool.connection_class
+    if not issubclass(connection_class, TimedConnectionMixin):
+        pool.connection_class = type(
+            f"Timed{connection_class.__name__}",
+            (TimedConnectionMixin, connection_class),
+            {},
+        )
+    return pool
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """Cache client whose Redis time is included in the metrics."""
+
+    def connect(self, index=0):
+        """Return a Redis client with timed connections."""
+        client = super().connect(index)
+        instrument_redis_pool(client.connection_pool)
+        return client
+
+
+def server_timing(metrics, duration):
+    """Return the Server-Timing header value of the collected metrics."""
+    entries = [
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_queries} queries"',
+        (
+            f"redis;dur={metrics.redis_time * 1000:.1f};"
+            f'desc="{metrics.redis_commands} commands"'
+        ),
+    ]
+    for provider, stats in sorted(metrics.providers.items()):
+        entries.append(
+            f"{provider};dur={stats['time'] * 1000:.1f};"
+            f'desc="{stats["calls"]} calls, {stats["hits"]} hits, '
+            f'{stats["misses"]} misses"',
+        )
+    entries.append(f"total;dur={duration * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def export(kind, name, metrics, duration):
+    """Add the metrics of a request or a task to the Prometheus counters."""
+    if not settings.PROMETHEUS_METRICS:
+        return
+
+    labels = f'kind="{kind}",name="{escape_label(name)}"'
+    counters = {
+        f"yamtrack_runs_total{{{labels}}}": 1,
+        f"yamtrack_duration_seconds_total{{{labels}}}": duration,
+        f"yamtrack_db_queries_total{{{labels}}}": metrics.db_queries,
+        f"yamtrack_db_seconds_total{{{labels}}}": metrics.db_time,
+        f"yamtrack_redis_commands_total{{{labels}}}": metrics.redis_commands,
+        f"yamtrack_redis_seconds_total{{{labels}}}": metrics.redis_time,
+    }
+    for provider, stats in metrics.providers.items():
+        labels = f'provider="{escape_label(provider)}"'
+        counters[f"yamtrack_provider_calls_total{{{labels}}}"] = stats["calls"]
+        counters[f"yamtrack_provider_seconds_total{{{labels}}}"] = stats["time"]
+        counters[f"yamtrack_provider_cache_hits_total{{{labels}}}"] = stats["hits"]
+        counters[f"yamtrack_provider_cache_misses_total{{{labels}}}"] = stats["misses"]
+
+    try:
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        for counter, value in counters.items():
+            if value:
+                pipeline.hincrbyfloat(PROMETHEUS_KEY, counter, value)
+        pipeline.execute()
+    except RedisError:
+        logger.exception("Failed to export the metrics of %s %s", kind, name)
+
+
+def render_prometheus():
+    """Return the counters in the Prometheus text exposition format."""
+    counters = get_redis_connection("default").hgetall(PROMETHEUS_KEY)
+
+    samples = defaultdict(list)
+    for counter, value in counters.items():
+        counter_name = counter.decode()
+        samples[counter_name.partition("{")[0]].append(
+            f"{counter_name} {value.decode()}",
+        )
+
+    lines = []
+    for metric, metric_samples in sorted(samples.items()):
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(sorted(metric_samples))
+    return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,18 +1,66 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.shortcuts import render
+from django.utils.deprecation import MiddlewareMixin
 
+from app import metrics
 from app.providers import services
 
 
-class ProviderAPIErrorMiddleware:
-    """Middleware to handle ProviderAPIError exceptions."""
+class MetricsMiddleware:
+    """Middleware to measure the database, Redis and provider time of requests."""
+
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         """Initialize the middleware with the get_response callable."""
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        """Process the request and handle exceptions."""
-        return self.get_response(request)
+        """Process the request and add its timings to the response."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with metrics.collect() as collected:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(collected, duration)
+        metrics.export("request", self.get_view_name(request), collected, duration)
+        return response
+
+    async def __acall__(self, request):
+        """Process the request of an async view and add its timings."""
+        start = time.perf_counter()
+        with metrics.collect() as collected:
+            response = await self.get_response(request)
+        duration = time.perf_counter() - start
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(collected, duration)
+        await sync_to_async(metrics.export, thread_sensitive=False)(
+            "request",
+            self.get_view_name(request),
+            collected,
+            duration,
+        )
+        return response
+
+    def get_view_name(self, request):
+        """Return the name of the view that served the request."""
+        resolver_match = request.resolver_match
+        return resolver_match.view_name if resolver_match else "unmatched"
+
+
+class ProviderAPIErrorMiddleware(MiddlewareMixin):
+    """Middleware to handle ProviderAPIError exceptions."""
 
     def process_exception(self, request, exception):
         """Handle exceptions raised during request processing."""
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from app import search
+
+# Same expression as the icontains lookup, so the planner can use the index
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS app_item_title_trgm
+    ON app_item USING gin (UPPER(title::text) gin_trgm_ops)
+    """,
+]
+
+SQLITE_BACKWARD = [
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in search.SQLITE_FTS_TRIGGERS),
+    f"DROP TABLE IF EXISTS {search.SQLITE_FTS_TABLE}",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+    elif search.has_sqlite_fts(connection):
+        search.sync_sqlite_fts(connection)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS app_item_title_trgm")
+    elif search.has_sqlite_fts(connection):
+        for statement in SQLITE_BACKWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0051_migrate_simkl_periodoc_tasks'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, reverse_code=drop_search_index),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.2 on 2026-10-18 22:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0052_item_title_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_anime_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_anime_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='basicmedia',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_basicmedia_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='basicmedia',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_basicmedia_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_book_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_book_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comic',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_comic_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comic',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_comic_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_game_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_game_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalanime',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_4309ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalbasicmedia',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_b7f1ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalbook',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_88beb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalcomic',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_210ac9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalepisode',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_b8bdde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalgame',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_dd7984_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalmanga',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_698878_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalmovie',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_8008e5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalseason',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_2384ad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaltv',
+            index=models.Index(fields=['history_user', 'history_date'], name='app_histori_history_fa4279_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_manga_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_manga_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_movie_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['user', 'item', '-created_at'], name='app_movie_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='season',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_season_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tv',
+            index=models.Index(fields=['user', 'status', 'item'], name='app_tv_status_idx'),
+        ),
+    ]
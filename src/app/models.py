@@ -31,6 +31,7 @@ import events
 import users
 from app import providers
 from app.mixins import CalendarTriggerMixin
+from app.search import title_contains
 
 logger = logging.getLogger(__name__)
 
@@ -187,39 +188,12 @@ class Item(CalendarTriggerMixin, models.Model):
         if self._disable_calendar_triggers:
             return
 
-        if self.media_type == MediaTypes.SEASON.value:
-            # Get or create the TV item for this season
-            try:
-                tv_item = Item.objects.get(
-                    media_id=self.media_id,
-                    source=self.source,
-                    media_type=MediaTypes.TV.value,
-                )
-            except Item.DoesNotExist:
-                # Get metadata for the TV show
-                tv_metadata = providers.services.get_media_metadata(
-                    MediaTypes.TV.value,
-                    self.media_id,
-                    self.source,
-                )
-                tv_item = Item.objects.create(
-                    media_id=self.media_id,
-                    source=self.source,
-                    media_type=MediaTypes.TV.value,
-                    title=tv_metadata["title"],
-                    image=tv_metadata["image"],
-                )
-                logger.info("Created TV item %s for season %s", tv_item, self)
-
-            # Process the TV item instead of the season
-            items_to_process = [tv_item]
-        else:
-            items_to_process = [self]
-
         if delay:
-            events.tasks.reload_calendar.delay(items_to_process=items_to_process)
+            events.calendar.queue_release_refresh(self)
         else:
-            events.tasks.reload_calendar(items_to_process=items_to_process)
+            events.tasks.reload_calendar(
+                items_to_process=events.calendar.get_release_items([self]),
+            )
 
 
 class MediaManager(models.Manager):
@@ -238,7 +212,7 @@ class MediaManager(models.Manager):
             queryset = queryset.filter(status=status_filter)
 
         if search:
-            queryset = queryset.filter(item__title__icontains=search)
+            queryset = queryset.filter(title_contains(search, "item__title"))
 
         queryset = queryset.annotate(
             repeats=Window(
@@ -721,6 +695,19 @@ class MediaManager(models.Manager):
         return params
 
 
+class UserHistoricalRecords(HistoricalRecords):
+    """Historical records indexed for the scans of a user's history by date."""
+
+    def get_meta_options(self, model):
+        """Add the index on the user and date of the records."""
+        meta_fields = super().get_meta_options(model)
+        meta_fields["indexes"] = [
+            *meta_fields.get("indexes", ()),
+            models.Index(fields=["history_user", "history_date"]),
+        ]
+        return meta_fields
+
+
 class Status(models.TextChoices):
     """Choices for item status."""
 
@@ -734,7 +721,7 @@ class Status(models.TextChoices):
 class Media(models.Model):
     """Abstract model for all media types."""
 
-    history = HistoricalRecords(
+    history = UserHistoricalRecords(
         cascade_delete_history=True,
         inherit=True,
         excluded_fields=[
@@ -776,6 +763,18 @@ class Media(models.Model):
 
         abstract = True
         ordering = ["user", "item", "-created_at"]
+        indexes = [
+            # media lists and in progress media, filtered by status
+            models.Index(
+                fields=["user", "status", "item"],
+                name="%(app_label)s_%(class)s_status_idx",
+            ),
+            # latest entry of each media, for repeated media
+            models.Index(
+                fields=["user", "item", "-created_at"],
+                name="%(app_label)s_%(class)s_latest_idx",
+            ),
+        ]
 
     def __str__(self):
         """Return the title of the media."""
@@ -875,6 +874,12 @@ class TV(Media):
                 name="%(app_label)s_%(class)s_unique_item_user",
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "status", "item"],
+                name="%(app_label)s_%(class)s_status_idx",
+            ),
+        ]
 
     @tracker  # postpone field reset until after the save
     def save(self, *args, **kwargs):
@@ -1127,6 +1132,12 @@ class Season(Media):
                 name="%(app_label)s_season_unique_tv_item",
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "status", "item"],
+                name="%(app_label)s_%(class)s_status_idx",
+            ),
+        ]
 
     def __str__(self):
         """Return the title of the media and season number."""
@@ -1255,10 +1266,8 @@ class Season(Media):
             # start watching from the first episode
             next_episode_number = episodes[0]["episode_number"]
         else:
-            next_episode_number = providers.tmdb.find_next_episode(
-                self.progress,
-                episodes,
-            )
+            tmdb = providers.services.get_provider("tmdb")
+            next_episode_number = tmdb.find_next_episode(self.progress, episodes)
 
         now = timezone.now().replace(second=0, microsecond=0)
 
@@ -1375,27 +1384,59 @@ class Season(Media):
         if latest_watched_ep_num is None:
             latest_watched_ep_num = 0
 
-        episodes_to_create = []
-        now = timezone.now().replace(second=0, microsecond=0)
-
-        # Create Episode objects for the remaining episodes
+        remaining_numbers = []
         for episode in reversed(season_metadata["episodes"]):
             if episode["episode_number"] <= latest_watched_ep_num:
                 break
+            remaining_numbers.append(episode["episode_number"])
 
-            item = self.get_episode_item(episode["episode_number"], season_metadata)
+        items = self.get_episode_items(remaining_numbers, season_metadata)
+        now = timezone.now().replace(second=0, microsecond=0)
 
-            episode_db = Episode(
+        # Create Episode objects for the remaining episodes
+        return [
+            Episode(
                 related_season=self,
-                item=item,
+                item=items[episode_number],
                 end_date=now,
             )
-            episodes_to_create.append(episode_db)
-
-        return episodes_to_create
+            for episode_number in remaining_numbers
+        ]
 
     def get_episode_item(self, episode_number, season_metadata=None):
         """Get the episode item instance, create it if it doesn't exist."""
+        episode_number = int(episode_number)
+        return self.get_episode_items([episode_number], season_metadata)[
+            episode_number
+        ]
+
+    def get_episode_items(self, episode_numbers, season_metadata=None):
+        """Return the episode items by number, creating the missing ones.
+
+        The existing items are fetched in one query and the missing ones are
+        bulk created, instead of a get_or_create for each episode.
+        """
+        episode_numbers = {int(episode_number) for episode_number in episode_numbers}
+        if not episode_numbers:
+            return {}
+
+        episode_filter = {
+            "media_id": self.item.media_id,
+            "source": self.item.source,
+            "media_type": MediaTypes.EPISODE.value,
+            "season_number": self.item.season_number,
+        }
+        items = {
+            item.episode_number: item
+            for item in Item.objects.filter(
+                **episode_filter,
+                episode_number__in=episode_numbers,
+            )
+        }
+        missing = episode_numbers - items.keys()
+        if not missing:
+            return items
+
         if not season_metadata:
             season_metadata = providers.services.get_media_metadata(
                 MediaTypes.SEASON.value,
@@ -1403,40 +1444,48 @@ class Season(Media):
                 self.item.source,
                 [self.item.season_number],
             )
+        episodes_metadata = {
+            episode["episode_number"]: episode
+            for episode in season_metadata["episodes"]
+        }
 
-        image = settings.IMG_NONE
-        for episode in season_metadata["episodes"]:
-            if episode["episode_number"] == int(episode_number):
-                if episode.get("still_path"):
-                    image = (
-                        f"https://image.tmdb.org/t/p/original{episode['still_path']}"
-                    )
-                elif "image" in episode:
-                    # for manual seasons
-                    image = episode["image"]
-                else:
-                    image = settings.IMG_NONE
-                break
-
-        item, _ = Item.objects.get_or_create(
-            media_id=self.item.media_id,
-            source=self.item.source,
-            media_type=MediaTypes.EPISODE.value,
-            season_number=self.item.season_number,
-            episode_number=episode_number,
-            defaults={
-                "title": self.item.title,
-                "image": image,
-            },
+        Item.objects.bulk_create(
+            [
+                Item(
+                    **episode_filter,
+                    episode_number=episode_number,
+                    title=self.item.title,
+                    image=get_episode_image(episodes_metadata.get(episode_number)),
+                )
+                for episode_number in sorted(missing)
+            ],
+            # items created by a concurrent request are fetched below
+            ignore_conflicts=True,
         )
+        items.update(
+            (item.episode_number, item)
+            for item in Item.objects.filter(
+                **episode_filter,
+                episode_number__in=missing,
+            )
+        )
+        return items
+
 
-        return item
+def get_episode_image(episode):
+    """Return the image of an episode from its season metadata."""
+    if episode is None:
+        return settings.IMG_NONE
+    if episode.get("still_path"):
+        return f"https://image.tmdb.org/t/p/original{episode['still_path']}"
+    # for manual seasons
+    return episode.get("image", settings.IMG_NONE)
 
 
 class Episode(models.Model):
     """Model for episodes of a season."""
 
-    history = HistoricalRecords(
+    history = UserHistoricalRecords(
         cascade_delete_history=True,
         excluded_fields=["item", "related_season", "created_at"],
     )
@@ -77,6 +77,7 @@ def search(query, page):
                 "media_type": MediaTypes.BOOK.value,
                 "title": hit["document"]["title"],
                 "image": get_image_url(hit["document"]),
+                "year": hit["document"].get("release_year"),
             }
             for hit in hits
         ]
@@ -1,76 +1,426 @@
+import functools
+import importlib
+import json
 import logging
+import math
+import re
+import secrets
+import threading
 import time
 
 import requests
+from asgiref.sync import sync_to_async
+from celery import current_task
 from django.conf import settings
+from django.core.cache import cache
 from pyrate_limiter import RedisBucket
-from redis import ConnectionPool
+from redis import ConnectionPool, Redis
 from requests.adapters import HTTPAdapter
 from requests_ratelimiter import LimiterAdapter, LimiterSession
 
+from app import media_type_config, metrics
 from app.models import MediaTypes, Sources
-from app.providers import (
-    comicvine,
-    hardcover,
-    igdb,
-    mal,
-    mangaupdates,
-    manual,
-    openlibrary,
-    tmdb,
-)
 
 logger = logging.getLogger(__name__)
 
+# Imported on first use, most processes only call a few of the providers
+PROVIDER_MODULES = (
+    "comicvine",
+    "hardcover",
+    "igdb",
+    "mal",
+    "mangaupdates",
+    "manual",
+    "openlibrary",
+    "tmdb",
+)
+
+
+def get_provider(name):
+    """Return the module of a provider, importing it on first use."""
+    if name not in PROVIDER_MODULES:
+        msg = f"Unknown provider: {name}"
+        raise ValueError(msg)
+    return importlib.import_module(f"app.providers.{name}")
 
-def get_redis_connection():
-    """Return a Redis connection pool."""
+
+@functools.cache
+def get_redis_pool():
+    """Return the Redis connection pool of the providers, created on first use."""
     if settings.TESTING:
         import fakeredis  # noqa: PLC0415
 
-        return fakeredis.FakeStrictRedis().connection_pool
-    return ConnectionPool.from_url(settings.REDIS_URL)
+        pool = fakeredis.FakeStrictRedis().connection_pool
+    else:
+        pool = ConnectionPool.from_url(settings.REDIS_URL)
+    return metrics.instrument_redis_pool(pool)
 
 
-redis_pool = get_redis_connection()
+# Hosts with a lower rate limit than the default one
+PROVIDER_RATE_LIMITS = {
+    "https://api.myanimelist.net/v2": {"per_minute": 30},
+    "https://graphql.anilist.co": {"per_minute": 85},
+    "https://api.igdb.com/v4": {"per_second": 3},
+    "https://api.tvmaze.com": {"per_second": 2},
+    "https://api.hardcover.app/v1/graphql": {"per_minute": 55},
+}
 
-session = LimiterSession(
-    per_second=5,
-    bucket_class=RedisBucket,
-    bucket_kwargs={"redis_pool": redis_pool, "bucket_name": "api"},
-)
 
-session.mount("http://", HTTPAdapter(max_retries=3))
-session.mount("https://", HTTPAdapter(max_retries=3))
+def create_session():
+    """Return an HTTP session rate limited through Redis.
+
+    The limits are kept in Redis, so they are shared by the threads and
+    processes of the web server and the workers.
+    """
+    new_session = LimiterSession(
+        per_second=5,
+        bucket_class=RedisBucket,
+        bucket_kwargs={"redis_pool": get_redis_pool(), "bucket_name": "api"},
+    )
+
+    new_session.mount("http://", HTTPAdapter(max_retries=3))
+    new_session.mount("https://", HTTPAdapter(max_retries=3))
+
+    for prefix, limits in PROVIDER_RATE_LIMITS.items():
+        new_session.mount(
+            prefix,
+            LimiterAdapter(
+                **limits,
+                bucket_class=RedisBucket,
+                bucket_kwargs={
+                    "redis_pool": get_redis_pool(),
+                    "bucket_name": "api_host",
+                },
+            ),
+        )
+
+    return new_session
+
+
+class ThreadLocalSession(threading.local):
+    """HTTP session of the current thread.
+
+    Sessions are not thread safe, each thread of the web server or of an
+    import gets its own one when it first makes a request.
+    """
+
+    @functools.cached_property
+    def session(self):
+        """Return the session of the thread, created on first use."""
+        return create_session()
+
+    def get(self, *args, **kwargs):
+        """Send a GET request."""
+        return self.session.get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        """Send a POST request."""
+        return self.session.post(*args, **kwargs)
+
+
+session = ThreadLocalSession()
+
+# Providers with a low budget, shared by all processes through Redis
+PROVIDER_QUOTAS = {
+    Sources.COMICVINE.value: (190, 60 * 60),  # requests, seconds
+    Sources.OPENLIBRARY.value: (20, 60),
+}
+
+STALE_METADATA_TIMEOUT = 60 * 60 * 24 * 7  # 7 days
+
+# How long a source of a federated search page keeps the works it answered first
+FEDERATED_CLAIM_TIMEOUT = 60
+
+
+def is_background_request():
+    """Return whether the request is made by a task running in a Celery worker."""
+    return bool(current_task) and not (
+        current_task.request.called_directly or current_task.request.is_eager
+    )
+
+
+class QuotaScheduler:
+    """Share the request budget of low quota providers between priorities.
+
+    Requests are logged per provider in Redis sorted sets and counted over a
+    sliding window, so a burst at the end of a period can't be followed by a
+    full budget right after it. Interactive requests can use the whole budget
+    and fail fast once it's spent. Background requests can only use a share of
+    it and are spaced evenly, waiting for their next slot, so page loads are
+    never starved. Waits longer than `max_wait` fail instead of blocking the
+    worker, so the task can be rescheduled for when the budget is available
+    again.
+    """
+
+    background_share = 0.8
+    max_wait = 60  # seconds
+
+    def __init__(self, redis, quotas):
+        """Initialize the scheduler with the budget of each provider.
+
+        Without a Redis client, the one of the providers is used.
+        """
+        self.quotas = quotas
+        if redis is not None:
+            self.redis = redis
+
+    @functools.cached_property
+    def redis(self):
+        """Return the Redis client of the providers, created on first use."""
+        return Redis(connection_pool=get_redis_pool())
+
+    def acquire(self, provider, *, background=None):
+        """Reserve a request to the provider, waiting or failing if needed."""
+        if provider not in self.quotas:
+            return
+
+        if background is None:
+            background = is_background_request()
+
+        limit, period = self.quotas[provider]
+        background_limit = max(1, int(limit * self.background_share))
+        slot = period / background_limit
+        key = f"quota_{provider}"
+        background_key = f"quota_{provider}_background"
+
+        while True:
+            now = time.time()
+            request_id = f"{now}_{secrets.token_hex(4)}"
+
+            pipe = self.redis.pipeline()
+            pipe.zremrangebyscore(key, "-inf", now - period)
+            pipe.zremrangebyscore(background_key, "-inf", now - period)
+            pipe.zadd(key, {request_id: now})
+            if background:
+                pipe.zadd(background_key, {request_id: now})
+            pipe.expire(key, math.ceil(period))
+            pipe.expire(background_key, math.ceil(period))
+            pipe.zcard(key)
+            pipe.zcard(background_key)
+            # the background request before this one
+            pipe.zrange(background_key, -2, -2, withscores=True)
+            *_, used, background_used, previous = pipe.execute()
+
+            since_previous = now - previous[0][1] if previous else slot
+            if used <= limit and (
+                not background
+                or (background_used <= background_limit and since_previous >= slot)
+            ):
+                return
+
+            pipe.zrem(key, request_id)
+            pipe.zrem(background_key, request_id)
+            pipe.execute()
+
+            wait = 0
+            if used > limit:
+                wait = self._expires_in(key, used - limit - 1, period, now)
+            if not background:
+                raise self._exceeded_error(provider, wait)
+
+            if background_used > background_limit:
+                wait = max(
+                    wait,
+                    self._expires_in(
+                        background_key,
+                        background_used - background_limit - 1,
+                        period,
+                        now,
+                    ),
+                )
+            wait = max(wait, slot - since_previous)
+            if wait > self.max_wait:
+                self.redis.set(f"quota_{provider}_retry", 1, ex=math.ceil(wait))
+                logger.info("%s background budget spent for %ss", provider, wait)
+                raise self._exceeded_error(provider, wait)
+
+            logger.info("%s background budget in use, waiting %ss", provider, wait)
+            time.sleep(wait)
+
+    def _expires_in(self, key, index, period, now):
+        """Return the seconds until the request at the index leaves the window."""
+        requests_at = self.redis.zrange(key, index, index, withscores=True)
+        return max(requests_at[0][1] + period - now, 0) if requests_at else 0
+
+    def _exceeded_error(self, provider, retry_after):
+        """Return the HTTP error raised when the interactive budget is spent."""
+        return unavailable_error(
+            provider,
+            requests.codes.too_many_requests,
+            retry_after,
+            "request budget exhausted",
+        )
+
+    def retry_after(self, provider):
+        """Return the seconds until background requests can be made again."""
+        return max(self.redis.ttl(f"quota_{provider}_retry"), 0)
+
+    def remaining(self):
+        """Return the remaining budget of each provider in the sliding window.
+
+        `reset_in` is the time until the oldest request leaves the window.
+        """
+        budget = {}
+        now = time.time()
+        for provider, (limit, period) in self.quotas.items():
+            key = f"quota_{provider}"
+            used = self.redis.zcount(key, f"({now - period}", "+inf")
+            oldest = self.redis.zrangebyscore(
+                key,
+                f"({now - period}",
+                "+inf",
+                start=0,
+                num=1,
+                withscores=True,
+            )
+            budget[provider] = {
+                "limit": limit,
+                "remaining": max(limit - used, 0),
+                "reset_in": math.ceil(oldest[0][1] + period - now) if oldest else 0,
+            }
+        return budget
 
-session.mount(
-    "https://api.myanimelist.net/v2",
-    LimiterAdapter(per_minute=30),
-)
-session.mount(
-    "https://graphql.anilist.co",
-    LimiterAdapter(per_minute=85),
-)
-session.mount(
-    "https://api.igdb.com/v4",
-    LimiterAdapter(per_second=3),
-)
-session.mount(
-    "https://api.tvmaze.com",
-    LimiterAdapter(per_second=2),
-)
-session.mount(
-    "https://comicvine.gamespot.com/api",
-    LimiterAdapter(per_hour=190),
-)
-session.mount(
-    "https://openlibrary.org",
-    LimiterAdapter(per_minute=20),
-)
-session.mount(
-    "https://api.hardcover.app/v1/graphql",
-    LimiterAdapter(per_minute=55),
-)
+
+quota_scheduler = QuotaScheduler(None, PROVIDER_QUOTAS)
+
+
+class CircuitBreaker:
+    """Stop calling a provider that keeps failing, sharing its state in Redis.
+
+    The circuit opens after `failure_threshold` consecutive failures for the
+    `cooldown`, or right away on a rate limit for the provider's Retry-After.
+    While open, requests fail fast instead of tying up workers. Once it has
+    passed, a single trial request is let through: a success closes the
+    circuit and a failure opens it again.
+    """
+
+    failure_threshold = 5
+    cooldown = 30  # seconds
+    failure_window = 60 * 10
+
+    def __init__(self, redis=None, *, enabled=True):
+        """Initialize the circuit breaker with the Redis connection.
+
+        Without a Redis client, the one of the providers is used.
+        """
+        self.enabled = enabled
+        if redis is not None:
+            self.redis = redis
+
+    @functools.cached_property
+    def redis(self):
+        """Return the Redis client of the providers, created on first use."""
+        return Redis(connection_pool=get_redis_pool())
+
+    def check(self, provider):
+        """Raise an HTTP error if the provider shouldn't be called right now."""
+        if not self.enabled:
+            return
+
+        pipe = self.redis.pipeline()
+        pipe.ttl(f"circuit_{provider}_open")
+        pipe.get(f"circuit_{provider}_failures")
+        retry_after, failures = pipe.execute()
+
+        # only one trial request once the circuit has been open
+        if retry_after <= 0 and (
+            int(failures or 0) < self.failure_threshold
+            or self.redis.set(
+                f"circuit_{provider}_trial",
+                1,
+                nx=True,
+                ex=settings.REQUEST_TIMEOUT,
+            )
+        ):
+            return
+
+        raise unavailable_error(
+            provider,
+            requests.codes.service_unavailable,
+            retry_after if retry_after > 0 else self.cooldown,
+            "temporarily unavailable",
+        )
+
+    def retry_after(self, provider):
+        """Return the seconds until the circuit closes, zero if it's closed."""
+        return max(self.redis.ttl(f"circuit_{provider}_open"), 0)
+
+    def record_success(self, provider):
+        """Close the circuit of the provider."""
+        if not self.enabled:
+            return
+
+        self.redis.delete(
+            f"circuit_{provider}_failures",
+            f"circuit_{provider}_trial",
+        )
+
+    def record_failure(self, provider, retry_after=None):
+        """Count a failure of the provider, opening the circuit if needed."""
+        if not self.enabled:
+            return
+
+        pipe = self.redis.pipeline()
+        pipe.incr(f"circuit_{provider}_failures")
+        pipe.expire(f"circuit_{provider}_failures", self.failure_window)
+        pipe.delete(f"circuit_{provider}_trial")
+        failures, _, _ = pipe.execute()
+
+        if retry_after is None:
+            if failures < self.failure_threshold:
+                return
+            retry_after = self.cooldown
+
+        retry_after = max(math.ceil(retry_after), 1)
+        self.redis.set(f"circuit_{provider}_open", 1, ex=retry_after)
+        logger.warning("%s circuit opened for %s seconds", provider, retry_after)
+
+
+# Disabled when testing, so provider failures don't leak between tests
+circuit_breaker = CircuitBreaker(enabled=not settings.TESTING)
+
+
+def has_spare_budget(provider):
+    """Return whether optional requests can be made to the provider.
+
+    Prefetching only uses providers that are up and have at least half of
+    their request budget left, so it never delays the user's own requests.
+    """
+    if circuit_breaker.retry_after(provider):
+        return False
+
+    budget = quota_scheduler.remaining().get(provider)
+    return budget is None or budget["remaining"] >= budget["limit"] / 2
+
+
+def get_unavailable_time(provider):
+    """Return the seconds until background work can use the provider again.
+
+    The provider is unavailable while its circuit is open or while the share
+    of its request budget left to background work is spent.
+    """
+    return max(
+        circuit_breaker.retry_after(provider),
+        quota_scheduler.retry_after(provider),
+    )
+
+
+def unavailable_error(provider, status_code, retry_after, reason):
+    """Return an HTTP error for a request that wasn't sent to the provider."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers["Retry-After"] = str(math.ceil(retry_after))
+    response._content = json.dumps({"error": f"{provider} {reason}"}).encode()
+    msg = f"{provider} {reason}"
+    return requests.exceptions.HTTPError(msg, response=response)
+
+
+def get_retry_after(response):
+    """Return the seconds to wait from the Retry-After header, if any."""
+    try:
+        return int(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
 
 
 class ProviderAPIError(Exception):
@@ -96,6 +446,9 @@ class ProviderAPIError(Exception):
 
 def api_request(provider, method, url, params=None, data=None, headers=None):
     """Make a request to the API and return the response as a dictionary."""
+    circuit_breaker.check(provider)
+    quota_scheduler.acquire(provider)
+
     try:
         request_kwargs = {
             "url": url,
@@ -111,31 +464,31 @@ def api_request(provider, method, url, params=None, data=None, headers=None):
             request_kwargs["json"] = params
             request_func = session.post
 
-        response = request_func(**request_kwargs)
+        with metrics.provider_call(provider):
+            response = request_func(**request_kwargs)
         response.raise_for_status()
-        return response.json()
 
     except requests.exceptions.HTTPError as error:
         error_resp = error.response
         status_code = error_resp.status_code
 
-        # handle rate limiting
+        # handle rate limiting, waiting is left to the circuit breaker
         if status_code == requests.codes.too_many_requests:
-            seconds_to_wait = int(error_resp.headers["Retry-After"])
-            logger.warning("Rate limited, waiting %s seconds", seconds_to_wait)
-            time.sleep(seconds_to_wait + 3)
-            logger.info("Retrying request")
-            return api_request(
-                provider,
-                method,
-                url,
-                params=params,
-                data=data,
-                headers=headers,
-            )
+            retry_after = get_retry_after(error_resp) or circuit_breaker.cooldown
+            logger.warning("Rate limited, retry in %s seconds", retry_after)
+            circuit_breaker.record_failure(provider, retry_after)
+        elif status_code >= requests.codes.internal_server_error:
+            circuit_breaker.record_failure(provider)
 
         raise error from None
 
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        circuit_breaker.record_failure(provider)
+        raise
+
+    circuit_breaker.record_success(provider)
+    return response.json()
+
 
 def get_media_metadata(
     media_type,
@@ -146,6 +499,7 @@ def get_media_metadata(
 ):
     """Return the metadata for the selected media."""
     if source == Sources.MANUAL.value:
+        manual = get_provider("manual")
         if media_type == MediaTypes.SEASON.value:
             return manual.season(media_id, season_numbers[0])
         if media_type == MediaTypes.EPISODE.value:
@@ -155,49 +509,119 @@ def get_media_metadata(
         return manual.metadata(media_id, media_type)
 
     metadata_retrievers = {
-        MediaTypes.ANIME.value: lambda: mal.anime(media_id),
-        MediaTypes.MANGA.value: lambda: mangaupdates.manga(media_id)
+        MediaTypes.ANIME.value: lambda: get_provider("mal").anime(media_id),
+        MediaTypes.MANGA.value: lambda: get_provider("mangaupdates").manga(media_id)
         if source == Sources.MANGAUPDATES.value
-        else mal.manga(media_id),
-        MediaTypes.TV.value: lambda: tmdb.tv(media_id),
-        "tv_with_seasons": lambda: tmdb.tv_with_seasons(media_id, season_numbers),
-        MediaTypes.SEASON.value: lambda: tmdb.tv_with_seasons(media_id, season_numbers)[
-            f"season/{season_numbers[0]}"
-        ],
-        MediaTypes.EPISODE.value: lambda: tmdb.episode(
+        else get_provider("mal").manga(media_id),
+        MediaTypes.TV.value: lambda: get_provider("tmdb").tv(media_id),
+        "tv_with_seasons": lambda: get_provider("tmdb").tv_with_seasons(
+            media_id,
+            season_numbers,
+        ),
+        MediaTypes.SEASON.value: lambda: get_provider("tmdb").tv_with_seasons(
+            media_id,
+            season_numbers,
+        )[f"season/{season_numbers[0]}"],
+        MediaTypes.EPISODE.value: lambda: get_provider("tmdb").episode(
             media_id,
             season_numbers[0],
             episode_number,
         ),
-        MediaTypes.MOVIE.value: lambda: tmdb.movie(media_id),
-        MediaTypes.GAME.value: lambda: igdb.game(media_id),
-        MediaTypes.BOOK.value: lambda: hardcover.book(media_id)
+        MediaTypes.MOVIE.value: lambda: get_provider("tmdb").movie(media_id),
+        MediaTypes.GAME.value: lambda: get_provider("igdb").game(media_id),
+        MediaTypes.BOOK.value: lambda: get_provider("hardcover").book(media_id)
         if source == Sources.HARDCOVER.value
-        else openlibrary.book(media_id),
-        MediaTypes.COMIC.value: lambda: comicvine.comic(media_id),
+        else get_provider("openlibrary").book(media_id),
+        MediaTypes.COMIC.value: lambda: get_provider("comicvine").comic(media_id),
     }
-    return metadata_retrievers[media_type]()
+
+    # Copy of the cached metadata that outlives it while the provider is down
+    stale_key = (
+        f"stale_{source}_{media_type}_{media_id}_{season_numbers}_{episode_number}"
+    )
+    try:
+        with metrics.provider_lookup(source) as lookup:
+            metadata = metadata_retrievers[media_type]()
+    except ProviderAPIError as error:
+        if circuit_breaker.retry_after(error.provider):
+            metadata = cache.get(stale_key)
+            if metadata is not None:
+                logger.info("Serving stale metadata for %s", stale_key)
+                return metadata
+        raise
+
+    # only keep the copy once the circuit is open, so it isn't written on
+    # every fetch, and only from the cache as the provider can't be reached
+    if not lookup.fetched and circuit_breaker.retry_after(source):
+        cache.set(stale_key, metadata, STALE_METADATA_TIMEOUT)
+    return metadata
+
+
+async def aget_media_metadata(media_type, media_id, source, *args):
+    """Return the metadata for the selected media, for async views.
+
+    The provider is called from a thread of the executor, so the event loop
+    keeps serving other requests while waiting on it. Manual media are read
+    from the database, so they use the thread of the request instead.
+    """
+    return await sync_to_async(
+        get_media_metadata,
+        thread_sensitive=source == Sources.MANUAL.value,
+    )(media_type, media_id, source, *args)
 
 
 def search(media_type, query, page, source=None):
     """Search for media based on the query and return the results."""
-    if media_type == MediaTypes.MANGA.value:
-        if source == Sources.MANGAUPDATES.value:
-            response = mangaupdates.search(query, page)
-        else:
-            response = mal.search(media_type, query, page)
-    elif media_type == MediaTypes.ANIME.value:
-        response = mal.search(media_type, query, page)
-    elif media_type in (MediaTypes.TV.value, MediaTypes.MOVIE.value):
-        response = tmdb.search(media_type, query, page)
-    elif media_type == MediaTypes.GAME.value:
-        response = igdb.search(query, page)
-    elif media_type == MediaTypes.BOOK.value:
-        if source == Sources.OPENLIBRARY.value:
-            response = openlibrary.search(query, page)
-        else:
-            response = hardcover.search(query, page)
-    elif media_type == MediaTypes.COMIC.value:
-        response = comicvine.search(query, page)
+    provider = source or media_type_config.get_sources(media_type)[0].value
+    with metrics.provider_lookup(provider):
+        if media_type == MediaTypes.MANGA.value:
+            if source == Sources.MANGAUPDATES.value:
+                response = get_provider("mangaupdates").search(query, page)
+            else:
+                response = get_provider("mal").search(media_type, query, page)
+        elif media_type == MediaTypes.ANIME.value:
+            response = get_provider("mal").search(media_type, query, page)
+        elif media_type in (MediaTypes.TV.value, MediaTypes.MOVIE.value):
+            response = get_provider("tmdb").search(media_type, query, page)
+        elif media_type == MediaTypes.GAME.value:
+            response = get_provider("igdb").search(query, page)
+        elif media_type == MediaTypes.BOOK.value:
+            if source == Sources.OPENLIBRARY.value:
+                response = get_provider("openlibrary").search(query, page)
+            else:
+                response = get_provider("hardcover").search(query, page)
+        elif media_type == MediaTypes.COMIC.value:
+            response = get_provider("comicvine").search(query, page)
 
     return response
+
+
+async def asearch(media_type, query, page, source=None):
+    """Search for media without blocking the event loop, for async views."""
+    return await sync_to_async(search, thread_sensitive=False)(
+        media_type,
+        query,
+        page,
+        source,
+    )
+
+
+def claim_search_results(search_id, source, results):
+    """Drop the results already shown by another source of a federated search.
+
+    Every source of the search page is rendered as soon as it answers, so the
+    first source to return a work claims it and the later sources leave it
+    out. Works are identified by their title and year, and the results of a
+    single source are never deduplicated.
+    """
+    claimed = []
+    for result in results:
+        title_key = re.sub(r"\W+", "", result["title"].casefold()) or str(
+            result["media_id"],
+        )
+        cache_key = f"federated_{search_id}_{title_key}_{result.get('year') or ''}"
+        if cache.add(cache_key, source, FEDERATED_CLAIM_TIMEOUT) or (
+            cache.get(cache_key) == source
+        ):
+            claimed.append(result)
+    return claimed
@@ -0,0 +1,91 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# SQLite full-text index over Item titles, kept in sync by triggers
+SQLITE_FTS_TABLE = "app_item_fts"
+
+# Trigram tokenizer needed to match substrings, like icontains
+SQLITE_FTS_MIN_VERSION = (3, 34, 0)
+
+# Shorter queries have no trigram to look up in the index
+MIN_INDEXED_LENGTH = 3
+
+
+SQLITE_FTS_TRIGGERS = {
+    "app_item_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS app_item_fts_insert
+        AFTER INSERT ON app_item BEGIN
+            INSERT INTO app_item_fts(rowid, title) VALUES (new.id, new.title);
+        END
+    """,
+    "app_item_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS app_item_fts_delete
+        AFTER DELETE ON app_item BEGIN
+            INSERT INTO app_item_fts(app_item_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+        END
+    """,
+    "app_item_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS app_item_fts_update
+        AFTER UPDATE OF title ON app_item BEGIN
+            INSERT INTO app_item_fts(app_item_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+            INSERT INTO app_item_fts(rowid, title) VALUES (new.id, new.title);
+        END
+    """,
+}
+
+
+def has_sqlite_fts(db_connection=connection):
+    """Return whether the SQLite full-text index is available."""
+    return (
+        db_connection.vendor == "sqlite"
+        and db_connection.Database.sqlite_version_info >= SQLITE_FTS_MIN_VERSION
+    )
+
+
+def sync_sqlite_fts(db_connection=connection):
+    """Create the SQLite full-text index and its triggers if they are missing.
+
+    SQLite migrations that rebuild `app_item` drop its triggers, so this also
+    runs after every migrate, rebuilding the index when they were recreated.
+    """
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'",
+        )
+        if set(SQLITE_FTS_TRIGGERS) <= {name for (name,) in cursor.fetchall()}:
+            return
+
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS app_item_fts USING fts5("
+            "title, content='app_item', content_rowid='id', tokenize='trigram')",
+        )
+        for statement in SQLITE_FTS_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(
+            "INSERT INTO app_item_fts(app_item_fts) VALUES ('rebuild')",
+        )
+
+
+def title_contains(query, field="title"):
+    """Return a filter matching the items whose title contains the query.
+
+    On Postgres `icontains` is served by a trigram GIN index on the title.
+    On SQLite the query is matched against an FTS5 trigram index instead,
+    which has the same case insensitive substring semantics.
+    """
+    if len(query) < MIN_INDEXED_LENGTH or not has_sqlite_fts():
+        return Q(**{f"{field}__icontains": query})
+
+    id_field = field.removesuffix("title") + "id"
+    phrase = '"{}"'.format(query.replace('"', '""'))
+    return Q(
+        **{
+            f"{id_field}__in": RawSQL(
+                "SELECT rowid FROM app_item_fts WHERE app_item_fts MATCH %s",
+                [phrase],
+            ),
+        },
+    )
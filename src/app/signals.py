@@ -1,13 +1,29 @@
 import logging
+import time
+from contextlib import ExitStack
 
 from celery import states
-from celery.signals import before_task_publish
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.db import connections
 from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 from django_celery_results.models import TaskResult
 
+from app import metrics, search
+
 logger = logging.getLogger(__name__)
 
+# Metrics collected by the tasks running in this worker, by task id
+task_metrics = {}
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):  # noqa: ARG001
+    """Time the queries of the connection for the request and task metrics."""
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
+
 
 @receiver(connection_created)
 def setup_sqlite_pragmas(sender, connection, **kwargs):  # noqa: ARG001
@@ -19,13 +35,22 @@ def setup_sqlite_pragmas(sender, connection, **kwargs):  # noqa: ARG001
         cursor.close()
 
 
+@receiver(post_migrate)
+def sync_search_index(sender, using, **kwargs):  # noqa: ARG001
+    """Recreate the SQLite search index triggers if a migration dropped them."""
+    connection = connections[using]
+    if sender.name == "app" and search.has_sqlite_fts(connection):
+        search.sync_sqlite_fts(connection)
+
+
 @before_task_publish.connect
 def create_task_result_on_publish(sender=None, headers=None, body=None, **kwargs):  # noqa: ARG001
     """Create a TaskResult object with PENDING status on task publish.
 
     https://github.com/celery/django-celery-results/issues/286#issuecomment-1279161047
+    Tasks that ignore their result are frequent internal ones, not tracked.
     """
-    if "task" not in headers:
+    if "task" not in headers or headers.get("ignore_result"):
         return
 
     TaskResult.objects.store_result(
@@ -38,3 +63,30 @@ def create_task_result_on_publish(sender=None, headers=None, body=None, **kwargs
         task_args=headers.get("argsrepr", ""),
         task_kwargs=headers.get("kwargsrepr", ""),
     )
+
+
+@task_prerun.connect
+def start_task_metrics(task_id=None, **kwargs):  # noqa: ARG001
+    """Start collecting the metrics of a task."""
+    stack = ExitStack()
+    collected = stack.enter_context(metrics.collect())
+    task_metrics[task_id] = (stack, collected, time.perf_counter())
+
+
+@task_postrun.connect
+def finish_task_metrics(task_id=None, task=None, **kwargs):  # noqa: ARG001
+    """Log and export the metrics of a finished task."""
+    if task_id not in task_metrics:
+        return
+
+    stack, collected, start = task_metrics.pop(task_id)
+    stack.close()
+    duration = time.perf_counter() - start
+
+    logger.info(
+        "Task %s finished in %.2fs: %s",
+        task.name,
+        duration,
+        metrics.server_timing(collected, duration),
+    )
+    metrics.export("task", task.name, collected, duration)
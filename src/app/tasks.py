@@ -0,0 +1,48 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from app.providers import services
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="Prefetch search", ignore_result=True, expires=60 * 5)
+def prefetch_search(media_type, query, page, source=None):
+    """Warm the cache with the next page and the top results of a search."""
+    try:
+        data = services.search(media_type, query, page, source)
+    except services.ProviderAPIError:
+        return "Search failed, nothing prefetched"
+
+    if not data["results"]:
+        return "No results to prefetch"
+
+    prefetched = []
+    provider = data["results"][0]["source"]
+
+    if page < data["total_pages"] and services.has_spare_budget(provider):
+        try:
+            services.search(media_type, query, page + 1, source)
+        except services.ProviderAPIError:
+            logger.warning("Failed to prefetch page %s of %s", page + 1, query)
+        else:
+            prefetched.append(f"page {page + 1}")
+
+    for result in data["results"][: settings.SEARCH_PREFETCH_RESULTS]:
+        if not services.has_spare_budget(result["source"]):
+            break
+
+        try:
+            services.get_media_metadata(
+                result["media_type"],
+                result["media_id"],
+                result["source"],
+            )
+        except services.ProviderAPIError:
+            logger.warning("Failed to prefetch details of %s", result["title"])
+        else:
+            prefetched.append(result["title"])
+
+    return f"Prefetched {', '.join(prefetched) or 'nothing'} for {query}"
@@ -7,7 +7,7 @@ from django.utils import formats, timezone
 from django.utils.html import format_html
 from unidecode import unidecode
 
-from app import media_type_config
+from app import images, media_type_config
 from app.models import MediaTypes, Sources, Status
 
 register = template.Library()
@@ -26,6 +26,12 @@ def get_static_file_mtime(file_path):
         return f"?{mtime}"
 
 
+@register.filter
+def image_url(url, size="grid"):
+    """Return the local URL of a resized copy of the image."""
+    return images.get_proxy_url(url, size)
+
+
 @register.filter
 def no_underscore(arg1):
     """Return the title case of the string."""
@@ -0,0 +1,45 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """TestCase mixin asserting the number of SQL queries of the views."""
+
+    def assertQueryBudget(self, func, budget, add_data, sizes=(1, 3, 6)):  # noqa: N802
+        """Assert the queries of `func` are within budget for every data size.
+
+        `add_data` is called with the index of every new unit of data, e.g. a
+        tracked show, until there are as many as the next size, then `func` is
+        run. The number of queries must be the same for every size, so N+1
+        queries fail even when they're below the budget.
+        """
+        func()  # warm up the caches filled on the first request
+        counts = {}
+        created = 0
+        for size in sizes:
+            for index in range(created, size):
+                add_data(index)
+            created = size
+
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as context:
+                func()
+            counts[size] = len(context.captured_queries)
+
+            if counts[size] > budget:
+                queries = "\n".join(
+                    f"{number}. {query['sql']}"
+                    for number, query in enumerate(context.captured_queries, start=1)
+                )
+                self.fail(
+                    f"{counts[size]} queries with {size} items, over the budget "
+                    f"of {budget}:\n{queries}",
+                )
+
+        if len(set(counts.values())) > 1:
+            self.fail(f"The number of queries grows with the data: {counts}")
+
+    def assertUsesIndex(self, queryset, index_name):  # noqa: N802
+        """Assert the query plan of the queryset reads the given index."""
+        plan = queryset.explain()
+        if index_name not in plan:
+            self.fail(f"The query doesn't use the index {index_name}:\n{plan}")
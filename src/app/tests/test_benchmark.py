@@ -0,0 +1,69 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models import TV, Episode, Item, MediaTypes, Movie, Season
+from benchmarks import suite
+from events.models import Event
+
+
+class BenchmarkTests(TestCase):
+    """Test the generation of the benchmark library and the comparisons."""
+
+    def test_generate_library(self):
+        """Test that the library has the size of the scale."""
+        with suite.stub_providers():
+            users = suite.generate_library(0.001, users=2)
+
+        self.assertEqual(len(users), 2)
+        self.assertEqual(
+            Item.objects.filter(media_type=MediaTypes.TV.value).count(),
+            5,
+        )
+        self.assertEqual(TV.objects.filter(user=users[0]).count(), 5)
+        self.assertEqual(Season.objects.filter(user=users[0]).count(), 10)
+        self.assertEqual(
+            Episode.objects.filter(related_season__user=users[0]).count(),
+            100,
+        )
+        self.assertEqual(Movie.objects.filter(user=users[1]).count(), 2)
+        self.assertEqual(Event.objects.count(), 50)
+        self.assertEqual(
+            sum(
+                model.history.filter(history_user=users[0]).count()
+                for model in (TV, Season, Episode, Movie)
+            ),
+            20,
+        )
+
+    @patch("django.db.backends.base.creation.BaseDatabaseCreation.destroy_test_db")
+    @patch("django.db.backends.base.creation.BaseDatabaseCreation.create_test_db")
+    def test_benchmark_command(self, *_mocks):
+        """Test that the command times the selected benchmarks."""
+        out = StringIO()
+        call_command(
+            "benchmark",
+            "--scale=0.001",
+            "--repeat=1",
+            "--only=statistics",
+            "--only=import_trakt",
+            "--noinput",
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines[1:]],
+            ["statistics", "import_trakt"],
+        )
+
+    def test_find_regressions(self):
+        """Test that only the slowdowns above the threshold are reported."""
+        regressions = suite.find_regressions(
+            {"statistics": 1.3, "export": 1.1, "user_events": 5},
+            {"statistics": 1, "export": 1},
+            0.2,
+        )
+        self.assertEqual(regressions, {"statistics": (1, 1.3)})
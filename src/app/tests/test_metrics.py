@@ -0,0 +1,141 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from app import metrics
+from app.models import Item, MediaTypes, Sources
+
+
+class MetricsTests(TestCase):
+    """Test the collection of request and task metrics."""
+
+    def test_collect_database_and_redis(self):
+        """Test that queries and cache commands are counted inside the block."""
+        cache.get("metrics_test")  # open the connection beforehand
+
+        with metrics.collect() as collected:
+            Item.objects.count()
+            cache.set("metrics_test", 1)
+
+        Item.objects.count()
+
+        self.assertEqual(collected.db_queries, 1)
+        self.assertGreater(collected.db_time, 0)
+        self.assertEqual(collected.redis_commands, 1)
+        self.assertGreater(collected.redis_time, 0)
+
+    def test_provider_lookups(self):
+        """Test that lookups without API calls are counted as cache hits."""
+        with metrics.collect() as collected:
+            with (
+                metrics.provider_lookup(Sources.TMDB.value),
+                metrics.provider_call(Sources.TMDB.value),
+            ):
+                pass
+            with metrics.provider_lookup(Sources.TMDB.value):
+                pass
+
+        self.assertEqual(
+            collected.providers[Sources.TMDB.value],
+            {
+                "calls": 1,
+                "time": collected.providers[Sources.TMDB.value]["time"],
+                "hits": 1,
+                "misses": 1,
+            },
+        )
+        self.assertIn(
+            'tmdb;dur=0.0;desc="1 calls, 1 hits, 1 misses"',
+            metrics.server_timing(collected, 0.5),
+        )
+
+    def test_outside_collection(self):
+        """Test that nothing is recorded without a collection in progress."""
+        with metrics.provider_lookup(Sources.TMDB.value):
+            cache.get("metrics_test")
+
+        self.assertIsNone(metrics.current_metrics.get())
+
+
+class MetricsViewTests(TestCase):
+    """Test the metrics exposed over HTTP."""
+
+    def setUp(self):
+        """Create a user and log in."""
+        self.credentials = {"username": "test", "password": "12345"}
+        self.user = get_user_model().objects.create_user(**self.credentials)
+        self.client.login(**self.credentials)
+        get_redis_connection("default").delete(metrics.PROMETHEUS_KEY)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        """Test that responses include the timings of the request."""
+        Item.objects.create(
+            media_id="238",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="The Godfather",
+        )
+        response = self.client.get(reverse("statistics"))
+
+        self.assertEqual(response.status_code, 200)
+        server_timing = response["Server-Timing"]
+        self.assertRegex(server_timing, r'^db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(server_timing, r"total;dur=[\d.]+$")
+
+    def test_server_timing_disabled(self):
+        """Test that the timings are only sent when enabled."""
+        response = self.client.get(reverse("statistics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_prometheus_disabled(self):
+        """Test that the metrics endpoint is disabled by default."""
+        response = self.client.get(reverse("prometheus_metrics"))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PROMETHEUS_METRICS=True, PROMETHEUS_TOKEN="")
+    def test_prometheus_without_token(self):
+        """Test that the metrics endpoint stays disabled without a token."""
+        response = self.client.get(reverse("prometheus_metrics"))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PROMETHEUS_METRICS=True, PROMETHEUS_TOKEN="scrape-token")  # noqa: S106
+    def test_prometheus_unauthorized(self):
+        """Test that scrapes without the bearer token are rejected."""
+        self.client.logout()
+        url = reverse("prometheus_metrics")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Bearer")
+
+        response = self.client.get(url, headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(PROMETHEUS_METRICS=True, PROMETHEUS_TOKEN="scrape-token")  # noqa: S106
+    def test_prometheus_metrics(self):
+        """Test that requests are added to the Prometheus counters."""
+        self.client.get(reverse("statistics"))
+        self.client.get(reverse("statistics"))
+        self.client.logout()
+
+        response = self.client.get(
+            reverse("prometheus_metrics"),
+            headers={"Authorization": "Bearer scrape-token"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn("# TYPE yamtrack_runs_total counter", content)
+        self.assertIn(
+            'yamtrack_runs_total{kind="request",name="statistics"} 2',
+            content,
+        )
+        self.assertIn(
+            'yamtrack_db_queries_total{kind="request",name="statistics"}',
+            content,
+        )
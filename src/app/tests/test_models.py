@@ -2,6 +2,8 @@ from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from unittest.mock import patch
 
+import requests
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Prefetch
 from django.test import TestCase
@@ -22,6 +24,8 @@ from app.models import (
     Sources,
     Status,
 )
+from app.providers import services
+from events import calendar
 from events.models import Event
 from users.models import MediaStatusChoices
 
@@ -65,6 +69,59 @@ class ItemModel(TestCase):
         )
         self.assertEqual(str(item), "Test Show S1E2")
 
+    @patch("events.tasks.reload_calendar_items.apply_async")
+    def test_fetch_releases_coalesced(self, mock_apply_async):
+        """Test quick triggers are refreshed in a single task."""
+        other_item = Item.objects.create(
+            media_id="2",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="Other Movie",
+            image="http://example.com/image2.jpg",
+        )
+        calendar.pop_queued_items()
+
+        self.item.fetch_releases(delay=True)
+        self.item.fetch_releases(delay=True)
+        other_item.fetch_releases(delay=True)
+
+        mock_apply_async.assert_called_once_with(
+            countdown=settings.FETCH_RELEASES_DEBOUNCE,
+        )
+        self.assertCountEqual(calendar.pop_queued_items(), [self.item, other_item])
+        self.assertEqual(calendar.pop_queued_items(), [])
+
+    @patch("events.tasks.reload_calendar_items.apply_async")
+    @patch("app.providers.services.get_media_metadata")
+    def test_pop_queued_items_provider_error(self, mock_get_metadata, _):
+        """Test that a season whose show can't be fetched is queued again."""
+        season_item = Item.objects.create(
+            media_id="1668",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.SEASON.value,
+            title="Friends",
+            image="http://example.com/image3.jpg",
+            season_number=1,
+        )
+        calendar.pop_queued_items()
+
+        response = requests.Response()
+        response.status_code = 503
+        mock_get_metadata.side_effect = services.ProviderAPIError(
+            Sources.TMDB.value,
+            requests.exceptions.HTTPError(response=response),
+        )
+        season_item.fetch_releases(delay=True)
+        self.item.fetch_releases(delay=True)
+
+        self.assertEqual(calendar.pop_queued_items(), [self.item])
+
+        mock_get_metadata.side_effect = None
+        mock_get_metadata.return_value = {"title": "Friends", "image": ""}
+        tv_items = calendar.pop_queued_items()
+        self.assertEqual(len(tv_items), 1)
+        self.assertEqual(tv_items[0].media_type, MediaTypes.TV.value)
+
 
 class MediaManagerTests(TestCase):
     """Test case for the MediaManager class."""
@@ -1562,6 +1619,57 @@ class SeasonModel(TestCase):
                 item=episode_item,
             )
 
+    def test_get_remaining_eps(self):
+        """Test the remaining episodes are provisioned in constant queries."""
+        season_metadata = {
+            "episodes": [
+                {"episode_number": number, "still_path": f"/{number}.jpg"}
+                for number in range(1, 25)
+            ],
+        }
+
+        season = Season.objects.select_related("item").get(id=self.season.id)
+
+        # max episode, existing items, bulk insert and created items
+        with self.assertNumQueries(4):
+            episodes = season.get_remaining_eps(season_metadata)
+
+        self.assertEqual(
+            [episode.item.episode_number for episode in episodes],
+            list(range(24, 2, -1)),
+        )
+        self.assertEqual(
+            episodes[0].item.image,
+            "https://image.tmdb.org/t/p/original/24.jpg",
+        )
+        self.assertTrue(all(episode.item.pk for episode in episodes))
+
+    @patch("app.providers.services.get_media_metadata")
+    def test_get_episode_items_existing(self, mock_get_metadata):
+        """Test existing episode items are reused without fetching metadata."""
+        season = Season.objects.select_related("item").get(id=self.season.id)
+
+        with self.assertNumQueries(1):
+            items = season.get_episode_items([1, 2])
+
+        self.assertEqual(items[1].image, "http://example.com/image.jpg")
+        self.assertEqual(
+            Item.objects.filter(media_type=MediaTypes.EPISODE.value).count(),
+            2,
+        )
+        mock_get_metadata.assert_not_called()
+
+    def test_get_episode_items_missing_metadata(self):
+        """Test episodes missing from the metadata get the default image."""
+        items = self.season.get_episode_items(
+            [2, "3", 4],
+            {"episodes": [{"episode_number": 3, "image": "http://example.com/3.jpg"}]},
+        )
+
+        self.assertEqual(sorted(items), [2, 3, 4])
+        self.assertEqual(items[3].image, "http://example.com/3.jpg")
+        self.assertEqual(items[4].image, settings.IMG_NONE)
+
 
 class SeasonStatusTests(TestCase):
     """Test Season model status change behaviors."""
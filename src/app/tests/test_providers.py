@@ -1,11 +1,14 @@
 import json
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import fakeredis
 import requests
 from django.conf import settings
 from django.test import TestCase
 
+from app import metrics
 from app.models import Episode, Item, MediaTypes, Sources
 from app.providers import (
     comicvine,
@@ -1468,3 +1471,248 @@ class ServicesTests(TestCase):
 
         # Verify the correct function was called
         mock_search.assert_called_once_with("test", 1)
+
+
+class QuotaSchedulerTests(TestCase):
+    """Test the quota scheduler of low budget providers."""
+
+    def setUp(self):
+        """Create a scheduler with a small budget."""
+        self.scheduler = services.QuotaScheduler(
+            fakeredis.FakeStrictRedis(),
+            {Sources.COMICVINE.value: (5, 100)},
+        )
+
+    @patch("app.providers.services.time.time", return_value=1000)
+    def test_interactive_uses_whole_budget(self, _):
+        """Test that interactive requests fail fast once the budget is spent."""
+        for _ in range(5):
+            self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+
+        self.assertEqual(cm.exception.response.status_code, 429)
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "100")
+        self.assertEqual(
+            self.scheduler.remaining()[Sources.COMICVINE.value],
+            {"limit": 5, "remaining": 0, "reset_in": 100},
+        )
+
+    @patch("app.providers.services.time.time")
+    def test_budget_is_a_sliding_window(self, mock_time):
+        """Test that a burst across a period boundary can't exceed the budget."""
+        mock_time.return_value = 1099
+        for _ in range(5):
+            self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+
+        mock_time.return_value = 1101
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "98")
+
+        # the requests leave the window a period after they were made
+        mock_time.return_value = 1199
+        self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+        self.assertEqual(
+            self.scheduler.remaining()[Sources.COMICVINE.value],
+            {"limit": 5, "remaining": 4, "reset_in": 100},
+        )
+
+    @patch("app.providers.services.time.sleep")
+    @patch("app.providers.services.time.time")
+    def test_background_requests_are_paced(self, mock_time, mock_sleep):
+        """Test that background requests are spread and leave room for pages."""
+        now = [1000.0]
+        mock_time.side_effect = lambda: now[0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        mock_sleep.side_effect = sleep
+
+        # 4 of the 5 requests are available to background work, one each 25s
+        for _ in range(4):
+            self.scheduler.acquire(Sources.COMICVINE.value, background=True)
+
+        self.assertEqual(now[0], 1075)
+        self.assertEqual(mock_sleep.call_count, 3)
+
+        # the last request of the window is kept for page loads
+        self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+        self.assertEqual(
+            self.scheduler.remaining()[Sources.COMICVINE.value]["remaining"],
+            0,
+        )
+
+    @patch("app.providers.services.time.sleep")
+    @patch("app.providers.services.time.time", return_value=1000)
+    def test_background_long_wait_fails(self, _, mock_sleep):
+        """Test that background requests don't wait longer than the maximum."""
+        self.scheduler.max_wait = 10
+
+        self.scheduler.acquire(Sources.COMICVINE.value, background=True)
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            self.scheduler.acquire(Sources.COMICVINE.value, background=True)
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(cm.exception.response.status_code, 429)
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "25")
+        self.assertEqual(self.scheduler.retry_after(Sources.COMICVINE.value), 25)
+        self.assertEqual(self.scheduler.retry_after(Sources.TMDB.value), 0)
+
+        # the budget left is still available to page loads
+        self.scheduler.acquire(Sources.COMICVINE.value, background=False)
+
+    def test_other_providers_are_not_limited(self):
+        """Test that providers without a quota are not counted."""
+        for _ in range(10):
+            self.scheduler.acquire(Sources.TMDB.value, background=False)
+
+        self.assertEqual(
+            self.scheduler.remaining()[Sources.COMICVINE.value]["remaining"],
+            5,
+        )
+
+
+class ProviderRegistryTests(TestCase):
+    """Test the lazily imported provider modules."""
+
+    def test_get_provider(self):
+        """Test that the module of a provider is returned."""
+        self.assertIs(services.get_provider(Sources.TMDB.value), tmdb)
+
+    def test_get_unknown_provider(self):
+        """Test that unknown providers are rejected."""
+        with self.assertRaises(ValueError):
+            services.get_provider("services")
+
+
+class ThreadLocalSessionTests(TestCase):
+    """Test the HTTP sessions used for provider requests."""
+
+    def test_session_per_thread(self):
+        """Test that every thread gets its own rate limited session."""
+        sessions = []
+
+        def get_session():
+            sessions.append(services.session.session)
+
+        get_session()
+        thread = threading.Thread(target=get_session)
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(services.session.session, sessions[0])
+        self.assertIsInstance(
+            sessions[1].get_adapter("https://api.igdb.com/v4/games"),
+            services.LimiterAdapter,
+        )
+
+
+class CircuitBreakerTests(TestCase):
+    """Test the circuit breaker of the providers."""
+
+    def setUp(self):
+        """Use a circuit breaker with its own Redis."""
+        self.breaker = services.CircuitBreaker(
+            fakeredis.FakeStrictRedis(server=fakeredis.FakeServer()),
+        )
+        patcher = patch.object(services, "circuit_breaker", self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_response(self, status_code, headers=None):
+        """Return a response with the status code."""
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        response._content = b"{}"
+        return response
+
+    @patch("app.providers.services.time.sleep")
+    @patch("app.providers.services.session.get")
+    def test_rate_limit_opens_circuit(self, mock_get, mock_sleep):
+        """Test that a 429 opens the circuit for Retry-After without waiting."""
+        mock_get.return_value = self.get_response(429, {"Retry-After": "60"})
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            services.api_request(Sources.TMDB.value, "GET", "https://example.com")
+
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            services.api_request(Sources.TMDB.value, "GET", "https://example.com")
+
+        mock_get.assert_called_once()
+        mock_sleep.assert_not_called()
+        self.assertEqual(cm.exception.response.status_code, 503)
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "60")
+        self.assertEqual(self.breaker.retry_after(Sources.TMDB.value), 60)
+        self.assertEqual(self.breaker.retry_after(Sources.IGDB.value), 0)
+
+    @patch("app.providers.services.session.get")
+    def test_failures_open_circuit(self, mock_get):
+        """Test that consecutive server errors open the circuit until a trial."""
+        mock_get.return_value = self.get_response(500)
+
+        for _ in range(self.breaker.failure_threshold):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                services.api_request(Sources.TMDB.value, "GET", "https://example.com")
+
+        self.assertEqual(self.breaker.retry_after(Sources.TMDB.value), 30)
+
+        # the cooldown has passed, a failed trial opens the circuit again
+        self.breaker.redis.delete(f"circuit_{Sources.TMDB.value}_open")
+        with self.assertRaises(requests.exceptions.HTTPError):
+            services.api_request(Sources.TMDB.value, "GET", "https://example.com")
+        self.assertEqual(self.breaker.retry_after(Sources.TMDB.value), 30)
+
+        # only a single trial request is let through at a time
+        self.breaker.redis.delete(f"circuit_{Sources.TMDB.value}_open")
+        self.breaker.check(Sources.TMDB.value)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.breaker.check(Sources.TMDB.value)
+
+        # a successful trial closes the circuit
+        self.breaker.redis.delete(f"circuit_{Sources.TMDB.value}_trial")
+        mock_get.return_value = self.get_response(200)
+        services.api_request(Sources.TMDB.value, "GET", "https://example.com")
+        self.breaker.check(Sources.TMDB.value)
+        self.breaker.check(Sources.TMDB.value)
+        self.assertEqual(mock_get.call_count, self.breaker.failure_threshold + 2)
+
+    @patch("app.providers.tmdb.movie")
+    def test_stale_metadata_while_open(self, mock_movie):
+        """Test that cached metadata read while the circuit is open is served."""
+
+        def get_movie():
+            return services.get_media_metadata(
+                MediaTypes.MOVIE.value,
+                "stale_movie",
+                Sources.TMDB.value,
+            )
+
+        def fetch_movie(media_id):
+            with metrics.provider_call(Sources.TMDB.value):
+                return {"media_id": media_id, "title": "Fetched"}
+
+        error = requests.exceptions.HTTPError(response=self.get_response(503))
+        provider_error = services.ProviderAPIError(Sources.TMDB.value, error)
+
+        # fetches and cache hits don't keep a copy while the circuit is closed
+        mock_movie.side_effect = fetch_movie
+        get_movie()
+        mock_movie.side_effect = None
+        mock_movie.return_value = {"media_id": "stale_movie", "title": "Cached"}
+        get_movie()
+
+        self.breaker.record_failure(Sources.TMDB.value, 60)
+        mock_movie.side_effect = provider_error
+        with self.assertRaises(services.ProviderAPIError):
+            get_movie()
+
+        # the cached metadata read while the circuit is open is kept
+        mock_movie.side_effect = None
+        get_movie()
+        mock_movie.side_effect = provider_error
+        self.assertEqual(get_movie()["title"], "Cached")
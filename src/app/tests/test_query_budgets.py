@@ -0,0 +1,320 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
+
+from app.models import (
+    TV,
+    Anime,
+    Episode,
+    Item,
+    MediaTypes,
+    Movie,
+    Season,
+    Sources,
+    Status,
+)
+from app.tests.query_budget import QueryBudgetMixin
+from events.models import Event
+from lists.models import CustomList
+
+# Maximum number of queries of the hot views, whatever the size of the library
+QUERY_BUDGETS = {
+    "home": 16,
+    "media_list": 8,
+    "list_detail": 23,
+    "calendar": 5,
+    "statistics": 44,
+    "history_modal": 5,
+}
+
+
+@patch(
+    "app.providers.services.get_media_metadata",
+    return_value={"max_progress": None, "related": {"seasons": []}},
+)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test that the queries of the hot views don't grow with the library."""
+
+    def setUp(self):
+        """Create a user with a custom list and log in."""
+        self.credentials = {"username": "test", "password": "12345"}
+        self.user = get_user_model().objects.create_user(**self.credentials)
+        self.client.login(**self.credentials)
+        self.custom_list = CustomList.objects.create(name="List", owner=self.user)
+
+    def add_library(self, index):
+        """Track a show, a season with episodes, a movie and an anime."""
+        now = timezone.now()
+        media_id = str(index + 1)
+        tv_item = Item.objects.create(
+            media_id=media_id,
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.TV.value,
+            title=f"Show {media_id}",
+            image="http://example.com/image.jpg",
+        )
+        season_item = Item.objects.create(
+            media_id=media_id,
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.SEASON.value,
+            title=f"Show {media_id}",
+            image="http://example.com/image.jpg",
+            season_number=1,
+        )
+        episode_items = [
+            Item.objects.create(
+                media_id=media_id,
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.EPISODE.value,
+                title=f"Show {media_id}",
+                image="http://example.com/image.jpg",
+                season_number=1,
+                episode_number=episode_number,
+            )
+            for episode_number in range(1, 3)
+        ]
+        movie_item = Item.objects.create(
+            media_id=media_id,
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title=f"Movie {media_id}",
+            image="http://example.com/image.jpg",
+        )
+        anime_item = Item.objects.create(
+            media_id=media_id,
+            source=Sources.MAL.value,
+            media_type=MediaTypes.ANIME.value,
+            title=f"Anime {media_id}",
+            image="http://example.com/image.jpg",
+        )
+
+        [tv] = bulk_create_with_history(
+            [TV(item=tv_item, user=self.user, status=Status.IN_PROGRESS.value)],
+            TV,
+            default_user=self.user,
+        )
+        [season] = bulk_create_with_history(
+            [
+                Season(
+                    item=season_item,
+                    user=self.user,
+                    related_tv=tv,
+                    status=Status.IN_PROGRESS.value,
+                ),
+            ],
+            Season,
+            default_user=self.user,
+        )
+        bulk_create_with_history(
+            [
+                Episode(item=item, related_season=season, end_date=now)
+                for item in episode_items
+            ],
+            Episode,
+            default_user=self.user,
+        )
+        bulk_create_with_history(
+            [
+                Movie(
+                    item=movie_item,
+                    user=self.user,
+                    status=Status.IN_PROGRESS.value,
+                    score=7,
+                ),
+            ],
+            Movie,
+            default_user=self.user,
+        )
+        bulk_create_with_history(
+            [
+                Anime(
+                    item=anime_item,
+                    user=self.user,
+                    status=Status.IN_PROGRESS.value,
+                    progress=1,
+                    start_date=now,
+                ),
+            ],
+            Anime,
+            default_user=self.user,
+        )
+
+        Event.objects.bulk_create(
+            [
+                Event(item=season_item, content_number=1, datetime=now),
+                Event(
+                    item=season_item,
+                    content_number=2,
+                    datetime=now + timedelta(hours=1),
+                ),
+                Event(item=anime_item, content_number=1, datetime=now),
+            ],
+        )
+
+        for item in (tv_item, season_item, episode_items[0], movie_item, anime_item):
+            self.custom_list.items.add(item)
+
+    def add_history(self, index):
+        """Rewatch a movie and change its score."""
+        item, _ = Item.objects.get_or_create(
+            media_id="238",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            defaults={
+                "title": "The Godfather",
+                "image": "http://example.com/image.jpg",
+            },
+        )
+        [movie] = bulk_create_with_history(
+            [Movie(item=item, user=self.user, status=Status.COMPLETED.value)],
+            Movie,
+            default_user=self.user,
+        )
+        movie.score = index
+        movie.save()
+
+    def test_home(self, _mock_get_metadata):
+        """Test the queries of the home page."""
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("home")),
+            QUERY_BUDGETS["home"],
+            self.add_library,
+        )
+
+    def test_media_list(self, _mock_get_metadata):
+        """Test the queries of the media lists."""
+        for media_type in (
+            MediaTypes.TV.value,
+            MediaTypes.SEASON.value,
+            MediaTypes.MOVIE.value,
+            MediaTypes.ANIME.value,
+        ):
+            with self.subTest(media_type=media_type):
+                Item.objects.all().delete()
+                self.assertQueryBudget(
+                    lambda media_type=media_type: self.client.get(
+                        reverse("medialist", args=[media_type]),
+                    ),
+                    QUERY_BUDGETS["media_list"],
+                    self.add_library,
+                )
+
+    def test_list_detail(self, _mock_get_metadata):
+        """Test the queries of a custom list."""
+        self.assertQueryBudget(
+            lambda: self.client.get(
+                reverse("list_detail", args=[self.custom_list.id]),
+            ),
+            QUERY_BUDGETS["list_detail"],
+            self.add_library,
+        )
+
+    def test_calendar(self, _mock_get_metadata):
+        """Test the queries of the calendar."""
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("calendar")),
+            QUERY_BUDGETS["calendar"],
+            self.add_library,
+        )
+
+    def test_statistics(self, _mock_get_metadata):
+        """Test the queries of the statistics page."""
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("statistics")),
+            QUERY_BUDGETS["statistics"],
+            self.add_library,
+        )
+
+    def test_history_modal(self, _mock_get_metadata):
+        """Test the queries of the history of a media tracked many times."""
+        self.assertQueryBudget(
+            lambda: self.client.get(
+                reverse(
+                    "history_modal",
+                    args=[Sources.TMDB.value, MediaTypes.MOVIE.value, "238"],
+                )
+                + "?return_url=/",
+            ),
+            QUERY_BUDGETS["history_modal"],
+            self.add_history,
+        )
+
+
+class QueryPlanTests(QueryBudgetMixin, TestCase):
+    """Test that the hot queries are planned on their indexes."""
+
+    def setUp(self):
+        """Create a user."""
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="12345",  # noqa: S106
+        )
+        self.now = timezone.now()
+
+    def test_media_by_status(self):
+        """Test that the media lists by status use the status index."""
+        for model in (TV, Season, Movie, Anime):
+            with self.subTest(model=model.__name__):
+                # the lists are ordered by the sort of the user instead
+                self.assertUsesIndex(
+                    model.objects.filter(
+                        user=self.user,
+                        status=Status.IN_PROGRESS.value,
+                    ).order_by("-score"),
+                    f"app_{model._meta.model_name}_status_idx",
+                )
+
+    def test_latest_media_entry(self):
+        """Test that the latest entry of a media uses the latest index."""
+        self.assertUsesIndex(
+            Movie.objects.filter(user=self.user, item_id=1).order_by("-created_at"),
+            "app_movie_latest_idx",
+        )
+
+    def test_user_history(self):
+        """Test that the activity statistics scan the user's history by date."""
+        for model in (Movie, Season, Episode):
+            with self.subTest(model=model.__name__):
+                [index] = model.history.model._meta.indexes
+                self.assertUsesIndex(
+                    model.history.filter(
+                        history_user_id=self.user.id,
+                        history_date__gte=self.now - timedelta(days=365),
+                    ).values_list("history_date", flat=True),
+                    index.name,
+                )
+
+    def test_unsent_releases(self):
+        """Test that the release notifications use the unsent events index."""
+        self.assertUsesIndex(
+            Event.objects.filter(
+                datetime__gte=self.now - timedelta(minutes=30),
+                datetime__lte=self.now,
+                notification_sent=False,
+            ),
+            "event_unsent_datetime_idx",
+        )
+
+    def test_item_releases(self):
+        """Test that the released episodes of the items use the item index."""
+        self.assertUsesIndex(
+            Event.objects.filter(
+                item_id__in=[1, 2, 3],
+                datetime__lte=self.now,
+            ).values("item_id", "content_number"),
+            "event_item_datetime_idx",
+        )
+
+    def test_calendar_range(self):
+        """Test that the calendar reads the events of the range on an index."""
+        plan = Event.objects.get_user_events(
+            self.user,
+            self.now.date(),
+            self.now.date() + timedelta(days=30),
+        ).explain()
+        self.assertRegex(plan, r"event_(item_)?datetime_idx")
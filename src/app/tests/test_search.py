@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from app.models import Item, MediaTypes, Sources
+from app.search import title_contains
+
+
+class TitleContainsTests(TestCase):
+    """Test the title search backed by the search index."""
+
+    def setUp(self):
+        """Create items to search."""
+        self.breaking_bad = Item.objects.create(
+            media_id="1396",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.TV.value,
+            title="Breaking Bad",
+        )
+        self.better_call_saul = Item.objects.create(
+            media_id="60059",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.TV.value,
+            title="Better Call Saul",
+        )
+
+    def search(self, query):
+        """Return the items matching the query."""
+        return set(Item.objects.filter(title_contains(query)))
+
+    def test_substring_case_insensitive(self):
+        """Test that any part of the title matches, ignoring case."""
+        self.assertEqual(self.search("KING b"), {self.breaking_bad})
+        self.assertEqual(self.search("call"), {self.better_call_saul})
+        self.assertEqual(self.search('"bad'), set())
+
+    def test_short_query(self):
+        """Test that queries too short for the index still match."""
+        self.assertEqual(self.search("Be"), {self.better_call_saul})
+
+    def test_index_kept_in_sync(self):
+        """Test that renamed and deleted items are updated in the index."""
+        self.breaking_bad.title = "El Camino"
+        self.breaking_bad.save()
+        Item.objects.filter(id=self.better_call_saul.id).update(title="Camino Real")
+
+        self.assertEqual(self.search("bad"), set())
+        self.assertEqual(
+            self.search("camino"),
+            {self.breaking_bad, self.better_call_saul},
+        )
+
+        self.better_call_saul.delete()
+        self.assertEqual(self.search("camino"), {self.breaking_bad})
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from app.models import MediaTypes, Sources
+from app.tasks import prefetch_search
+
+
+class PrefetchSearchTests(TestCase):
+    """Test the prefetch of search pages and details."""
+
+    def setUp(self):
+        """Create the search response."""
+        self.response = {
+            "page": 1,
+            "total_pages": 2,
+            "results": [
+                {
+                    "media_id": str(media_id),
+                    "title": f"Movie {media_id}",
+                    "media_type": MediaTypes.MOVIE.value,
+                    "source": Sources.TMDB.value,
+                    "image": "http://example.com/image.jpg",
+                }
+                for media_id in range(5)
+            ],
+        }
+
+    @override_settings(SEARCH_PREFETCH_RESULTS=2)
+    @patch("app.providers.services.get_media_metadata")
+    @patch("app.providers.services.search")
+    def test_prefetch_next_page_and_details(self, mock_search, mock_metadata):
+        """Test that the next page and the top results are fetched."""
+        mock_search.return_value = self.response
+
+        result = prefetch_search(MediaTypes.MOVIE.value, "movie", 1)
+
+        mock_search.assert_called_with(MediaTypes.MOVIE.value, "movie", 2, None)
+        self.assertEqual(mock_metadata.call_count, 2)
+        mock_metadata.assert_called_with(
+            MediaTypes.MOVIE.value,
+            "1",
+            Sources.TMDB.value,
+        )
+        self.assertEqual(result, "Prefetched page 2, Movie 0, Movie 1 for movie")
+
+    @patch("app.providers.services.has_spare_budget", return_value=False)
+    @patch("app.providers.services.get_media_metadata")
+    @patch("app.providers.services.search")
+    def test_prefetch_without_budget(self, mock_search, mock_metadata, _):
+        """Test that nothing is fetched when the provider has no budget left."""
+        mock_search.return_value = self.response
+
+        result = prefetch_search(MediaTypes.MOVIE.value, "movie", 1)
+
+        mock_search.assert_called_once()
+        mock_metadata.assert_not_called()
+        self.assertEqual(result, "Prefetched nothing for movie")
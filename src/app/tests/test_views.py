@@ -1,12 +1,17 @@
 import datetime
-from unittest.mock import patch
+import io
+import tempfile
+from unittest.mock import MagicMock, patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
+from PIL import Image
 
+from app import images
 from app.models import (
     TV,
     Anime,
@@ -328,6 +333,114 @@ class MediaSearchViewTests(TestCase):
         # Verify the search function was called with correct parameters
         mock_search.assert_called_once_with(MediaTypes.MOVIE.value, "test", 1, None)
 
+    @patch("app.tasks.prefetch_search.delay")
+    @patch("app.providers.services.search")
+    def test_media_search_prefetch(self, mock_search, mock_prefetch):
+        """Test that the next clicks of a search are prefetched once."""
+        mock_search.return_value = {"page": 1, "total_pages": 1, "results": []}
+        url = reverse("search") + "?media_type=movie&q=prefetch"
+
+        self.client.get(url)
+        self.client.get(url)
+
+        mock_prefetch.assert_called_once_with(
+            MediaTypes.MOVIE.value,
+            "prefetch",
+            1,
+            None,
+        )
+
+    @patch("app.providers.services.search")
+    def test_media_search_federated(self, mock_search):
+        """Test that a federated search loads every source separately."""
+        response = self.client.get(
+            reverse("search") + "?media_type=book&q=dune&source=all",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_search.assert_not_called()
+        self.assertEqual(
+            response.context["federated_sources"],
+            [Sources.HARDCOVER, Sources.OPENLIBRARY],
+        )
+        self.assertContains(response, reverse("federated_search"), count=2)
+
+    @patch("app.providers.services.search")
+    def test_federated_search_dedupes(self, mock_search):
+        """Test that works already shown by another source are left out."""
+        results = {
+            "hardcover": [("Dune", 1965), ("Dune", 1984), ("Dune Messiah", 1969)],
+            "openlibrary": [("DUNE", 1965), ("Dune", 2021), ("Children of Dune", 1976)],
+        }
+
+        def search(media_type, query, page, source):  # noqa: ARG001
+            return {
+                "page": 1,
+                "total_pages": 1,
+                "results": [
+                    {
+                        "media_id": f"{source}_{title}_{year}",
+                        "title": title,
+                        "media_type": MediaTypes.BOOK.value,
+                        "source": source,
+                        "image": "http://example.com/image.jpg",
+                        "year": year,
+                    }
+                    for title, year in results[source]
+                ],
+            }
+
+        mock_search.side_effect = search
+        url = reverse("federated_search") + "?media_type=book&q=dune"
+        search_url = url + "&search_id=" + "a" * 32
+
+        # works sharing a title are kept within a source
+        response = self.client.get(search_url + "&source=hardcover")
+        self.assertEqual(
+            [result["media_id"] for result in response.context["results"]],
+            [
+                "hardcover_Dune_1965",
+                "hardcover_Dune_1984",
+                "hardcover_Dune Messiah_1969",
+            ],
+        )
+
+        response = self.client.get(search_url + "&source=openlibrary")
+        self.assertEqual(
+            [result["media_id"] for result in response.context["results"]],
+            ["openlibrary_Dune_2021", "openlibrary_Children of Dune_1976"],
+        )
+
+        # the source that answered first keeps its results on reloads
+        response = self.client.get(search_url + "&source=hardcover")
+        self.assertEqual(len(response.context["results"]), 3)
+
+        # another search page claims the works again
+        response = self.client.get(
+            url + "&search_id=" + "b" * 32 + "&source=openlibrary",
+        )
+        self.assertEqual(len(response.context["results"]), 3)
+
+        response = self.client.get(search_url + "&source=tmdb")
+        self.assertEqual(response.status_code, 400)
+
+    def test_federated_search_missing_parameters(self):
+        """Test that incomplete federated searches are rejected."""
+        url = reverse("federated_search")
+        search_id = "a" * 32
+
+        for params in (
+            f"?q=dune&source=hardcover&search_id={search_id}",
+            f"?media_type=book&source=hardcover&search_id={search_id}",
+            f"?media_type=book&q=dune&search_id={search_id}",
+            f"?media_type=invalid&q=dune&source=hardcover&search_id={search_id}",
+            "?media_type=book&q=dune&source=hardcover",
+            "?media_type=book&q=dune&source=hardcover&search_id=invalid",
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url + params)
+                self.assertEqual(response.status_code, 400)
+
 
 class MediaDetailsViewTests(TestCase):
     """Test the media details views."""
@@ -442,6 +555,61 @@ class MediaDetailsViewTests(TestCase):
             [1],
         )
 
+    @override_settings(SERVER_TIMING=True)
+    @patch("app.providers.services.get_media_metadata")
+    async def test_media_details_view_async(self, mock_get_metadata):
+        """Test the media details view when served by an ASGI server."""
+        mock_get_metadata.return_value = {
+            "media_id": "238",
+            "title": "Test Movie",
+            "media_type": MediaTypes.MOVIE.value,
+            "source": Sources.TMDB.value,
+            "image": "http://example.com/image.jpg",
+        }
+        await self.async_client.alogin(**self.credentials)
+
+        response = await self.async_client.get(
+            reverse(
+                "media_details",
+                args=[Sources.TMDB.value, MediaTypes.MOVIE.value, "238", "test-movie"],
+            ),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["media"]["title"], "Test Movie")
+        self.assertIn("Server-Timing", response)
+
+    @patch("app.models.Item.fetch_releases")
+    @patch("app.providers.services.get_media_metadata")
+    def test_sync_metadata(self, mock_get_metadata, mock_fetch_releases):
+        """Test syncing the metadata updates the stored item."""
+        Item.objects.create(
+            media_id="238",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="Old Title",
+            image="http://example.com/old.jpg",
+        )
+        mock_get_metadata.return_value = {
+            "title": "The Godfather",
+            "image": "http://example.com/image.jpg",
+        }
+
+        response = self.client.post(
+            reverse(
+                "sync_metadata",
+                args=[Sources.TMDB.value, MediaTypes.MOVIE.value, "238"],
+            ),
+            {"next": "/"},
+            headers={"HX-Request": "true"},
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response["HX-Redirect"], "/")
+        item = Item.objects.get(media_id="238", source=Sources.TMDB.value)
+        self.assertEqual(item.title, "The Godfather")
+        mock_fetch_releases.assert_called_once_with(delay=False)
+
 
 class TrackModalViewTests(TestCase):
     """Test the track modal view."""
@@ -1470,3 +1638,77 @@ class SearchParentViewTests(TestCase):
 
         # Should find no results
         self.assertEqual(len(response.context["results"]), 0)
+
+
+class ImageProxyViewTests(TestCase):
+    """Test the image proxy view."""
+
+    def setUp(self):
+        """Create a user, log in and use a temporary image cache."""
+        self.credentials = {"username": "test", "password": "12345"}
+        self.user = get_user_model().objects.create_user(**self.credentials)
+        self.client.login(**self.credentials)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.enterContext(override_settings(IMAGE_CACHE_ROOT=cache_dir.name))
+
+        self.image_url = "https://image.tmdb.org/t/p/w500/poster.jpg"
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (1000, 1500), "red").save(buffer, "JPEG")
+        self.mock_response = MagicMock()
+        self.mock_response.raw.read.return_value = buffer.getvalue()
+
+    @patch("app.images.requests.get")
+    def test_image_proxy_resizes_once(self, mock_get):
+        """Test that the image is fetched once and resized to the grid size."""
+        mock_get.return_value = self.mock_response
+        url = app_tags.image_url(self.image_url)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        with Image.open(io.BytesIO(b"".join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (300, 450))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        mock_get.assert_called_once()
+
+    def test_image_proxy_invalid_name(self):
+        """Test that only the URLs rendered in our pages are proxied."""
+        url = app_tags.image_url(self.image_url)
+
+        response = self.client.get(url.replace("poster.jpg", "other.jpg"))
+        self.assertEqual(response.status_code, 400)
+
+    @patch("PIL.Image.MAX_IMAGE_PIXELS", 1000)
+    @patch("app.images.requests.get")
+    def test_image_proxy_decompression_bomb(self, mock_get):
+        """Test that images Pillow refuses to decode fall back to the placeholder."""
+        mock_get.return_value = self.mock_response
+
+        response = self.client.get(app_tags.image_url(self.image_url))
+        self.assertRedirects(
+            response,
+            settings.IMG_NONE,
+            fetch_redirect_response=False,
+        )
+
+    @patch("app.images.requests.get")
+    def test_image_proxy_other_host(self, mock_get):
+        """Test that only the images of the providers' CDNs are proxied."""
+        url = "http://127.0.0.1/poster.jpg"
+        self.assertEqual(app_tags.image_url(url), url)
+
+        response = self.client.get(
+            reverse("image_proxy", args=["grid", images.get_image_name(url)]),
+            {"url": url},
+        )
+        self.assertEqual(response.status_code, 400)
+        mock_get.assert_not_called()
+
+    def test_image_url_placeholder(self):
+        """Test that the placeholder image is not proxied."""
+        self.assertEqual(app_tags.image_url(settings.IMG_NONE), settings.IMG_NONE)
@@ -10,6 +10,9 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("medialist/<media_type:media_type>", views.media_list, name="medialist"),
     path("search", views.media_search, name="search"),
+    path("search/source", views.federated_search, name="federated_search"),
+    path("images/<str:size>/<str:name>", views.image_proxy, name="image_proxy"),
+    path("metrics", views.prometheus_metrics, name="prometheus_metrics"),
     path(
         "details/<source:source>/<media_type:media_type>/<str:media_id>/<str:title>",
         views.media_details,
@@ -1,30 +1,53 @@
 import logging
+import re
+import secrets
+from collections import defaultdict
 
+import requests
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.decorators import login_not_required
 from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.db import IntegrityError
 from django.db.models import prefetch_related_objects
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.dateparse import parse_date
 from django.utils.timezone import datetime
 from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
-from app import helpers, history_processor
+from app import (
+    helpers,
+    history_processor,
+    images,
+    media_type_config,
+    metrics,
+    tasks,
+)
 from app import statistics as stats
 from app.forms import EpisodeForm, ManualItemForm, get_form_class
 from app.models import TV, BasicMedia, Item, MediaTypes, Season, Sources, Status
-from app.providers import manual, services, tmdb
+from app.providers import services
+from app.search import title_contains
 from app.templatetags import app_tags
 from users.models import HomeSortChoices, MediaSortChoices, MediaStatusChoices
 
 logger = logging.getLogger(__name__)
 
+FEDERATED_SOURCE = "all"
+
 
 @require_GET
 def home(request):
@@ -158,9 +181,10 @@ def media_list(request, media_type):
 
 
 @require_GET
-def media_search(request):
+async def media_search(request):
     """Return the media search page."""
-    media_type = request.user.update_preference(
+    user = await request.auser()
+    media_type = await sync_to_async(user.update_preference)(
         "last_search_type",
         request.GET["media_type"],
     )
@@ -171,7 +195,20 @@ def media_search(request):
     # only receives source when searching with secondary source
     source = request.GET.get("source")
 
-    data = services.search(media_type, query, page, source)
+    # each source is loaded by its own request and shown as soon as it answers,
+    # the ID of the page scopes the deduplication to the sources of this search
+    if source == FEDERATED_SOURCE:
+        context = {
+            "federated_sources": media_type_config.get_sources(media_type),
+            "search_id": secrets.token_hex(16),
+            "source": source,
+            "media_type": media_type,
+            "layout": layout,
+        }
+        return await sync_to_async(render)(request, "app/search.html", context)
+
+    data = await services.asearch(media_type, query, page, source)
+    await sync_to_async(enqueue_prefetch)(media_type, query, page, source)
 
     context = {
         "data": data,
@@ -180,13 +217,73 @@ def media_search(request):
         "layout": layout,
     }
 
-    return render(request, "app/search.html", context)
+    return await sync_to_async(render)(request, "app/search.html", context)
+
+
+def enqueue_prefetch(media_type, query, page, source):
+    """Prefetch the likely next clicks of a search, once per search page."""
+    if cache.add(f"search_prefetch_{source}_{media_type}_{query}_{page}", 1):
+        tasks.prefetch_search.delay(media_type, query, page, source)
+
+
+@require_GET
+def federated_search(request):
+    """Return the results of one source of a federated search."""
+    media_type = request.GET.get("media_type")
+    query = request.GET.get("q")
+    source = request.GET.get("source")
+    search_id = request.GET.get("search_id", "")
+    layout = request.GET.get("layout", "grid")
+
+    if not query or media_type not in MediaTypes.values:
+        return HttpResponseBadRequest("Invalid search")
+
+    if source not in media_type_config.get_sources(media_type):
+        return HttpResponseBadRequest("Invalid source")
+
+    if not re.fullmatch(r"[0-9a-f]{32}", search_id):
+        return HttpResponseBadRequest("Invalid search")
+
+    try:
+        data = services.search(media_type, query, 1, source)
+    except services.ProviderAPIError as error:
+        logger.warning("Federated search failed for %s: %s", source, error)
+        data = {"results": [], "total_pages": 0}
+        error_message = str(error)
+    else:
+        error_message = None
+        enqueue_prefetch(media_type, query, 1, source)
+
+    context = {
+        "results": services.claim_search_results(
+            search_id,
+            source,
+            data["results"],
+        ),
+        "total_pages": data["total_pages"],
+        "source": Sources(source),
+        "media_type": media_type,
+        "layout": layout,
+        "error": error_message,
+    }
+    return render(request, "app/components/federated_search_results.html", context)
 
 
 @require_GET
-def media_details(request, source, media_type, media_id, title):  # noqa: ARG001 title for URL
+async def media_details(request, source, media_type, media_id, title):  # noqa: ARG001 title for URL
     """Return the details page for a media item."""
-    media_metadata = services.get_media_metadata(media_type, media_id, source)
+    media_metadata = await services.aget_media_metadata(media_type, media_id, source)
+    return await sync_to_async(render_media_details)(
+        request,
+        source,
+        media_type,
+        media_id,
+        media_metadata,
+    )
+
+
+def render_media_details(request, source, media_type, media_id, media_metadata):
+    """Render the details page with the user's tracking of the media."""
     user_medias = BasicMedia.objects.filter_media_prefetch(
         request.user,
         media_id,
@@ -205,14 +302,31 @@ def media_details(request, source, media_type, media_id, title):  # noqa: ARG001
 
 
 @require_GET
-def season_details(request, source, media_id, title, season_number):  # noqa: ARG001 For URL
+async def season_details(request, source, media_id, title, season_number):  # noqa: ARG001 For URL
     """Return the details page for a season."""
-    tv_with_seasons_metadata = services.get_media_metadata(
+    tv_with_seasons_metadata = await services.aget_media_metadata(
         "tv_with_seasons",
         media_id,
         source,
         [season_number],
     )
+    return await sync_to_async(render_season_details)(
+        request,
+        source,
+        media_id,
+        season_number,
+        tv_with_seasons_metadata,
+    )
+
+
+def render_season_details(
+    request,
+    source,
+    media_id,
+    season_number,
+    tv_with_seasons_metadata,
+):
+    """Render the season page with the user's tracking of its episodes."""
     season_metadata = tv_with_seasons_metadata[f"season/{season_number}"]
 
     user_medias = BasicMedia.objects.filter_media_prefetch(
@@ -227,12 +341,12 @@ def season_details(request, source, media_id, title, season_number):  # noqa: AR
     episodes_in_db = current_instance.episodes.all() if current_instance else []
 
     if source == Sources.MANUAL.value:
-        season_metadata["episodes"] = manual.process_episodes(
+        season_metadata["episodes"] = services.get_provider("manual").process_episodes(
             season_metadata,
             episodes_in_db,
         )
     else:
-        season_metadata["episodes"] = tmdb.process_episodes(
+        season_metadata["episodes"] = services.get_provider("tmdb").process_episodes(
             season_metadata,
             episodes_in_db,
         )
@@ -274,7 +388,7 @@ def update_media_score(request, media_type, instance_id):
 
 
 @require_POST
-def sync_metadata(request, source, media_type, media_id, season_number=None):
+async def sync_metadata(request, source, media_type, media_id, season_number=None):
     """Refresh the metadata for a media item."""
     if source == Sources.MANUAL.value:
         msg = "Manual items cannot be synced."
@@ -289,7 +403,7 @@ def sync_metadata(request, source, media_type, media_id, season_number=None):
     if media_type == MediaTypes.SEASON.value:
         cache_key += f"_{season_number}"
 
-    ttl = cache.ttl(cache_key)
+    ttl = await sync_to_async(cache.ttl)(cache_key)
     logger.debug("%s - Cache TTL for: %s", cache_key, ttl)
 
     if ttl is not None and ttl > (settings.CACHE_TIMEOUT - 3):
@@ -297,77 +411,22 @@ def sync_metadata(request, source, media_type, media_id, season_number=None):
         messages.error(request, msg)
         logger.error(msg)
     else:
-        deleted = cache.delete(cache_key)
+        deleted = await cache.adelete(cache_key)
         logger.debug("%s - Old cache deleted: %s", cache_key, deleted)
 
-        metadata = services.get_media_metadata(
+        metadata = await services.aget_media_metadata(
             media_type,
             media_id,
             source,
             [season_number],
         )
-        item, _ = Item.objects.update_or_create(
-            media_id=media_id,
-            source=source,
-            media_type=media_type,
-            season_number=season_number,
-            defaults={
-                "title": metadata["title"],
-                "image": metadata["image"],
-            },
+        title = await sync_to_async(update_synced_items)(
+            source,
+            media_type,
+            media_id,
+            season_number,
+            metadata,
         )
-        title = metadata["title"]
-        if season_number:
-            title += f" - Season {season_number}"
-
-        if media_type == MediaTypes.SEASON.value:
-            metadata["episodes"] = tmdb.process_episodes(
-                metadata,
-                [],
-            )
-
-            # Create a dictionary of existing episodes keyed by episode number
-            existing_episodes = {
-                ep.episode_number: ep
-                for ep in Item.objects.filter(
-                    source=source,
-                    media_type=MediaTypes.EPISODE.value,
-                    media_id=media_id,
-                    season_number=season_number,
-                )
-            }
-
-            episodes_to_update = []
-            episode_count = 0
-
-            for episode_data in metadata["episodes"]:
-                episode_number = episode_data["episode_number"]
-                if episode_number in existing_episodes:
-                    episode_item = existing_episodes[episode_number]
-                    episode_item.title = metadata["title"]
-                    episode_item.image = episode_data["image"]
-                    episodes_to_update.append(episode_item)
-                    episode_count += 1
-
-            logger.info(
-                "Found %s existing episodes to update for %s",
-                episode_count,
-                title,
-            )
-
-            if episodes_to_update:
-                updated_count = Item.objects.bulk_update(
-                    episodes_to_update,
-                    ["title", "image"],
-                    batch_size=100,
-                )
-                logger.info(
-                    "Successfully updated %s episodes for %s",
-                    updated_count,
-                    title,
-                )
-
-        item.fetch_releases(delay=False)
 
         msg = f"{title} was synced to {Sources(source).label} successfully."
         messages.success(request, msg)
@@ -382,6 +441,74 @@ def sync_metadata(request, source, media_type, media_id, season_number=None):
     return helpers.redirect_back(request)
 
 
+def update_synced_items(source, media_type, media_id, season_number, metadata):
+    """Update the stored items and releases with the synced metadata."""
+    item, _ = Item.objects.update_or_create(
+        media_id=media_id,
+        source=source,
+        media_type=media_type,
+        season_number=season_number,
+        defaults={
+            "title": metadata["title"],
+            "image": metadata["image"],
+        },
+    )
+    title = metadata["title"]
+    if season_number:
+        title += f" - Season {season_number}"
+
+    if media_type == MediaTypes.SEASON.value:
+        metadata["episodes"] = services.get_provider("tmdb").process_episodes(
+            metadata,
+            [],
+        )
+
+        # Create a dictionary of existing episodes keyed by episode number
+        existing_episodes = {
+            ep.episode_number: ep
+            for ep in Item.objects.filter(
+                source=source,
+                media_type=MediaTypes.EPISODE.value,
+                media_id=media_id,
+                season_number=season_number,
+            )
+        }
+
+        episodes_to_update = []
+        episode_count = 0
+
+        for episode_data in metadata["episodes"]:
+            episode_number = episode_data["episode_number"]
+            if episode_number in existing_episodes:
+                episode_item = existing_episodes[episode_number]
+                episode_item.title = metadata["title"]
+                episode_item.image = episode_data["image"]
+                episodes_to_update.append(episode_item)
+                episode_count += 1
+
+        logger.info(
+            "Found %s existing episodes to update for %s",
+            episode_count,
+            title,
+        )
+
+        if episodes_to_update:
+            updated_count = Item.objects.bulk_update(
+                episodes_to_update,
+                ["title", "image"],
+                batch_size=100,
+            )
+            logger.info(
+                "Successfully updated %s episodes for %s",
+                updated_count,
+                title,
+            )
+
+    item.fetch_releases(delay=False)
+
+    return title
+
+
 @require_GET
 def track_modal(
     request,
@@ -657,10 +784,10 @@ def search_parent_tv(request):
     )
 
     parent_tvs = TV.objects.filter(
+        title_contains(query, "item__title"),
         user=request.user,
         item__source=Sources.MANUAL.value,
         item__media_type=MediaTypes.TV.value,
-        item__title__icontains=query,
     )[:5]
 
     return render(
@@ -685,10 +812,10 @@ def search_parent_season(request):
     )
 
     parent_seasons = Season.objects.filter(
+        title_contains(query, "item__title"),
         user=request.user,
         item__source=Sources.MANUAL.value,
         item__media_type=MediaTypes.SEASON.value,
-        item__title__icontains=query,
     )[:5]
 
     return render(
@@ -717,10 +844,17 @@ def history_modal(
         episode_number=episode_number,
     )
 
-    total_medias = user_medias.count()
+    # the history of all the entries of the media in a single query
+    history_by_media = defaultdict(list)
+    for record in user_medias.model.history.filter(
+        id__in=user_medias.values("id"),
+    ):
+        history_by_media[record.id].append(record)
+
+    total_medias = len(user_medias)
     timeline_entries = []
     for index, media in enumerate(user_medias, start=1):
-        if history := media.history.all():
+        if history := history_by_media[media.id]:
             media_entry_number = total_medias - index + 1
             timeline_entries.extend(
                 history_processor.process_history_entries(
@@ -836,3 +970,53 @@ def statistics(request):
     }
 
     return render(request, "app/statistics.html", context)
+
+
+@require_GET
+def image_proxy(request, size, name):
+    """Serve a resized copy of a provider's image, cached on disk.
+
+    Nginx serves the cached files directly, this view only generates them.
+    """
+    url = request.GET.get("url", "")
+    if (
+        size not in images.IMAGE_SIZES
+        or not images.is_proxied(url)
+        or not constant_time_compare(name, images.get_image_name(url))
+    ):
+        return HttpResponseBadRequest("Invalid image")
+
+    try:
+        path = images.get_cached_image(url, size)
+    except requests.exceptions.RequestException:
+        logger.warning("Couldn't fetch image %s, redirecting to it", url)
+        return redirect(url)
+    except ValueError:
+        logger.warning("Couldn't process image %s, using the placeholder", url)
+        return redirect(settings.IMG_NONE)
+
+    response = FileResponse(path.open("rb"), content_type="image/webp")
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@login_not_required
+@require_GET
+def prometheus_metrics(request):
+    """Return the request and task metrics for Prometheus to scrape."""
+    if not settings.PROMETHEUS_METRICS or not settings.PROMETHEUS_TOKEN:
+        raise Http404
+
+    authorization = request.headers.get("Authorization", "")
+    if not constant_time_compare(
+        authorization,
+        f"Bearer {settings.PROMETHEUS_TOKEN}",
+    ):
+        response = HttpResponse("Unauthorized", status=401)
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,658 @@
+"""Benchmarks of the slowest code paths on a large synthetic library.
+
+The library is generated in bulk and the providers are stubbed with recorded
+responses, so the results only depend on the database and the code.
+"""
+
+import copy
+import io
+import itertools
+import json
+import logging
+import random
+import subprocess
+import sys
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from app import views
+from app.models import (
+    TV,
+    BasicMedia,
+    Episode,
+    Item,
+    MediaTypes,
+    Movie,
+    Season,
+    Sources,
+    Status,
+)
+from events.models import Event
+from events.notifications import send_releases
+from integrations import exports
+from integrations.imports import (
+    anilist,
+    goodreads,
+    helpers,
+    hltb,
+    imdb,
+    kitsu,
+    mal,
+    simkl,
+    steam,
+    trakt,
+    yamtrack,
+)
+from users.models import HomeSortChoices, MediaSortChoices, MediaStatusChoices
+
+logger = logging.getLogger(__name__)
+
+# Size of the library of each user at scale 1
+LIBRARY_SIZE = {
+    "shows": 5000,
+    "episodes": 100000,
+    "movies": 2000,
+    "history": 20000,
+    "events": 50000,
+}
+SEASONS_PER_SHOW = 2
+BATCH_SIZE = 1000
+
+# Entries of each type in the synthetic Trakt and SIMKL lists
+TRACKER_LIST_SIZE = 100
+
+# What a new web or worker process imports before serving its first request
+STARTUP_SCRIPT = "import django; django.setup(); import config.urls"
+
+# Recorded provider responses, shared with the import tests
+FIXTURES_PATH = settings.BASE_DIR / "integrations" / "tests" / "mock_data"
+
+MEDIA_STATUSES = [
+    Status.IN_PROGRESS.value,
+    Status.COMPLETED.value,
+    Status.COMPLETED.value,
+    Status.PAUSED.value,
+    Status.DROPPED.value,
+]
+
+
+def get_library_size(scale):
+    """Return the number of rows to generate for each user at the given scale."""
+    return {name: max(round(size * scale), 1) for name, size in LIBRARY_SIZE.items()}
+
+
+def generate_library(scale, users=1):
+    """Create users sharing a synthetic library of shows, movies and releases.
+
+    Returns the created users, every one tracking all the items.
+    """
+    size = get_library_size(scale)
+    rng = random.Random(0)  # noqa: S311
+    now = timezone.now()
+
+    shows = size["shows"]
+    seasons = shows * SEASONS_PER_SHOW
+    episodes_per_season = max(size["episodes"] // seasons, 1)
+
+    tv_items = Item.objects.bulk_create(
+        [
+            Item(
+                media_id=str(media_id),
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.TV.value,
+                title=f"Show {media_id}",
+                image=settings.IMG_NONE,
+            )
+            for media_id in range(1, shows + 1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    season_items = Item.objects.bulk_create(
+        [
+            Item(
+                media_id=tv_item.media_id,
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.SEASON.value,
+                title=tv_item.title,
+                image=settings.IMG_NONE,
+                season_number=season_number,
+            )
+            for tv_item in tv_items
+            for season_number in range(1, SEASONS_PER_SHOW + 1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    episode_items = Item.objects.bulk_create(
+        [
+            Item(
+                media_id=season_item.media_id,
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.EPISODE.value,
+                title=season_item.title,
+                image=settings.IMG_NONE,
+                season_number=season_item.season_number,
+                episode_number=episode_number,
+            )
+            for season_item in season_items
+            for episode_number in range(1, episodes_per_season + 1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    movie_items = Item.objects.bulk_create(
+        [
+            Item(
+                media_id=str(media_id),
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.MOVIE.value,
+                title=f"Movie {media_id}",
+                image=settings.IMG_NONE,
+            )
+            for media_id in range(1, size["movies"] + 1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    generate_events(season_items, size["events"], now, rng)
+
+    created_users = []
+    for index in range(users):
+        user = get_user_model().objects.create_user(
+            username=f"benchmark{index}",
+            notification_urls="json://localhost",
+        )
+        generate_media(
+            user,
+            tv_items,
+            season_items,
+            episode_items,
+            movie_items,
+            size["history"],
+            now,
+            rng,
+        )
+        created_users.append(user)
+
+    logger.info(
+        "Generated %s shows, %s episodes and %s movies for %s users",
+        shows,
+        len(episode_items),
+        len(movie_items),
+        users,
+    )
+    return created_users
+
+
+def generate_events(season_items, count, now, rng):
+    """Create the release events of the seasons, around the current date.
+
+    Every hundredth event was released in the last minutes, so that it's
+    included in the release notifications.
+    """
+    events = []
+    for index in range(count):
+        season_item = season_items[index % len(season_items)]
+        if index % 100 == 0:
+            release = now - timedelta(minutes=10)
+        else:
+            release = now + timedelta(days=rng.randint(-180, 180))
+        events.append(
+            Event(
+                item=season_item,
+                content_number=index // len(season_items) + 1,
+                datetime=release,
+            ),
+        )
+    Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+
+
+def generate_media(
+    user,
+    tv_items,
+    season_items,
+    episode_items,
+    movie_items,
+    history,
+    now,
+    rng,
+):
+    """Create the tracked media of a user and its history."""
+
+    def random_date():
+        return now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440))
+
+    tvs = TV.objects.bulk_create(
+        [
+            TV(
+                item=item,
+                user=user,
+                status=rng.choice(MEDIA_STATUSES),
+                score=rng.randint(0, 10),
+            )
+            for item in tv_items
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    seasons = Season.objects.bulk_create(
+        [
+            Season(
+                item=item,
+                user=user,
+                related_tv=tvs[index // SEASONS_PER_SHOW],
+                status=tvs[index // SEASONS_PER_SHOW].status,
+                score=rng.randint(0, 10),
+            )
+            for index, item in enumerate(season_items)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    episodes_per_season = len(episode_items) // len(season_items)
+    episodes = Episode.objects.bulk_create(
+        [
+            Episode(
+                item=item,
+                related_season=seasons[index // episodes_per_season],
+                end_date=random_date(),
+            )
+            for index, item in enumerate(episode_items)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    movies = Movie.objects.bulk_create(
+        [
+            Movie(
+                item=item,
+                user=user,
+                status=rng.choice(MEDIA_STATUSES),
+                score=rng.randint(0, 10),
+                progress=1,
+                end_date=random_date(),
+            )
+            for item in movie_items
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    # spend the history rows on the media in order, until there are none left
+    for model, media in ((Movie, movies), (TV, tvs), (Season, seasons)):
+        objs = media[:history]
+        for obj in objs:
+            obj._history_date = random_date()
+        model.history.bulk_history_create(
+            objs,
+            batch_size=BATCH_SIZE,
+            default_user=user,
+        )
+        history -= len(objs)
+    for episode in episodes[:history]:
+        episode._history_date = episode.end_date
+    Episode.history.bulk_history_create(
+        episodes[:history],
+        batch_size=BATCH_SIZE,
+        default_user=user,
+    )
+
+
+def load_fixture(name):
+    """Return a recorded provider response."""
+    with Path(FIXTURES_PATH / name).open() as file:
+        return json.load(file)
+
+
+def get_stub_id(value):
+    """Return a stable media ID for a search query or an external ID."""
+    return str(zlib.crc32(str(value).encode()))
+
+
+def stub_metadata(media_type, media_id, source, season_numbers=None, *_args):
+    """Return synthetic metadata in the shape returned by the providers."""
+    metadata = {
+        "media_id": str(media_id),
+        "source": source,
+        "media_type": media_type,
+        "title": f"{MediaTypes(media_type).label} {media_id}",
+        "image": settings.IMG_NONE,
+        "max_progress": 10,
+        "details": {},
+        "related": {"seasons": []},
+    }
+    for season_number in season_numbers or []:
+        metadata[f"season/{season_number}"] = {
+            **metadata,
+            "season_number": season_number,
+            "episodes": [
+                {"episode_number": episode_number, "still_path": None}
+                for episode_number in range(1, metadata["max_progress"] + 1)
+            ],
+        }
+    if media_type == MediaTypes.SEASON.value:
+        return metadata[f"season/{season_numbers[0]}"]
+    return metadata
+
+
+def stub_search(media_type, query, page, source=None):  # noqa: ARG001
+    """Return a single synthetic search result for the query."""
+    source = source or Sources.TMDB.value
+    return {
+        "results": [
+            {
+                "media_id": get_stub_id(query),
+                "source": source,
+                "media_type": media_type,
+                "title": query,
+                "image": settings.IMG_NONE,
+            },
+        ],
+    }
+
+
+def stub_find(external_id, external_source):  # noqa: ARG001
+    """Return a TMDB find response matching a movie and a show."""
+    result = {"id": get_stub_id(external_id), "poster_path": None}
+    return {
+        "movie_results": [{**result, "title": external_id}],
+        "tv_results": [{**result, "name": external_id}],
+    }
+
+
+def stub_game(appid, _source):
+    """Return a stable IGDB ID for a Steam game."""
+    return int(get_stub_id(appid))
+
+
+def stub_trakt_entry(media_id, **fields):
+    """Return a synthetic Trakt entry, of a movie for odd IDs else of a show."""
+    media = {"title": f"Trakt {media_id}", "ids": {"tmdb": media_id}}
+    media_type = "movie" if media_id % 2 else "show"
+    return {"type": media_type, media_type: media, **fields}
+
+
+def stub_trakt_response(url):
+    """Return a synthetic page of the Trakt lists of a user."""
+    date = "2024-01-01T12:00:00.000Z"
+    if "page=" in url and "page=1&" not in url:
+        return []
+    if "/history" in url:
+        return [
+            {
+                "type": "episode",
+                "show": {"title": f"Trakt {media_id}", "ids": {"tmdb": media_id}},
+                "episode": {"season": 1, "number": episode_number},
+                "watched_at": date,
+            }
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+            for episode_number in range(1, 11)
+        ] + [
+            {
+                "type": "movie",
+                "movie": {"title": f"Trakt {media_id}", "ids": {"tmdb": media_id}},
+                "watched_at": date,
+            }
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+        ]
+    if "/watchlist" in url:
+        return [
+            stub_trakt_entry(media_id, listed_at=date)
+            for media_id in range(TRACKER_LIST_SIZE + 1, 2 * TRACKER_LIST_SIZE + 1)
+        ]
+    if "/ratings" in url:
+        return [
+            stub_trakt_entry(media_id, rated_at=date, rating=8)
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+        ]
+    return [
+        stub_trakt_entry(
+            media_id,
+            comment={"comment": "Benchmark", "updated_at": date},
+        )
+        for media_id in range(1, TRACKER_LIST_SIZE + 1)
+    ]
+
+
+def stub_simkl_items():
+    """Return a synthetic SIMKL list of shows, movies and anime."""
+    date = "2024-01-01T12:00:00Z"
+    entry = {
+        "status": "completed",
+        "user_rating": 8,
+        "memo": {},
+        "last_watched_at": date,
+    }
+    return {
+        "shows": [
+            {
+                **entry,
+                "show": {"title": f"SIMKL {media_id}", "ids": {"tmdb": media_id}},
+                "seasons": [
+                    {
+                        "number": season_number,
+                        "episodes": [
+                            {"number": episode_number, "watched_at": date}
+                            for episode_number in range(1, 11)
+                        ],
+                    }
+                    for season_number in range(1, SEASONS_PER_SHOW + 1)
+                ],
+            }
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+        ],
+        "movies": [
+            {
+                **entry,
+                "movie": {"title": f"SIMKL {media_id}", "ids": {"tmdb": media_id}},
+            }
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+        ],
+        "anime": [
+            {
+                **entry,
+                "show": {"title": f"SIMKL {media_id}", "ids": {"mal": media_id}},
+                "watched_episodes_count": 10,
+            }
+            for media_id in range(1, TRACKER_LIST_SIZE + 1)
+        ],
+    }
+
+
+def stub_api_request(provider, method, url, *args, **kwargs):  # noqa: ARG001
+    """Return the recorded response of the user lists of the trackers."""
+    if url.endswith(("/animelist", "/mangalist")):
+        media_type = url.rsplit("/", 1)[1].removesuffix("list")
+        return load_fixture(f"import_mal_{media_type}.json")
+    if provider == "ANILIST":
+        return load_fixture("import_anilist.json")
+    if provider == "KITSU":
+        media_type = kwargs["params"]["filter[kind]"]
+        return load_fixture(f"import_kitsu_{media_type}.json")
+    if provider == "STEAM":
+        return load_fixture("import_steam_games.json")
+    if provider == "TRAKT":
+        return stub_trakt_response(url)
+    if provider == "SIMKL":
+        return stub_simkl_items()
+    msg = f"Unexpected {provider} request in benchmark: {method} {url}"
+    raise RuntimeError(msg)
+
+
+@contextmanager
+def stub_providers():
+    """Replace the providers, task queue and notifications with local stubs."""
+    fixtures = {}
+
+    def cached_api_request(provider, method, url, *args, **kwargs):
+        key = (provider, url, json.dumps(kwargs.get("params"), sort_keys=True))
+        if key not in fixtures:
+            fixtures[key] = stub_api_request(provider, method, url, *args, **kwargs)
+        return copy.deepcopy(fixtures[key])
+
+    def skip_task(*_args, **_kwargs):
+        return None
+
+    stubs = {
+        "app.providers.services.get_media_metadata": stub_metadata,
+        "app.providers.services.search": stub_search,
+        "app.providers.services.api_request": cached_api_request,
+        "app.providers.tmdb.find": stub_find,
+        "app.providers.tmdb.movie": lambda media_id: stub_metadata(
+            MediaTypes.MOVIE.value,
+            media_id,
+            Sources.TMDB.value,
+        ),
+        "app.providers.tmdb.tv_with_seasons": lambda media_id, seasons: stub_metadata(
+            MediaTypes.TV.value,
+            media_id,
+            Sources.TMDB.value,
+            seasons,
+        ),
+        "app.providers.mal.anime": lambda media_id: stub_metadata(
+            MediaTypes.ANIME.value,
+            media_id,
+            Sources.MAL.value,
+        ),
+        "app.providers.igdb.external_game": stub_game,
+        "events.tasks.reload_calendar.delay": skip_task,
+        "events.tasks.reload_calendar.apply_async": skip_task,
+        "events.tasks.reload_calendar_items.apply_async": skip_task,
+        "apprise.Apprise.notify": lambda *_args, **_kwargs: True,
+    }
+    with ExitStack() as stack:
+        for target, stub in stubs.items():
+            stack.enter_context(patch(target, stub))
+        # the Steam importer refuses to start without an API key
+        stack.enter_context(override_settings(STEAM_API_KEY="benchmark"))
+        yield
+
+
+def get_benchmarks(user):
+    """Return the benchmarked functions by name, with their setup functions."""
+    factory = RequestFactory()
+    today = timezone.localdate()
+    new_users = (f"benchmark_import{index}" for index in itertools.count())
+    export_content = "".join(exports.generate_rows(user)).encode()
+
+    def media_list(media_type):
+        queryset = BasicMedia.objects.get_media_list(
+            user,
+            media_type,
+            MediaStatusChoices.ALL,
+            MediaSortChoices.SCORE,
+        )
+        page = Paginator(queryset, 32).get_page(1)
+        BasicMedia.objects.annotate_max_progress(page.object_list, media_type)
+
+    def statistics():
+        request = factory.get("/statistics")
+        request.user = user
+        views.statistics(request)
+
+    def reset_notifications():
+        Event.objects.filter(notification_sent=True).update(notification_sent=False)
+
+    def import_file(importer, content):
+        def run():
+            new_user = get_user_model().objects.create_user(username=next(new_users))
+            importer(io.BytesIO(content), new_user, "new")
+
+        return run
+
+    def import_account(importer, account="benchmark", **kwargs):
+        def run():
+            new_user = get_user_model().objects.create_user(username=next(new_users))
+            importer(account, new_user, "new", **kwargs)
+
+        return run
+
+    def read_fixture(name):
+        return Path(FIXTURES_PATH / name).read_bytes()
+
+    def startup():
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR,
+            check=True,
+        )
+
+    return {
+        "startup": (startup, None),
+        "media_list_tv": (lambda: media_list(MediaTypes.TV.value), None),
+        "media_list_movie": (lambda: media_list(MediaTypes.MOVIE.value), None),
+        "in_progress": (
+            lambda: BasicMedia.objects.get_in_progress(
+                user,
+                HomeSortChoices.UPCOMING,
+                14,
+            ),
+            None,
+        ),
+        "user_events": (
+            lambda: list(
+                Event.objects.get_user_events(
+                    user,
+                    today - timedelta(days=30),
+                    today + timedelta(days=90),
+                ),
+            ),
+            None,
+        ),
+        "statistics": (statistics, None),
+        "send_releases": (send_releases, reset_notifications),
+        "export": (lambda: "".join(exports.generate_rows(user)), None),
+        "import_yamtrack": (import_file(yamtrack.importer, export_content), None),
+        "import_goodreads": (
+            import_file(goodreads.importer, read_fixture("import_goodreads.csv")),
+            None,
+        ),
+        "import_hltb": (
+            import_file(hltb.importer, read_fixture("import_hltb_game.csv")),
+            None,
+        ),
+        "import_imdb": (
+            import_file(imdb.importer, read_fixture("import_imdb.csv")),
+            None,
+        ),
+        "import_mal": (import_account(mal.importer), None),
+        "import_anilist": (import_account(anilist.importer), None),
+        "import_kitsu": (import_account(kitsu.importer, "1"), None),
+        "import_trakt": (
+            import_account(trakt.importer, None, username="benchmark"),
+            None,
+        ),
+        "import_simkl": (
+            import_account(simkl.importer, helpers.encrypt("benchmark")),
+            None,
+        ),
+        "import_steam": (import_account(steam.importer), None),
+    }
+
+
+def run_benchmark(func, setup=None, repeat=3):
+    """Return the best duration in seconds of several runs of the function."""
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def find_regressions(results, baseline, threshold):
+    """Return the benchmarks slower than the baseline by more than the threshold.
+
+    The regressions are returned by name, with the baseline and new durations.
+    """
+    return {
+        name: (baseline[name], duration)
+        for name, duration in results.items()
+        if name in baseline and duration > baseline[name] * (1 + threshold)
+    }
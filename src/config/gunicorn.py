@@ -0,0 +1,53 @@
+"""Gunicorn configuration, sized from the available CPUs.
+
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import os
+
+from decouple import config
+
+
+def get_cpu_count():
+    """Return the number of CPUs this process can run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+# Requests mostly wait on the database and the providers' APIs,
+# threads let a worker serve other users meanwhile
+workers = config("WEB_WORKERS", default=min(get_cpu_count() + 1, 4), cast=int)
+threads = config("WEB_THREADS", default=4, cast=int)
+
+# With ASGI the async views wait on the providers in the event loop, but Django
+# runs the sync views and the database and template work of the async views on
+# a single shared thread per worker. Only `workers` of those run at once instead
+# of workers x threads with gthread, so ASGI only pays off when most of the time
+# is spent waiting on the providers, and it scales with WEB_WORKERS alone.
+if config("WEB_ASGI", default=False, cast=bool):
+    if config("WEB_THREADS", default=None) is not None:
+        msg = "WEB_THREADS has no effect with WEB_ASGI, set WEB_WORKERS instead"
+        raise ValueError(msg)
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread" if threads > 1 else "sync"
+
+bind = "localhost:8001"
+preload_app = True
+timeout = 200
+max_requests = 500
+max_requests_jitter = 10
+
+
+def post_fork(server, worker):  # noqa: ARG001
+    """Drop the database connections inherited from the preloaded app."""
+    from django.db import connections  # noqa: PLC0415
+
+    for connection in connections.all():
+        connection.close()
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
@@ -17,6 +17,7 @@ from decouple import (
     undefined,
 )
 from django.core.cache import CacheKeyWarning
+from kombu import Queue
 
 BASE_URL = config("BASE_URL", default=None)
 if BASE_URL:
@@ -128,6 +129,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "app.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -186,7 +188,12 @@ if config("DB_HOST", default=None):
             "PASSWORD": config("DB_PASSWORD", default=secret("DB_PASSWORD_FILE")),
             "PORT": config("DB_PORT"),
             "OPTIONS": {
-                "pool": True,
+                # every thread of a web server worker can hold a connection,
+                # under ASGI the queries of a worker share a single thread
+                "pool": {
+                    "min_size": 1,
+                    "max_size": config("WEB_THREADS", default=4, cast=int),
+                },
             },
         },
     }
@@ -218,7 +225,7 @@ CACHES = {
         "TIMEOUT": CACHE_TIMEOUT,
         "VERSION": 10,
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "CLIENT_CLASS": "app.metrics.InstrumentedRedisClient",
         },
     },
 }
@@ -322,8 +329,35 @@ TZ = zoneinfo.ZoneInfo(TIME_ZONE)
 IMG_NONE = "https://www.themoviedb.org/assets/2/v4/glyphicons/basic/glyphicons-basic-38-picture-grey-c2ebdbb057f2a7614185931650f8cee23fa137b93812ccb132b9df511df1cfac.svg"
 
 REQUEST_TIMEOUT = 120  # seconds
+
+# Search results whose details are fetched in the background after a search
+SEARCH_PREFETCH_RESULTS = config("SEARCH_PREFETCH_RESULTS", default=3, cast=int)
+
+# Items whose tracking changed within this window are refreshed in a single task
+FETCH_RELEASES_DEBOUNCE = config("FETCH_RELEASES_DEBOUNCE", default=60, cast=int)
+
+# Preferences changed from GET parameters are saved in one write after this delay
+PREFERENCES_FLUSH_DELAY = config("PREFERENCES_FLUSH_DELAY", default=10, cast=int)
+
+# Resize posters from the providers' CDNs once, nginx serves them from disk
+IMAGE_PROXY = config("IMAGE_PROXY", default=True, cast=bool)
+IMAGE_CACHE_ROOT = BASE_DIR / "db" / "images"
 PER_PAGE = 24
 
+# Add the database, Redis and provider timings of requests to their responses
+SERVER_TIMING = config("SERVER_TIMING", default=DEBUG, cast=bool)
+
+# Expose request, task and provider counters at /metrics for Prometheus,
+# scrapers must send the token as "Authorization: Bearer <token>"
+PROMETHEUS_METRICS = config("PROMETHEUS_METRICS", default=False, cast=bool)
+PROMETHEUS_TOKEN = config(
+    "PROMETHEUS_TOKEN",
+    default=secret("PROMETHEUS_TOKEN_FILE", default=""),
+)
+
+# Concurrent provider lookups per import, still bound by the shared rate limiter
+IMPORT_LOOKUP_WORKERS = config("IMPORT_LOOKUP_WORKERS", default=5, cast=int)
+
 TMDB_API = config(
     "TMDB_API",
     default=secret(
@@ -455,12 +489,34 @@ CELERY_BROKER_URL = REDIS_URL
 CELERY_TIMEZONE = TIME_ZONE
 
 CELERY_WORKER_HIJACK_ROOT_LOGGER = False
-CELERY_WORKER_CONCURRENCY = 1
+CELERY_WORKER_CONCURRENCY = config("CELERY_WORKER_CONCURRENCY", default=1, cast=int)
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 1
 CELERY_BEAT_SYNC_EVERY = 1
 
+# Imports can run for hours, keep them away from notifications and calendar tasks
+IMPORTS_QUEUE = "imports"
+# Cache warming after searches, only consumed when the default queue is empty
+PREFETCH_QUEUE = "prefetch"
+CELERY_TASK_DEFAULT_QUEUE = "celery"
+CELERY_TASK_QUEUES = (
+    Queue(CELERY_TASK_DEFAULT_QUEUE),
+    Queue(IMPORTS_QUEUE),
+    Queue(PREFETCH_QUEUE),
+)
+CELERY_TASK_ROUTES = {
+    "Import from *": {"queue": IMPORTS_QUEUE},
+    "Prefetch search": {"queue": PREFETCH_QUEUE},
+}
+
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 60 * 60 * 6  # 6 hours
+# Trakt and SIMKL imports are acknowledged late so they are redelivered if the
+# worker dies, don't redeliver them while they can still be running
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": CELERY_TASK_TIME_LIMIT,
+    # workers consume their queues in the order given by --queues
+    "queue_order_strategy": "priority",
+}
 
 CELERY_RESULT_EXTENDED = True
 CELERY_RESULT_BACKEND = "django-db"
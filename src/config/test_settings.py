@@ -8,6 +8,7 @@ CACHES = {
         "LOCATION": REDIS_URL,  # noqa: F405
         "TIMEOUT": 18000,  # 5 hours
         "OPTIONS": {
+            "CLIENT_CLASS": "app.metrics.InstrumentedRedisClient",
             "CONNECTION_POOL_KWARGS": {"connection_class": FakeConnection},
         },
     },
@@ -19,3 +20,6 @@ TESTING = True
 
 # Steam API key for testing
 STEAM_API_KEY = "test_steam_api_key"
+
+# Run import lookups sequentially so mocked providers are called in order
+IMPORT_LOOKUP_WORKERS = 1
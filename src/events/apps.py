@@ -12,8 +12,14 @@ class EventsConfig(AppConfig):
 
     def ready(self):
         """Run when the app is ready."""
-        # Disable the reload_calendar task when testing
+        import events.signals  # noqa: F401, PLC0415
+
+        # Disable the reload_calendar tasks when testing
         if settings.TESTING:
-            from events.tasks import reload_calendar  # noqa: PLC0415
+            from events.tasks import (  # noqa: PLC0415
+                reload_calendar,
+                reload_calendar_items,
+            )
 
             reload_calendar.delay = MagicMock()
+            reload_calendar_items.apply_async = MagicMock()
@@ -3,19 +3,26 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import requests
+from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Exists, OuterRef, Q, Subquery
 from django.utils import timezone
+from django_redis import get_redis_connection
 
+import events
 from app import media_type_config
 from app.models import Item, MediaTypes, Sources
-from app.providers import comicvine, services, tmdb
+from app.providers import services
+from events import feed
 from events.models import Event, SentinelDatetime
 
 logger = logging.getLogger(__name__)
 
+MAX_DEFERRALS = 3
+QUEUED_ITEMS_KEY = "fetch_releases_queued"
 
-def fetch_releases(user=None, items_to_process=None):
+
+def fetch_releases(user=None, items_to_process=None, deferrals=0):
     """Fetch and process releases for the calendar."""
     if items_to_process and items_to_process[0].source == Sources.MANUAL.value:
         return "Manual sources are not processed"
@@ -24,30 +31,145 @@ def fetch_releases(user=None, items_to_process=None):
     if not items_to_process:
         return "No items to process"
 
-    events_bulk = process_items(items_to_process)
+    events_bulk, items_failed = process_items(items_to_process)
     items_updated = save_events(events_bulk)
     cleanup_invalid_events(events_bulk)
 
-    return generate_final_message(items_to_process, items_updated)
+    message = generate_final_message(items_to_process, items_updated)
+
+    items_deferred = defer_unavailable_items(items_failed, deferrals)
+    if items_deferred:
+        message += (
+            f"\n\nRescheduled {len(items_deferred)} items, "
+            "their provider is temporarily unavailable."
+        )
+
+    return message
+
+
+def queue_release_refresh(item):
+    """Queue the item for the next refresh, at most one is scheduled per window."""
+    delay = settings.FETCH_RELEASES_DEBOUNCE
+    get_redis_connection("default").sadd(QUEUED_ITEMS_KEY, item.id)
+
+    if cache.add(f"{QUEUED_ITEMS_KEY}_scheduled", 1, delay):
+        events.tasks.reload_calendar_items.apply_async(countdown=delay)
+
+
+def pop_queued_items():
+    """Return and clear the items queued for a refresh."""
+    # items queued from now on schedule their own refresh
+    cache.delete(f"{QUEUED_ITEMS_KEY}_scheduled")
+
+    pipeline = get_redis_connection("default").pipeline()
+    pipeline.smembers(QUEUED_ITEMS_KEY)
+    pipeline.delete(QUEUED_ITEMS_KEY)
+    item_ids, _ = pipeline.execute()
+
+    items = Item.objects.filter(id__in=[int(item_id) for item_id in item_ids])
+    return get_release_items(items.exclude(source=Sources.MANUAL.value))
+
+
+def get_release_items(items):
+    """Return the items to process, seasons are processed through their TV show.
+
+    Seasons whose TV show can't be fetched are queued again for the next
+    refresh, without holding back the other items.
+    """
+    release_items = {}
+    for item in items:
+        try:
+            release_item = (
+                get_tv_item(item)
+                if item.media_type == MediaTypes.SEASON.value
+                else item
+            )
+        except services.ProviderAPIError:
+            logger.warning("Couldn't get the TV show of %s, queued again", item)
+            queue_release_refresh(item)
+            continue
+        release_items[release_item.id] = release_item
+
+    return list(release_items.values())
+
+
+def get_tv_item(season_item):
+    """Get or create the TV item of a season."""
+    try:
+        return Item.objects.get(
+            media_id=season_item.media_id,
+            source=season_item.source,
+            media_type=MediaTypes.TV.value,
+        )
+    except Item.DoesNotExist:
+        tv_metadata = services.get_media_metadata(
+            MediaTypes.TV.value,
+            season_item.media_id,
+            season_item.source,
+        )
+        tv_item = Item.objects.create(
+            media_id=season_item.media_id,
+            source=season_item.source,
+            media_type=MediaTypes.TV.value,
+            title=tv_metadata["title"],
+            image=tv_metadata["image"],
+        )
+        logger.info("Created TV item %s for season %s", tv_item, season_item)
+        return tv_item
+
+
+def defer_unavailable_items(items, deferrals):
+    """Reschedule the failed items whose provider is unavailable, instead of waiting."""
+    if deferrals >= MAX_DEFERRALS:
+        return []
+
+    items_deferred = []
+    countdown = 0
+    for item in items:
+        retry_after = services.get_unavailable_time(item.source)
+        if retry_after:
+            items_deferred.append(item)
+            countdown = max(countdown, retry_after)
+
+    if items_deferred:
+        logger.info(
+            "Rescheduling %d items in %s seconds",
+            len(items_deferred),
+            countdown,
+        )
+        events.tasks.reload_calendar.apply_async(
+            kwargs={"items_to_process": items_deferred, "deferrals": deferrals + 1},
+            countdown=countdown,
+        )
+
+    return items_deferred
 
 
 def process_items(items_to_process):
-    """Process items and categorize them."""
+    """Process items and categorize them.
+
+    Return the events and the items whose provider couldn't be reached.
+    """
     events_bulk = []
     anime_to_process = []
+    items_failed = []
 
     for item in items_to_process:
         if item.media_type == MediaTypes.ANIME.value:
             anime_to_process.append(item)
-        elif item.media_type == MediaTypes.TV.value:
-            process_tv(item, events_bulk)
+            continue
+
+        if item.media_type == MediaTypes.TV.value:
+            fetched = process_tv(item, events_bulk)
         elif item.media_type == MediaTypes.COMIC.value:
-            process_comic(item, events_bulk)
+            fetched = process_comic(item, events_bulk)
         else:
-            process_other(item, events_bulk)
+            fetched = process_other(item, events_bulk)
+        if not fetched:
+            items_failed.append(item)
 
-    process_anime_bulk(anime_to_process, events_bulk)
-    return events_bulk
+    items_failed.extend(process_anime_bulk(anime_to_process, events_bulk))
+    return events_bulk, items_failed
 
 
 def save_events(events_bulk):
@@ -101,6 +223,9 @@ def save_events(events_bulk):
     if to_update:
         Event.objects.bulk_update(to_update, ["datetime"])
 
+    if to_create or to_update:
+        feed.mark_events_changed()
+
     logger.info(
         "Successfully processed %d events (%d created, %d updated)",
         len(events_bulk),
@@ -165,6 +290,7 @@ def cleanup_invalid_events(events_bulk):
 
     if events_to_delete:
         deleted_count = Event.objects.filter(id__in=events_to_delete).delete()[0]
+        feed.mark_events_changed()
         logger.info("Deleted %s invalid events for updated items", deleted_count)
 
 
@@ -277,9 +403,13 @@ def get_tv_items_to_include(tv_items, now, sentinel_datetime):
 
 
 def process_anime_bulk(items, events_bulk):
-    """Process multiple anime items and add events to the event list."""
+    """Process multiple anime items and add events to the event list.
+
+    Return the anime not found in AniList whose provider couldn't be reached.
+    """
+    items_failed = []
     if not items:
-        return
+        return items_failed
 
     anime_data = get_anime_schedule_bulk([item.media_id for item in items])
 
@@ -306,7 +436,10 @@ def process_anime_bulk(items, events_bulk):
                 item.title,
                 item.media_id,
             )
-            process_other(item, events_bulk)
+            if not process_other(item, events_bulk):
+                items_failed.append(item)
+
+    return items_failed
 
 
 def get_anime_schedule_bulk(media_ids):
@@ -399,6 +532,8 @@ def process_tv(tv_item, events_bulk):
     Only processes:
     1. Seasons with no events
     2. Currently airing seasons (identified by next_episode_season)
+
+    Return False if the provider couldn't be reached, True otherwise.
     """
     logger.info("Processing TV show: %s", tv_item)
 
@@ -408,7 +543,7 @@ def process_tv(tv_item, events_bulk):
 
         if not seasons_to_process:
             logger.info("%s - No seasons need processing", tv_item)
-            return
+            return True
 
         # Fetch and process season data
         process_tv_seasons(tv_item, seasons_to_process, events_bulk)
@@ -418,13 +553,15 @@ def process_tv(tv_item, events_bulk):
             "Failed to fetch metadata for %s",
             tv_item,
         )
+        return False
     except Exception:
         logger.exception("Error processing %s", tv_item)
+    return True
 
 
 def get_seasons_to_process(tv_item):
     """Identify which seasons of a TV show need to be processed."""
-    tv_metadata = tmdb.tv(tv_item.media_id)
+    tv_metadata = services.get_provider("tmdb").tv(tv_item.media_id)
 
     if not tv_metadata.get("related", {}).get("seasons"):
         logger.warning("No seasons found for TV show: %s", tv_item)
@@ -477,7 +614,7 @@ def get_seasons_to_process(tv_item):
 def process_tv_seasons(tv_item, seasons_to_process, events_bulk):
     """Process specific seasons of a TV show."""
     # Fetch detailed data for seasons to process
-    process_seasons_data = tmdb.tv_with_seasons(
+    process_seasons_data = services.get_provider("tmdb").tv_with_seasons(
         tv_item.media_id,
         seasons_to_process,
     )
@@ -655,7 +792,10 @@ def get_tvmaze_response(tvdb_id):
 
 
 def process_comic(item, events_bulk):
-    """Process comic item and add events to the event list."""
+    """Process comic item and add events to the event list.
+
+    Return False if the provider couldn't be reached, True otherwise.
+    """
     logger.info("Fetching releases for %s", item)
     try:
         metadata = services.get_media_metadata(
@@ -668,15 +808,17 @@ def process_comic(item, events_bulk):
             "Failed to fetch metadata for %s",
             item,
         )
+        return False
 
     # get latest event
     latest_event = Event.objects.filter(item=item).order_by("-datetime").first()
     last_issue_event_number = latest_event.content_number if latest_event else 0
     last_published_issue_number = metadata["max_progress"]
     if last_issue_event_number == last_published_issue_number:
-        return
+        return True
 
     # add latest issue
+    comicvine = services.get_provider("comicvine")
     try:
         issue_metadata = comicvine.issue(metadata["last_issue_id"])
     except services.ProviderAPIError:
@@ -684,14 +826,14 @@ def process_comic(item, events_bulk):
             "Failed to fetch issue metadata for %s",
             item,
         )
-        return
+        return False
 
     if issue_metadata["store_date"]:
         issue_datetime = date_parser(issue_metadata["store_date"])
     elif issue_metadata["cover_date"]:
         issue_datetime = date_parser(issue_metadata["cover_date"])
     else:
-        return
+        return True
 
     events_bulk.append(
         Event(
@@ -700,10 +842,14 @@ def process_comic(item, events_bulk):
             datetime=issue_datetime,
         ),
     )
+    return True
 
 
 def process_other(item, events_bulk):
-    """Process other types of items and add events to the event list."""
+    """Process other types of items and add events to the event list.
+
+    Return False if the provider couldn't be reached, True otherwise.
+    """
     logger.info("Fetching releases for %s", item)
     try:
         metadata = services.get_media_metadata(
@@ -716,7 +862,7 @@ def process_other(item, events_bulk):
             "Failed to fetch metadata for %s",
             item,
         )
-        return
+        return False
 
     date_key = media_type_config.get_date_key(item.media_type)
 
@@ -749,6 +895,7 @@ def process_other(item, events_bulk):
                 datetime=content_datetime,
             ),
         )
+    return True
 
 
 def date_parser(date_str):
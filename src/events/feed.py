@@ -0,0 +1,90 @@
+import hashlib
+import time
+from datetime import UTC, timedelta
+
+import icalendar
+from django.core.cache import cache
+from django.utils import timezone
+
+from events.models import Event
+
+# Releases included in the feed, relative to today
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 90
+
+# Upper bound, the feed is also rebuilt when the window moves to a new day
+FEED_TIMEOUT = 60 * 60 * 24
+
+EVENTS_CHANGED_KEY = "calendar_events_changed"
+
+
+def get_tracking_changed_key(user_id):
+    """Return the cache key with the time the user's tracking last changed."""
+    return f"calendar_tracking_changed_{user_id}"
+
+
+def mark_events_changed():
+    """Record that release events were created, updated or deleted."""
+    cache.set(EVENTS_CHANGED_KEY, time.time_ns(), timeout=None)
+
+
+def mark_tracking_changed(user_id):
+    """Record that the media or preferences of the user changed."""
+    cache.set(get_tracking_changed_key(user_id), time.time_ns(), timeout=None)
+
+
+def get_etag(user_id):
+    """Return the version of the user's feed, from the time of the last changes.
+
+    A change time missing from the cache is reset to now, so a flushed cache
+    can only cause a rebuild and never an outdated feed.
+    """
+    tracking_key = get_tracking_changed_key(user_id)
+    changed = cache.get_many([EVENTS_CHANGED_KEY, tracking_key])
+    for key in (EVENTS_CHANGED_KEY, tracking_key):
+        if key not in changed:
+            changed[key] = time.time_ns()
+            cache.add(key, changed[key], timeout=None)
+
+    version = (
+        f"{user_id}:{changed[EVENTS_CHANGED_KEY]}:{changed[tracking_key]}:"
+        f"{timezone.localdate().isoformat()}"
+    )
+    return hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_calendar(user, etag):
+    """Return the serialized iCalendar feed of the user, cached by version."""
+    cache_key = f"calendar_feed_{user.id}"
+    cached = cache.get(cache_key)
+    if cached and cached[0] == etag:
+        return cached[1]
+
+    content = build_calendar(user)
+    cache.set(cache_key, (etag, content), FEED_TIMEOUT)
+    return content
+
+
+def build_calendar(user):
+    """Build the iCalendar feed with the user's recent and upcoming releases."""
+    now = timezone.now()
+    start_date = now.date() - timedelta(days=FEED_PAST_DAYS)
+    end_date = now.date() + timedelta(days=FEED_FUTURE_DAYS)
+
+    releases = Event.objects.get_user_events(user, start_date, end_date)
+
+    cal = icalendar.Calendar()
+    cal.add("prodid", "-//Yamtrack//EN")
+    cal.add("version", "2.0")
+
+    for release in releases:
+        cal_event = icalendar.Event()
+        cal_event.add("uid", release.id)
+        cal_event.add("summary", str(release))
+        dt_tz_aware = release.datetime.replace(tzinfo=UTC)
+        cal_event.add("dtstart", dt_tz_aware)
+        cal_event.add("dtend", dt_tz_aware)
+        cal_event.add("dtstamp", now)
+        cal.add_component(cal_event)
+
+    return cal.to_ical()
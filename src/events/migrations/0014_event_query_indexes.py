@@ -0,0 +1,26 @@
+# Generated by Django 5.2.2 on 2026-10-18 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0053_media_query_indexes'),
+        ('events', '0013_delete_single_anime_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['item', 'datetime'], name='event_item_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['datetime'], name='event_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('notification_sent', False)), fields=['datetime'], name='event_unsent_datetime_idx'),
+        ),
+    ]
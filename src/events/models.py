@@ -1,13 +1,13 @@
 from datetime import UTC, datetime
 
+from django.apps import apps
 from django.db import models
 from django.db.models import (
     Case,
+    Exists,
     IntegerField,
-    Min,
     OuterRef,
     Q,
-    Subquery,
     UniqueConstraint,
     Value,
     When,
@@ -49,97 +49,70 @@ class EventManager(models.Manager):
             datetime.combine(last_day, datetime.max.time()),
         )
 
-        enabled_types = user.get_enabled_media_types()
-        non_tv_types = [
-            media_type
-            for media_type in enabled_types
-            if media_type not in [MediaTypes.TV.value, MediaTypes.SEASON.value]
-        ]
-
-        # Build base query for non-TV media types
-        user_query = Q()
-        active_status_query = Q()
-
-        for media_type in non_tv_types:
-            user_query |= Q(**{f"item__{media_type}__user": user})
-            active_status_query &= ~Q(
-                **{f"item__{media_type}__status__in": INACTIVE_TRACKING_STATUSES},
-            )
-
-        tv_query = self._build_tv_query(user, enabled_types)
-        combined_query = (user_query & active_status_query) | tv_query
+        tracked_query = self.tracked_by(user)
+        if not tracked_query:
+            return self.none()
 
         queryset = self.filter(
-            combined_query,
+            tracked_query,
             datetime__gte=start_datetime,
             datetime__lte=end_datetime,
         ).select_related("item")
 
         return self.sort_with_sentinel_last(queryset)
 
-    def _build_tv_query(self, user, enabled_types):
-        """Build query for TV shows based on TV status and season statuses."""
-        if not (
-            MediaTypes.TV.value in enabled_types
-            or MediaTypes.SEASON.value in enabled_types
-        ):
-            return Q()
+    def tracked_by(self, user):
+        """Return a filter for the events of the items actively tracked by the user.
 
-        # Get active TV shows
-        active_tv_shows = (
-            TV.objects.filter(
-                user=user,
-                item__media_type=MediaTypes.TV.value,
-            )
-            .exclude(
-                status__in=INACTIVE_TRACKING_STATUSES,
-            )
-            .values_list("item__media_id", flat=True)
-        )
+        Every enabled media type adds one subquery of the user's item ids, so
+        the SQL doesn't grow with the size of the library.
+        """
+        enabled_types = user.get_enabled_media_types()
 
-        if not active_tv_shows:
-            return Q()
+        query = Q()
+        for media_type in enabled_types:
+            if media_type in (MediaTypes.TV.value, MediaTypes.SEASON.value):
+                continue
 
-        # Subquery to find the first season with inactive status for each TV show
-        first_dropped_seasons = (
-            Season.objects.filter(
-                user=user,
-                item__media_id=OuterRef("media_id"),
-                status__in=INACTIVE_TRACKING_STATUSES,
+            model = apps.get_model(app_label="app", model_name=media_type)
+            tracked_items = (
+                model.objects.filter(user=user)
+                .exclude(status__in=INACTIVE_TRACKING_STATUSES)
+                .values("item_id")
             )
-            .values("item__media_id")
-            .annotate(min_season=Min("item__season_number"))
-            .values("min_season")
-        )
+            query |= Q(item_id__in=tracked_items)
 
-        # Get all media_ids and their first dropped season numbers
-        dropped_seasons = (
-            Item.objects.filter(
-                media_id__in=active_tv_shows,
-                media_type=MediaTypes.SEASON.value,
-            )
-            .annotate(
-                first_dropped_season=Subquery(first_dropped_seasons),
-            )
-            .filter(first_dropped_season__isnull=False)
-            .values_list("media_id", "first_dropped_season")
+        if (
+            MediaTypes.TV.value in enabled_types
+            or MediaTypes.SEASON.value in enabled_types
+        ):
+            query |= self._tracked_seasons_query(user)
+
+        return query
+
+    def _tracked_seasons_query(self, user):
+        """Build the filter for the seasons of the user's active TV shows.
+
+        Seasons from the first inactive one onwards are not tracked.
+        """
+        active_tv = TV.objects.filter(
+            user=user,
+            item__media_id=OuterRef("item__media_id"),
+            item__source=OuterRef("item__source"),
+        ).exclude(status__in=INACTIVE_TRACKING_STATUSES)
+
+        earlier_inactive_season = Season.objects.filter(
+            user=user,
+            item__media_id=OuterRef("item__media_id"),
+            item__source=OuterRef("item__source"),
+            item__season_number__lte=OuterRef("item__season_number"),
+            status__in=INACTIVE_TRACKING_STATUSES,
         )
 
-        # Build exclusion query
-        exclude_query = Q()
-        for media_id, first_dropped_season in dropped_seasons:
-            exclude_query |= Q(
-                item__media_type=MediaTypes.SEASON.value,
-                item__media_id=media_id,
-                item__season_number__gte=first_dropped_season,
-            )
-
-        return (
-            Q(
-                item__media_type=MediaTypes.SEASON.value,
-                item__media_id__in=active_tv_shows,
-            )
-            & ~exclude_query
+        return Q(
+            Exists(active_tv),
+            ~Exists(earlier_inactive_season),
+            item__media_type=MediaTypes.SEASON.value,
         )
 
     def sort_with_sentinel_last(self, queryset):
@@ -196,6 +169,18 @@ class Event(models.Model):
                 name="unique_item_null_content_number",
             ),
         ]
+        indexes = [
+            # releases of the tracked items in the calendar range
+            models.Index(fields=["item", "datetime"], name="event_item_datetime_idx"),
+            # releases of all the items, for the daily digest
+            models.Index(fields=["datetime"], name="event_datetime_idx"),
+            # recent releases still to be notified
+            models.Index(
+                fields=["datetime"],
+                condition=Q(notification_sent=False),
+                name="event_unsent_datetime_idx",
+            ),
+        ]
 
     def __str__(self):
         """Return event title."""
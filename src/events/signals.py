@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.models import Media
+from events import feed
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_calendar_feed(sender, instance, **kwargs):  # noqa: ARG001
+    """Invalidate the calendar feed of the user when their tracking changes."""
+    if issubclass(sender, Media):
+        feed.mark_tracking_changed(instance.user_id)
+    elif sender._meta.label == settings.AUTH_USER_MODEL:
+        # preferences like the enabled media types filter the releases
+        feed.mark_tracking_changed(instance.id)
@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(name="Reload calendar")
-def reload_calendar(user=None, items_to_process=None):
+def reload_calendar(user=None, items_to_process=None, deferrals=0):
     """Refresh the calendar with latest dates for all users."""
     if user:
         logger.info("Reloading calendar for user: %s", user.username)
@@ -18,9 +18,20 @@ def reload_calendar(user=None, items_to_process=None):
     return calendar.fetch_releases(
         user=user,
         items_to_process=items_to_process,
+        deferrals=deferrals,
     )
 
 
+@shared_task(name="Reload calendar items", ignore_result=True)
+def reload_calendar_items():
+    """Refresh the calendar for the items whose tracking changed recently."""
+    items_to_process = calendar.pop_queued_items()
+    if not items_to_process:
+        return "No items to process"
+
+    return calendar.fetch_releases(items_to_process=items_to_process)
+
+
 @shared_task(name="Send release notifications")
 def send_release_notifications():
     """Send notifications for recently released media."""
@@ -27,6 +27,7 @@ from events.calendar import (
     fetch_releases,
     get_anime_schedule_bulk,
     get_items_to_process,
+    get_release_items,
     get_tvmaze_episode_map,
     process_anime_bulk,
     process_comic,
@@ -170,16 +171,18 @@ class ReloadCalendarTaskTests(TestCase):
             )
         )
         # Setup mock for process_anime_bulk to create events for anime items
-        mock_process_anime_bulk.side_effect = lambda items, events_bulk: [
-            events_bulk.append(
+        def process_anime_bulk(items, events_bulk):
+            events_bulk.extend(
                 Event(
                     item=item,
                     content_number=1,
                     datetime=timezone.now(),
-                ),
+                )
+                for item in items
             )
-            for item in items
-        ]
+            return []
+
+        mock_process_anime_bulk.side_effect = process_anime_bulk
 
         # Call the task
         result = fetch_releases(self.user.id)
@@ -245,6 +248,62 @@ class ReloadCalendarTaskTests(TestCase):
         self.assertNotIn("Breaking Bad", result)
         self.assertNotIn("Berserk", result)
 
+    @patch("events.tasks.reload_calendar.apply_async")
+    @patch("events.calendar.process_other")
+    def test_fetch_releases_defers_unavailable(
+        self,
+        mock_process_other,
+        mock_apply_async,
+    ):
+        """Test that items that failed with an unavailable provider are rescheduled."""
+        other_movie_item = Item.objects.create(
+            media_id="240",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="The Godfather Part II",
+        )
+        # only the first movie failed, before the circuit opened
+        mock_process_other.side_effect = lambda item, _: item != self.movie_item
+
+        with patch.object(
+            services.circuit_breaker,
+            "retry_after",
+            side_effect=lambda provider: 60 if provider == Sources.TMDB.value else 0,
+        ):
+            result = fetch_releases(
+                self.user.id,
+                [self.movie_item, other_movie_item, self.book_item],
+            )
+
+        mock_apply_async.assert_called_once_with(
+            kwargs={"items_to_process": [self.movie_item], "deferrals": 1},
+            countdown=60,
+        )
+        self.assertIn("Rescheduled 1 items", result)
+
+        with patch.object(services.circuit_breaker, "retry_after", return_value=60):
+            fetch_releases(self.user.id, [self.movie_item], deferrals=3)
+        mock_apply_async.assert_called_once()
+
+    @patch("app.providers.services.get_media_metadata")
+    def test_get_release_items(self, mock_get_metadata):
+        """Test seasons are processed through their TV show, once."""
+        other_season_item = Item.objects.create(
+            media_id="1396",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.SEASON.value,
+            title="Breaking Bad",
+            image="http://example.com/breakingbad.jpg",
+            season_number=2,
+        )
+
+        release_items = get_release_items(
+            [self.movie_item, self.season_item, other_season_item],
+        )
+
+        self.assertEqual(release_items, [self.movie_item, self.tv_item])
+        mock_get_metadata.assert_not_called()
+
     def test_get_items_to_process(self):
         """Test the get_items_to_process function."""
         # Create a second user to verify user filtering
@@ -337,8 +396,8 @@ class ReloadCalendarTaskTests(TestCase):
         self.assertIn(self.anime_item, all_items)
         self.assertIn(user2_item, all_items)
 
-    @patch("events.calendar.tmdb.tv")
-    @patch("events.calendar.tmdb.tv_with_seasons")
+    @patch("app.providers.tmdb.tv")
+    @patch("app.providers.tmdb.tv_with_seasons")
     @patch("events.calendar.get_tvmaze_episode_map")
     def test_process_tv_season(
         self,
@@ -810,7 +869,7 @@ class ReloadCalendarTaskTests(TestCase):
         self.assertEqual(len(events_bulk), 0)
 
     @patch("events.calendar.services.get_media_metadata")
-    @patch("events.calendar.comicvine.issue")
+    @patch("app.providers.comicvine.issue")
     def test_process_comic_with_store_date(self, mock_issue, mock_get_media_metadata):
         """Test process_comic with store date available."""
         # Create comic item
@@ -851,7 +910,7 @@ class ReloadCalendarTaskTests(TestCase):
         mock_issue.assert_called_once_with("4000-123456")
 
     @patch("events.calendar.services.get_media_metadata")
-    @patch("events.calendar.comicvine.issue")
+    @patch("app.providers.comicvine.issue")
     def test_process_comic_with_cover_date_only(
         self,
         mock_issue,
@@ -893,7 +952,7 @@ class ReloadCalendarTaskTests(TestCase):
         self.assertEqual(events_bulk[0].datetime, expected_date)
 
     @patch("events.calendar.services.get_media_metadata")
-    @patch("events.calendar.comicvine.issue")
+    @patch("app.providers.comicvine.issue")
     def test_process_comic_no_dates(self, mock_issue, mock_get_media_metadata):
         """Test process_comic with no dates available."""
         # Create comic item
@@ -1,4 +1,5 @@
 import datetime
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -301,3 +302,95 @@ class EventManagerTests(TestCase):
             self.past_event,
             limited_events,
         )  # Past event, but filtered by active status
+
+
+@patch(
+    "app.providers.services.get_media_metadata",
+    return_value={"max_progress": None, "related": {"seasons": []}},
+)
+class EventTrackedByTests(TestCase):
+    """Test the events of the items tracked by a user."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = get_user_model().objects.create_user(username="testuser")
+        self.other_user = get_user_model().objects.create_user(username="other")
+        self.date = datetime.datetime(2025, 4, 15, 12, 0, 0, tzinfo=datetime.UTC)
+
+    def create_event(self, media_type, media_id, season_number=None):
+        """Create an item with a release event."""
+        item = Item.objects.create(
+            media_id=media_id,
+            source=Sources.TMDB.value,
+            media_type=media_type,
+            title=f"Test {media_type} {media_id}",
+            season_number=season_number,
+        )
+        return Event.objects.create(item=item, content_number=1, datetime=self.date)
+
+    def get_user_events(self, user):
+        """Return the user's events on the test date."""
+        return set(
+            Event.objects.get_user_events(user, self.date.date(), self.date.date()),
+        )
+
+    def test_tracked_by_status_of_user(self, _):
+        """Test only the user's own tracking status is considered."""
+        event = self.create_event(MediaTypes.MOVIE.value, "1")
+        Movie.objects.create(
+            user=self.user,
+            item=event.item,
+            status=Status.PLANNING.value,
+        )
+        Movie.objects.create(
+            user=self.other_user,
+            item=event.item,
+            status=Status.DROPPED.value,
+        )
+
+        self.assertEqual(self.get_user_events(self.user), {event})
+        self.assertEqual(self.get_user_events(self.other_user), set())
+
+    def test_tracked_by_seasons_until_inactive(self, _):
+        """Test the seasons from the first inactive one are not tracked."""
+        tv_item = Item.objects.create(
+            media_id="1668",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.TV.value,
+            title="Friends",
+        )
+        season_events = [
+            self.create_event(MediaTypes.SEASON.value, "1668", number)
+            for number in (1, 2, 3)
+        ]
+        tv = TV.objects.create(
+            user=self.user,
+            item=tv_item,
+            status=Status.IN_PROGRESS.value,
+        )
+        Season.objects.create(
+            user=self.user,
+            item=season_events[1].item,
+            related_tv=tv,
+            status=Status.DROPPED.value,
+        )
+        # dropping a season drops the show, resume watching it
+        TV.objects.filter(id=tv.id).update(status=Status.IN_PROGRESS.value)
+
+        self.assertEqual(self.get_user_events(self.user), {season_events[0]})
+
+        TV.objects.filter(id=tv.id).update(status=Status.PAUSED.value)
+        self.assertEqual(self.get_user_events(self.user), set())
+
+    def test_tracked_by_disabled_media_type(self, _):
+        """Test the events of disabled media types are excluded."""
+        event = self.create_event(MediaTypes.MOVIE.value, "1")
+        Movie.objects.create(
+            user=self.user,
+            item=event.item,
+            status=Status.PLANNING.value,
+        )
+        self.user.movie_enabled = False
+        self.user.save()
+
+        self.assertEqual(self.get_user_events(self.user), set())
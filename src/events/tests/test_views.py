@@ -8,7 +8,8 @@ from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 
-from app.models import Item, MediaTypes, Sources
+from app.models import Item, MediaTypes, Movie, Sources, Status
+from events import calendar as calendar_module
 from events.models import Event
 
 
@@ -286,3 +287,74 @@ class CalendarViewTests(TestCase):
 
         # Check response - should be 405 Method Not Allowed
         self.assertEqual(response.status_code, 405)
+
+
+class DownloadCalendarViewTests(TestCase):
+    """Tests for the iCalendar feed."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.credentials = {"username": "testuser", "password": "testpassword"}
+        self.user = get_user_model().objects.create_user(**self.credentials)
+        self.url = reverse("download_calendar", args=[self.user.token])
+        self.item = Item.objects.create(
+            media_id="238",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="Test Movie",
+            image="http://example.com/image.jpg",
+        )
+        Event.objects.create(
+            item=self.item,
+            datetime=timezone.now() + timedelta(days=1),
+        )
+
+    def test_download_calendar_invalid_token(self):
+        """Test an unknown token is rejected."""
+        response = self.client.get(reverse("download_calendar", args=["invalid"]))
+        self.assertEqual(response.status_code, 401)
+
+    def test_download_calendar_not_modified(self):
+        """Test an unchanged feed is answered with its ETag only."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar")
+        self.assertIn(b"BEGIN:VCALENDAR", response.content)
+
+        etag = response["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    @patch("app.providers.services.get_media_metadata")
+    def test_download_calendar_tracking_changed(self, mock_get_metadata):
+        """Test the feed is rebuilt when the user's tracking changes."""
+        mock_get_metadata.return_value = {"max_progress": 1}
+
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertNotIn(b"Test Movie", response.content)
+
+        Movie.objects.create(
+            user=self.user,
+            item=self.item,
+            status=Status.PLANNING.value,
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(b"Test Movie", response.content)
+
+    def test_download_calendar_events_changed(self):
+        """Test the feed is rebuilt when release events change."""
+        etag = self.client.get(self.url)["ETag"]
+
+        calendar_module.save_events(
+            [Event(item=self.item, datetime=timezone.now() + timedelta(days=2))],
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -1,18 +1,19 @@
 import calendar as cal
 import logging
-from datetime import UTC, date, timedelta
+from datetime import date, timedelta
 
-import icalendar
 from django.contrib import messages
 from django.contrib.auth.decorators import login_not_required
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
-from events import tasks
+from events import feed, tasks
 from events.models import Event
 from users.models import User
 
@@ -105,7 +106,7 @@ def reload_calendar(request):
 @login_not_required
 @csrf_exempt
 @require_http_methods(["GET", "HEAD", "PROPFIND"])
-def download_calendar(_, token: str):
+def download_calendar(request, token: str):
     """Download the calendar as a iCalendar file."""
     try:
         user = User.objects.get(token=token)
@@ -116,31 +117,14 @@ def download_calendar(_, token: str):
         )
         return HttpResponse(status=401)
 
-    now = timezone.now()
-
-    # Define default start and end date (from past 30 days to incoming 90 days)
-    start_date = now.date() - timedelta(days=30)
-    end_date = now.date() + timedelta(days=90)
-
-    # Retrieve release events
-    releases = Event.objects.get_user_events(user, start_date, end_date)
-
-    # Create iCalendar object
-    cal = icalendar.Calendar()
-    cal.add("prodid", "-//Yamtrack//EN")
-    cal.add("version", "2.0")
-
-    for release in releases:
-        cal_event = icalendar.Event()
-        cal_event.add("uid", release.id)
-        cal_event.add("summary", str(release))
-        dt_tz_aware = release.datetime.replace(tzinfo=UTC)
-        cal_event.add("dtstart", dt_tz_aware)
-        cal_event.add("dtend", dt_tz_aware)
-        cal_event.add("dtstamp", now)
-        cal.add_component(cal_event)
-
-    # Return the iCal file
-    response = HttpResponse(cal.to_ical(), content_type="text/calendar")
-    response["Content-Disposition"] = 'attachment; filename="calendar.ics"'
+    # Calendar clients poll the feed, only send it again when it changed
+    etag = quote_etag(feed.get_etag(user.id))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            feed.get_calendar(user, etag),
+            content_type="text/calendar",
+        )
+        response["Content-Disposition"] = 'attachment; filename="calendar.ics"'
+    response["ETag"] = etag
     return response
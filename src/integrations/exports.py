@@ -1,14 +1,32 @@
 import csv
+import json
 import logging
+import zlib
+from collections import Counter, defaultdict
+from functools import cache
 
+import zstandard
 from django.apps import apps
-from django.db.models import Field, Prefetch
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field
 
 from app import helpers
-from app.models import Episode, Item, MediaTypes, Season
+from app.models import Episode, Item, MediaTypes, Season, Status
 
 logger = logging.getLogger(__name__)
 
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+EXPORT_COMPRESSIONS = {
+    "gzip": ("gz", "application/gzip"),
+    "zstd": ("zst", "application/zstd"),
+}
+
 
 class Echo:
     """An object that implements just the write method of the file-like interface."""
@@ -23,63 +41,169 @@ def generate_rows(user):
     pseudo_buffer = Echo()
     writer = csv.writer(pseudo_buffer, quoting=csv.QUOTE_ALL)
 
-    # Get fields
-    fields = {
-        "item": get_model_fields(Item),
-        "track": get_track_fields(),
-    }
+    for row in generate_records(user):
+        yield writer.writerow(row)
 
-    # Yield header row
-    yield writer.writerow(fields["item"] + fields["track"])
-
-    prefetch_config = {
-        MediaTypes.TV.value: Prefetch(
-            "seasons",
-            queryset=Season.objects.select_related("item").prefetch_related(
-                Prefetch(
-                    "episodes",
-                    queryset=Episode.objects.select_related("item"),
-                ),
-            ),
-        ),
-        MediaTypes.SEASON.value: Prefetch(
-            "episodes",
-            queryset=Episode.objects.select_related("item"),
-        ),
-    }
 
-    # Yield data rows
-    for media_type in MediaTypes.values:
-        model = apps.get_model("app", media_type)
+def generate_jsonl(user):
+    """Generate JSON lines, one object per media."""
+    records = generate_records(user)
+    header = next(records)
+
+    for row in records:
+        yield json.dumps(dict(zip(header, row, strict=True)), cls=DjangoJSONEncoder)
+        yield "\n"
+
 
-        filter_kwargs = (
-            {"related_season__user": user}
-            if media_type == MediaTypes.EPISODE.value
-            else {"user": user}
+def generate_records(user):
+    """Generate the header and then the values of every media of the user.
+
+    Rows are read with `values_list` projections instead of model instances.
+    The TV and season fields computed from episodes are aggregated once.
+    """
+    item_fields = get_model_fields(Item)
+    track_fields = get_track_fields()
+
+    yield item_fields + track_fields
+
+    computed_fields = get_computed_fields(user)
+
+    for media_type in MediaTypes.values:
+        logger.debug("Streaming %ss", media_type)
+        yield from get_media_rows(
+            user,
+            media_type,
+            item_fields,
+            track_fields,
+            computed_fields[media_type],
         )
+        logger.debug("Finished streaming %ss", media_type)
+
+
+def get_media_rows(user, media_type, item_fields, track_fields, computed_fields):
+    """Yield the rows of a media type, in the same columns for every type."""
+    model = apps.get_model("app", media_type)
+    concrete_fields = {field.name for field in model._meta.concrete_fields}
+
+    # Track fields can be a column, a property computed from episodes or missing
+    columns = ["id"] + [f"item__{field}" for field in item_fields]
+    track_sources = []
+    for field in track_fields:
+        if isinstance(getattr(model, field, None), property):
+            track_sources.append(("computed", field))
+        elif field in concrete_fields:
+            track_sources.append(("column", len(columns)))
+            columns.append(field)
+        else:
+            track_sources.append(("missing", None))
+
+    filter_kwargs = (
+        {"related_season__user": user}
+        if media_type == MediaTypes.EPISODE.value
+        else {"user": user}
+    )
+    queryset = model.objects.filter(**filter_kwargs).values_list(*columns)
+
+    progress_index = len(item_fields) + track_fields.index("progress")
+    item_slice = slice(1, len(item_fields) + 1)
+    # TV shows without seasons aren't aggregated, like the model properties
+    # their progress is 0 and they have no dates
+    empty_fields = get_tv_fields([])
+
+    for values in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        computed = computed_fields.get(values[0], empty_fields)
+        row = list(values[item_slice])
+        for source, key in track_sources:
+            if source == "column":
+                row.append(values[key])
+            elif source == "computed":
+                row.append(computed.get(key))
+            else:
+                row.append(None)
+
+        if media_type == MediaTypes.GAME.value:
+            row[progress_index] = helpers.minutes_to_hhmm(row[progress_index])
+
+        yield row
+
+
+def get_computed_fields(user):
+    """Return the TV and season fields that are computed from their episodes.
+
+    Mirrors the `progress`, `progressed_at`, `start_date` and `end_date`
+    properties of the models with two queries for all the user's seasons.
+    """
+    episodes = defaultdict(list)
+    for season_id, episode_number, end_date in Episode.objects.filter(
+        related_season__user=user,
+    ).values_list("related_season_id", "item__episode_number", "end_date"):
+        episodes[season_id].append((episode_number, end_date))
+
+    computed = defaultdict(dict)
+    tv_seasons = defaultdict(list)
+
+    for season_id, tv_id, season_number, status in Season.objects.filter(
+        user=user,
+    ).values_list("id", "related_tv_id", "item__season_number", "status"):
+        season_fields = get_season_fields(status, episodes[season_id])
+        computed[MediaTypes.SEASON.value][season_id] = season_fields
+        if season_number != 0:
+            tv_seasons[tv_id].append(season_fields)
+
+    for tv_id, seasons in tv_seasons.items():
+        computed[MediaTypes.TV.value][tv_id] = get_tv_fields(seasons)
+
+    return computed
+
+
+def get_season_fields(status, episodes):
+    """Return the computed fields of a season from its episodes."""
+    dates = [end_date for _, end_date in episodes if end_date is not None]
+
+    if not episodes:
+        progress = 0
+    elif status == Status.IN_PROGRESS.value:
+        # most repeated episode, the latest one on ties
+        counts = Counter(episode_number for episode_number, _ in episodes)
+        progress = max(counts, key=lambda number: (counts[number], number))
+    else:
+        progress = max(episode_number for episode_number, _ in episodes)
+
+    return {
+        "progress": progress,
+        "progressed_at": max(dates, default=None),
+        "start_date": min(dates, default=None),
+        "end_date": max(dates, default=None),
+    }
 
-        queryset = model.objects.filter(**filter_kwargs).select_related("item")
 
-        if media_type in prefetch_config:
-            queryset = queryset.prefetch_related(prefetch_config[media_type])
+def get_tv_fields(seasons):
+    """Return the computed fields of a TV show from its regular seasons."""
 
-        logger.debug("Streaming %ss to CSV", media_type)
+    def dates(field):
+        return [season[field] for season in seasons if season[field]]
+
+    return {
+        "progress": sum(season["progress"] for season in seasons),
+        "progressed_at": max(dates("progressed_at"), default=None),
+        "start_date": min(dates("start_date"), default=None),
+        "end_date": max(dates("end_date"), default=None),
+    }
 
-        for media in queryset.iterator(chunk_size=500):
-            row = [getattr(media.item, field, "") for field in fields["item"]] + [
-                getattr(media, field, "") for field in fields["track"]
-            ]
 
-            if media_type == MediaTypes.GAME.value:
-                # calculate index of progress field
-                progress_index = fields["track"].index("progress")
-                row[progress_index + len(fields["item"])] = helpers.minutes_to_hhmm(
-                    media.progress,
-                )
+def compress(chunks, compression):
+    """Compress a stream of text chunks with gzip or zstd."""
+    if compression == "gzip":
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    else:
+        compressor = zstandard.ZstdCompressor().compressobj()
 
-            yield writer.writerow(row)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
 
-        logger.debug("Finished streaming %ss to CSV", media_type)
+    yield compressor.flush()
 
 
 def get_model_fields(model):
@@ -91,6 +215,7 @@ def get_model_fields(model):
     ]
 
 
+@cache
 def get_track_fields():
     """Get a list of all track fields from all media models."""
     all_fields = []
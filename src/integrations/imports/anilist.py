@@ -45,6 +45,9 @@ class AniListImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
         logger.info(
             "Initialized AniList importer for user %s with mode %s",
             username,
@@ -148,6 +151,7 @@ class AniListImporter:
         self._process_media_data(response["data"]["anime"], MediaTypes.ANIME.value)
         self._process_media_data(response["data"]["manga"], MediaTypes.MANGA.value)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -163,6 +167,17 @@ class AniListImporter:
         """Process media data for a specific type (anime/manga)."""
         logger.info("Processing %s from AniList", media_type)
 
+        self.item_resolver.prefetch(
+            Sources.MAL.value,
+            [
+                content["media"]["idMal"]
+                for status_list in media_data["lists"]
+                for content in status_list["entries"]
+                if content["media"]["idMal"] is not None
+            ],
+            [media_type],
+        )
+
         for status_list in media_data["lists"]:
             if not status_list["isCustomList"]:
                 for content in status_list["entries"]:
@@ -195,11 +210,11 @@ class AniListImporter:
         else:
             status = content["status"].capitalize()
 
-        item, _ = app.models.Item.objects.get_or_create(
-            media_id=str(content["media"]["idMal"]),
-            source=Sources.MAL.value,
-            media_type=media_type,
-            defaults={
+        item = self.item_resolver.resolve(
+            content["media"]["idMal"],
+            Sources.MAL.value,
+            media_type,
+            {
                 "title": content["media"]["title"]["userPreferred"],
                 "image": content["media"]["coverImage"]["large"],
             },
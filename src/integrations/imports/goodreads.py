@@ -6,7 +6,6 @@ from datetime import datetime
 from django.apps import apps
 from django.utils import timezone
 
-import app
 from app.models import MediaTypes, Sources, Status
 from app.providers import services
 from integrations.imports import helpers
@@ -46,6 +45,12 @@ class GoodReadsImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
+        # Search the books in Hardcover concurrently before processing rows
+        self.book_lookup = helpers.ConcurrentLookup(self._search_book)
+
         logger.info(
             "Initialized GoodReads CSV importer for user %s with mode %s",
             user.username,
@@ -60,9 +65,13 @@ class GoodReadsImporter:
             msg = "Invalid file format. Please upload a CSV file."
             raise MediaImportError(msg) from e
 
-        reader = DictReader(decoded_file)
+        rows = list(DictReader(decoded_file))
+
+        self.book_lookup.resolve(
+            (row["ISBN"], row["Title"], Sources.HARDCOVER) for row in rows
+        )
 
-        for row in reader:
+        for row in rows:
             try:
                 self._process_row(row)
             except services.ProviderAPIError:
@@ -75,6 +84,7 @@ class GoodReadsImporter:
 
         logger.debug("processed %s", self.bulk_media)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -90,7 +100,7 @@ class GoodReadsImporter:
 
     def _process_row(self, row):
         """Process a single row from the CSV file."""
-        book = self._search_book(row, Sources.HARDCOVER)
+        book = self.book_lookup.get(row["ISBN"], row["Title"], Sources.HARDCOVER)
 
         if not book:
             self.warnings.append(
@@ -103,7 +113,7 @@ class GoodReadsImporter:
 
         media_id = book["media_id"]
 
-        item, _ = self._create_or_update_item(book)
+        item = self._create_or_update_item(book)
 
         # Check if we should process this entry based on mode
         if not helpers.should_process_media(
@@ -119,11 +129,11 @@ class GoodReadsImporter:
         instance = self._create_media_instance(item, row)
         self.bulk_media[MediaTypes.BOOK.value].append(instance)
 
-    def _search_book(self, row, source):
-        """Search for game and return result if found."""
+    def _search_book(self, isbn, title, source):
+        """Search for book by ISBN, then by title, and return result if found."""
         results = services.search(
             MediaTypes.BOOK.value,
-            row["ISBN"],
+            isbn,
             1,
             source.value,
         ).get(
@@ -135,7 +145,7 @@ class GoodReadsImporter:
 
         results = services.search(
             MediaTypes.BOOK.value,
-            row["Title"],
+            title,
             1,
             source.value,
         ).get(
@@ -148,17 +158,16 @@ class GoodReadsImporter:
         return results[0]
 
     def _create_or_update_item(self, book):
-        """Create or update the item in database."""
-        media_type = MediaTypes.BOOK.value
-        return app.models.Item.objects.update_or_create(
-            media_id=book["media_id"],
-            source=Sources.HARDCOVER.value,
-            media_type=media_type,
-            title=book["title"],
-            defaults={
+        """Create or update the item, saved in bulk at the end of the import."""
+        return self.item_resolver.resolve(
+            book["media_id"],
+            Sources.HARDCOVER.value,
+            MediaTypes.BOOK.value,
+            {
                 "title": book["title"],
                 "image": book["image"],
             },
+            update=True,
         )
 
     def _determine_status(self, row):
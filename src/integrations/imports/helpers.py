@@ -3,21 +3,36 @@ import datetime
 import hashlib
 import json
 import logging
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+from celery import current_task
 from cryptography.fernet import Fernet
 from django.apps import apps
 from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django_celery_beat.models import CrontabSchedule, PeriodicTask
 from simple_history.utils import bulk_create_with_history
 
 import app
 from app.models import MediaTypes
+from app.providers import services
+from events import feed
 
 logger = logging.getLogger(__name__)
 
+ITEM_BATCH_SIZE = 500
+IMPORT_CHECKPOINT_INTERVAL = 60  # seconds
+IMPORT_CHECKPOINT_TIMEOUT = 60 * 60 * 24  # 24 hours
+IMPORT_PROGRESS_INTERVAL = 250  # entries
+# Deliveries of an import task before giving up on a worker that keeps dying
+IMPORT_MAX_DELIVERIES = 3
+
 
 class MediaImportError(Exception):
     """Custom exception for import errors."""
@@ -27,6 +42,381 @@ class MediaImportUnexpectedError(Exception):
     """Custom exception for unexpected import errors."""
 
 
+class ItemResolver:
+    """Resolve imported entries to Item rows with as few queries as possible.
+
+    Existing items are prefetched in batches, provider metadata is memoized
+    per media and missing items are only created when `create_pending` is
+    called, right before the media objects referencing them are bulk created.
+    """
+
+    def __init__(self):
+        """Initialize the empty caches."""
+        self.items = {}
+        self.pending = {}
+        self.to_update = {}
+        self.metadata = {}
+        self.episodes = {}
+        self.prefetched = set()
+
+    def __getstate__(self):
+        """Drop memoized provider errors when pickled, they can't be restored."""
+        state = self.__dict__.copy()
+        state["metadata"] = {
+            key: metadata
+            for key, metadata in self.metadata.items()
+            if not isinstance(metadata, services.ProviderAPIError)
+        }
+        # rebuilt from the metadata when needed
+        state["episodes"] = {}
+        return state
+
+    @staticmethod
+    def _item_key(media_id, source, media_type, season_number, episode_number):
+        """Return the cache key of an item."""
+        return (str(media_id), source, media_type, season_number, episode_number)
+
+    def prefetch(self, source, media_ids, media_types):
+        """Load the existing items for the given IDs in batched queries."""
+        media_ids = sorted({str(media_id) for media_id in media_ids})
+
+        for start in range(0, len(media_ids), ITEM_BATCH_SIZE):
+            batch = media_ids[start : start + ITEM_BATCH_SIZE]
+            for item in app.models.Item.objects.filter(
+                source=source,
+                media_type__in=media_types,
+                media_id__in=batch,
+            ):
+                key = self._item_key(
+                    item.media_id,
+                    item.source,
+                    item.media_type,
+                    item.season_number,
+                    item.episode_number,
+                )
+                self.items[key] = item
+
+        self.prefetched.update(
+            (media_id, source, media_type)
+            for media_id in media_ids
+            for media_type in media_types
+        )
+        logger.debug(
+            "Prefetched items for %s %s IDs from %s",
+            len(media_ids),
+            ", ".join(media_types),
+            source,
+        )
+
+    def resolve(
+        self,
+        media_id,
+        source,
+        media_type,
+        defaults,
+        season_number=None,
+        episode_number=None,
+        *,
+        update=False,
+    ):
+        """Return the item for the given identifiers.
+
+        Missing items are instantiated without saving them. When `update` is
+        set, the title and image of existing items are refreshed from defaults.
+        """
+        media_id = str(media_id)
+        key = self._item_key(
+            media_id,
+            source,
+            media_type,
+            season_number,
+            episode_number,
+        )
+
+        item = self.items.get(key)
+        if item is None and (media_id, source, media_type) not in self.prefetched:
+            item = app.models.Item.objects.filter(
+                media_id=media_id,
+                source=source,
+                media_type=media_type,
+                season_number=season_number,
+                episode_number=episode_number,
+            ).first()
+
+        if item is None:
+            item = app.models.Item(
+                media_id=media_id,
+                source=source,
+                media_type=media_type,
+                season_number=season_number,
+                episode_number=episode_number,
+                **defaults,
+            )
+            self.pending[key] = item
+        elif update and item.pk is not None:
+            changed = False
+            for attr, value in defaults.items():
+                if getattr(item, attr) != value:
+                    setattr(item, attr, value)
+                    changed = True
+            if changed:
+                self.to_update[key] = item
+
+        self.items[key] = item
+        return item
+
+    def get_metadata(self, media_type, media_id, source, season_numbers=None):
+        """Return the metadata for a media, calling the provider only once.
+
+        Not found errors are memoized as well so that entries repeated in the
+        import don't query the provider again.
+        """
+        key = (source, str(media_id), media_type, tuple(season_numbers or ()))
+
+        if key not in self.metadata:
+            try:
+                self.metadata[key] = services.get_media_metadata(
+                    media_type,
+                    media_id,
+                    source,
+                    season_numbers,
+                )
+            except services.ProviderAPIError as error:
+                if error.status_code != requests.codes.not_found:
+                    raise
+                self.metadata[key] = error
+
+        metadata = self.metadata[key]
+        if isinstance(metadata, services.ProviderAPIError):
+            raise metadata
+        return metadata
+
+    def get_episodes(self, media_id, source, season_number, season_metadata):
+        """Return the episodes metadata of a season by number.
+
+        The lookup is built once per season instead of scanning the episodes
+        list for every imported episode.
+        """
+        key = (source, str(media_id), season_number)
+        if key not in self.episodes:
+            self.episodes[key] = {
+                episode["episode_number"]: episode
+                for episode in season_metadata["episodes"]
+            }
+        return self.episodes[key]
+
+    def create_pending(self):
+        """Bulk create the missing items and update the changed ones."""
+        if self.to_update:
+            app.models.Item.objects.bulk_update(
+                self.to_update.values(),
+                ["title", "image"],
+                batch_size=ITEM_BATCH_SIZE,
+            )
+            self.to_update = {}
+
+        if not self.pending:
+            return
+
+        pending = list(self.pending.values())
+        logger.info("Creating %s new items", len(pending))
+
+        try:
+            with transaction.atomic():
+                app.models.Item.objects.bulk_create(
+                    pending,
+                    batch_size=ITEM_BATCH_SIZE,
+                )
+        except IntegrityError:
+            # another import created some of the items in the meantime
+            logger.warning("Items created concurrently, creating them one by one")
+            for item in pending:
+                self._save_or_link(item)
+
+        self.pending = {}
+
+    def _save_or_link(self, item):
+        """Save the item, or point it to the existing row with the same keys."""
+        existing_id = (
+            app.models.Item.objects.filter(
+                media_id=item.media_id,
+                source=item.source,
+                media_type=item.media_type,
+                season_number=item.season_number,
+                episode_number=item.episode_number,
+            )
+            .values_list("id", flat=True)
+            .first()
+        )
+
+        if existing_id is None:
+            item.pk = None
+            item.save()
+        else:
+            item.pk = existing_id
+            item._state.adding = False
+
+
+class ConcurrentLookup:
+    """Run an external ID lookup for many entries concurrently.
+
+    Each distinct key is looked up once in a thread pool, results are
+    memoized and exceptions are re-raised when the result is requested, so
+    callers keep handling errors per entry. Provider rate limits are still
+    enforced by the shared limiter session.
+    """
+
+    def __init__(self, lookup_func, max_workers=None):
+        """Initialize the lookup with the function called for each key."""
+        self.lookup_func = lookup_func
+        self.max_workers = max_workers or settings.IMPORT_LOOKUP_WORKERS
+        self.futures = {}
+
+    def resolve(self, keys):
+        """Look up all the keys not resolved yet, waiting for them to finish."""
+        keys = [key for key in dict.fromkeys(keys) if key not in self.futures]
+        if not keys:
+            return
+
+        max_workers = min(self.max_workers, len(keys))
+        logger.info("Looking up %s entries with %s workers", len(keys), max_workers)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for key in keys:
+                self.futures[key] = executor.submit(self.lookup_func, *key)
+
+    def get(self, *key):
+        """Return the lookup result for the key, resolving it if needed."""
+        if key not in self.futures:
+            self.resolve([key])
+        return self.futures[key].result()
+
+
+class ImportCheckpoint:
+    """Persist the progress of an import so a redelivered task can resume.
+
+    The fetched provider data is stored once in the cache under the Celery
+    task ID, then the offset reached in each stage and the given importer
+    attributes at most every `IMPORT_CHECKPOINT_INTERVAL` seconds. Secret
+    attributes are stored encrypted. Nothing is written to the database
+    before the end of an import, so resuming from the last checkpoint gives
+    the same result as a full run. Outside of a Celery task nothing is
+    persisted.
+    """
+
+    def __init__(self, importer, attrs, stages, secret_attrs=()):
+        """Initialize the checkpoint, restoring the importer state if saved.
+
+        Raises `MediaImportError` once the task was delivered more than
+        `IMPORT_MAX_DELIVERIES` times, so a task that kills its worker isn't
+        redelivered forever.
+        """
+        self.importer = importer
+        self.attrs = attrs
+        self.secret_attrs = secret_attrs
+        self.stages = stages
+        self.task = current_task if current_task and current_task.request.id else None
+        self.key = f"import_checkpoint_{self.task.request.id}" if self.task else None
+        self.data = {}
+        self.offsets = {}
+        self.saved_at = time.monotonic()
+
+        if not self.key:
+            return
+
+        cache.add(f"{self.key}_deliveries", 0, IMPORT_CHECKPOINT_TIMEOUT)
+        deliveries = cache.incr(f"{self.key}_deliveries")
+        if deliveries > IMPORT_MAX_DELIVERIES:
+            self.clear()
+            msg = f"Import stopped after the worker was lost {deliveries - 1} times."
+            raise MediaImportError(msg)
+
+        state = cache.get(self.key)
+        if state:
+            self.offsets = state["offsets"]
+            for attr, value in state["importer"].items():
+                setattr(importer, attr, value)
+            for attr, value in state["secrets"].items():
+                setattr(importer, attr, decrypt(value))
+            logger.info("Resuming import from checkpoint: %s", self.offsets)
+
+    def fetch(self, name, fetch_func):
+        """Return the provider data saved in the checkpoint or fetch it."""
+        if name not in self.data:
+            data = cache.get(f"{self.key}_{name}") if self.key else None
+            if data is None:
+                data = fetch_func()
+                if self.key:
+                    cache.set(f"{self.key}_{name}", data, IMPORT_CHECKPOINT_TIMEOUT)
+            self.data[name] = data
+        return self.data[name]
+
+    def iterate(self, stage, entries):
+        """Yield the entries of a stage that weren't processed yet.
+
+        The checkpoint is saved once the consumer is done with an entry and
+        the interval has passed since the last save, and at the end of the
+        stage.
+        """
+        total = len(entries)
+        for offset in range(self.offsets.get(stage, 0), total):
+            yield entries[offset]
+
+            processed = offset + 1
+            if (
+                processed == total
+                or time.monotonic() - self.saved_at >= IMPORT_CHECKPOINT_INTERVAL
+            ):
+                self.offsets[stage] = processed
+                self.save()
+            if processed % IMPORT_PROGRESS_INTERVAL == 0 or processed == total:
+                self.report_progress(stage, processed, total)
+
+    def save(self):
+        """Store the current offsets and importer state in the cache."""
+        self.saved_at = time.monotonic()
+        if not self.key:
+            return
+
+        state = {
+            "offsets": self.offsets,
+            "importer": {
+                attr: getattr(self.importer, attr)
+                for attr in self.attrs
+                if hasattr(self.importer, attr)
+            },
+            "secrets": {
+                attr: encrypt(getattr(self.importer, attr))
+                for attr in self.secret_attrs
+                if hasattr(self.importer, attr)
+            },
+        }
+        cache.set(self.key, state, IMPORT_CHECKPOINT_TIMEOUT)
+
+    def report_progress(self, stage, processed, total):
+        """Update the task state with the overall import percentage."""
+        if not self.task:
+            return
+
+        stage_progress = self.stages.index(stage) + processed / total
+        progress = round(stage_progress / len(self.stages) * 100)
+        self.task.update_state(
+            state="PROGRESS",
+            meta={"progress": progress, "stage": stage},
+        )
+
+    def clear(self):
+        """Remove the checkpoint once the import is saved."""
+        if self.key:
+            cache.delete_many(
+                [
+                    self.key,
+                    f"{self.key}_deliveries",
+                    *(f"{self.key}_{name}" for name in self.data),
+                ],
+            )
+
+
 def get_existing_media(user):
     """Get all existing media for the user to check against during import."""
     excluded_types = [MediaTypes.SEASON.value, MediaTypes.EPISODE.value]
@@ -189,6 +579,9 @@ def bulk_create_media(bulk_media_list, user):
             default_user=user,
         )
 
+    # bulk creation doesn't send the signals that invalidate the feed
+    feed.mark_tracking_changed(user.id)
+
 
 def create_import_schedule(
     username,
@@ -46,6 +46,12 @@ class HowLongToBeatImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
+        # Search the titles in IGDB concurrently before processing rows
+        self.game_lookup = helpers.ConcurrentLookup(self._search_game)
+
         logger.info(
             "Initialized HowLongToBeat importer for user %s with mode %s",
             user.username,
@@ -67,6 +73,8 @@ class HowLongToBeatImporter:
         media_id_counts = defaultdict(int)
         media_id_titles = defaultdict(list)
 
+        self.game_lookup.resolve((row["Title"],) for row in rows)
+
         # First pass: identify duplicates
         for row in rows:
             try:
@@ -75,6 +83,12 @@ class HowLongToBeatImporter:
                 error_msg = f"Error processing entry: {row}"
                 raise MediaImportUnexpectedError(error_msg) from error
 
+        self.item_resolver.prefetch(
+            Sources.IGDB.value,
+            media_id_counts.keys(),
+            [MediaTypes.GAME.value],
+        )
+
         # Second pass: add non-duplicates to bulk_media
         for row in rows:
             try:
@@ -86,6 +100,7 @@ class HowLongToBeatImporter:
         # Add consolidated warnings for duplicates
         self._add_duplicate_warnings(media_id_counts, media_id_titles)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -99,7 +114,7 @@ class HowLongToBeatImporter:
 
     def _process_first_pass(self, row, media_id_counts, media_id_titles):
         """First pass to identify duplicate games."""
-        game = self._search_game(row)
+        game = self.game_lookup.get(row["Title"])
         if not game:
             self.warnings.append(
                 f"{row['Title']}: Couldn't find a game with this title in "
@@ -113,7 +128,7 @@ class HowLongToBeatImporter:
 
     def _process_second_pass(self, row, media_id_counts):
         """Second pass to process non-duplicate games."""
-        game = self._search_game(row)
+        game = self.game_lookup.get(row["Title"])
         if not game:
             return  # Already added warning in first pass
 
@@ -123,7 +138,7 @@ class HowLongToBeatImporter:
         if media_id_counts[media_id] > 1:
             return
 
-        item, _ = self._create_or_update_item(game)
+        item = self._create_or_update_item(game)
 
         # Check if we should process this entry based on mode
         if not helpers.should_process_media(
@@ -170,11 +185,11 @@ class HowLongToBeatImporter:
         # format: '32' secs
         return round(int(time) / 60)
 
-    def _search_game(self, row):
+    def _search_game(self, title):
         """Search for game and return result if found."""
         results = app.providers.services.search(
             MediaTypes.GAME.value,
-            row["Title"],
+            title,
             1,
         ).get(
             "results",
@@ -185,17 +200,16 @@ class HowLongToBeatImporter:
         return results[0]
 
     def _create_or_update_item(self, game):
-        """Create or update the item in database."""
-        media_type = MediaTypes.GAME.value
-        return app.models.Item.objects.update_or_create(
-            media_id=game["media_id"],
-            source=Sources.IGDB.value,
-            media_type=media_type,
-            title=game["title"],
-            defaults={
+        """Create or update the item, saved in bulk at the end of the import."""
+        return self.item_resolver.resolve(
+            game["media_id"],
+            Sources.IGDB.value,
+            MediaTypes.GAME.value,
+            {
                 "title": game["title"],
                 "image": game["image"],
             },
+            update=True,
         )
 
     def _format_notes(self, row):
@@ -6,9 +6,8 @@ from django.apps import apps
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-import app
-import app.providers
 from app.models import MediaTypes, Sources, Status
+from app.providers import services
 from app.providers.services import ProviderAPIError
 from integrations.imports import helpers
 from integrations.imports.helpers import MediaImportError, MediaImportUnexpectedError
@@ -68,6 +67,12 @@ class IMDBImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
+        # Look up the IMDB IDs in TMDB concurrently before processing rows
+        self.tmdb_lookup = helpers.ConcurrentLookup(self._lookup_in_tmdb)
+
         logger.info(
             "Initialized IMDB importer for user %s with mode %s",
             user.username,
@@ -89,6 +94,15 @@ class IMDBImporter:
         media_id_counts = defaultdict(int)
         media_id_titles = defaultdict(list)
 
+        self.tmdb_lookup.resolve(
+            (imdb_id, title_type)
+            for row in rows
+            if (imdb_id := self._extract_imdb_id(row))
+            and self._is_supported_type(
+                title_type := row.get("Title Type", "").strip(),
+            )
+        )
+
         # First pass: identify duplicates and validate entries
         for row in rows:
             try:
@@ -97,6 +111,12 @@ class IMDBImporter:
                 error_msg = f"Error processing entry: {row}"
                 raise MediaImportUnexpectedError(error_msg) from error
 
+        self.item_resolver.prefetch(
+            Sources.TMDB.value,
+            media_id_counts.keys(),
+            [MediaTypes.MOVIE.value, MediaTypes.TV.value],
+        )
+
         # Second pass: add non-duplicates to bulk_media
         for row in rows:
             try:
@@ -108,6 +128,7 @@ class IMDBImporter:
         # Add consolidated warnings for duplicates
         self._add_duplicate_warnings(media_id_counts, media_id_titles)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -142,7 +163,7 @@ class IMDBImporter:
                 )
             return
 
-        tmdb_data = self._lookup_in_tmdb(imdb_id, title_type)
+        tmdb_data = self.tmdb_lookup.get(imdb_id, title_type)
 
         if not tmdb_data:
             self.warnings.append(
@@ -164,7 +185,7 @@ class IMDBImporter:
         if not self._is_supported_type(title_type):
             return  # Already added warning in first pass
 
-        tmdb_data = self._lookup_in_tmdb(imdb_id, title_type)
+        tmdb_data = self.tmdb_lookup.get(imdb_id, title_type)
         if not tmdb_data:
             return  # Already added warning in first pass
 
@@ -187,7 +208,7 @@ class IMDBImporter:
         ):
             return
 
-        item, _ = self._create_or_update_item(tmdb_data, media_type)
+        item = self._create_or_update_item(tmdb_data, media_type)
         instance = self._create_media_instance(item, row, media_type)
         self.bulk_media[media_type].append(instance)
 
@@ -224,8 +245,9 @@ class IMDBImporter:
 
     def _lookup_in_tmdb(self, imdb_id, title_type):
         """Look up media in TMDB using IMDB ID."""
+        tmdb = services.get_provider("tmdb")
         try:
-            response = app.providers.tmdb.find(imdb_id, "imdb_id")
+            response = tmdb.find(imdb_id, "imdb_id")
         except ProviderAPIError as e:
             logger.warning("Error looking up IMDB ID %s in TMDB: %s", imdb_id, e)
             return None
@@ -237,7 +259,7 @@ class IMDBImporter:
             return {
                 "media_id": movie["id"],
                 "title": movie["title"],
-                "image": app.providers.tmdb.get_image_url(movie["poster_path"]),
+                "image": tmdb.get_image_url(movie["poster_path"]),
                 "media_type": MediaTypes.MOVIE.value,
             }
 
@@ -246,22 +268,23 @@ class IMDBImporter:
             return {
                 "media_id": tv_show["id"],
                 "title": tv_show["name"],
-                "image": app.providers.tmdb.get_image_url(tv_show["poster_path"]),
+                "image": tmdb.get_image_url(tv_show["poster_path"]),
                 "media_type": MediaTypes.TV.value,
             }
 
         return None
 
     def _create_or_update_item(self, tmdb_data, media_type):
-        """Create or update the item in database."""
-        return app.models.Item.objects.update_or_create(
-            media_id=tmdb_data["media_id"],
-            source=Sources.TMDB.value,
-            media_type=media_type,
-            defaults={
+        """Create or update the item, saved in bulk at the end of the import."""
+        return self.item_resolver.resolve(
+            tmdb_data["media_id"],
+            Sources.TMDB.value,
+            media_type,
+            {
                 "title": tmdb_data["title"],
                 "image": tmdb_data["image"],
             },
+            update=True,
         )
 
     def _create_media_instance(self, item, row, media_type):
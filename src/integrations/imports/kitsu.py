@@ -49,6 +49,9 @@ class KitsuImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
         # Load Kitsu-MU mapping data
         current_file_dir = Path(__file__).resolve().parent
         json_file_path = current_file_dir / "data" / "kitsu-mu-mapping.json"
@@ -72,6 +75,7 @@ class KitsuImporter:
         self._process_media_type(MediaTypes.ANIME.value)
         self._process_media_type(MediaTypes.MANGA.value)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -121,6 +125,16 @@ class KitsuImporter:
             if item["type"] == "mappings"
         }
 
+        self.item_resolver.prefetch(
+            Sources.MAL.value,
+            [
+                mapping["attributes"]["externalId"]
+                for mapping in mapping_lookup.values()
+                if mapping["attributes"]["externalSite"] == f"myanimelist/{media_type}"
+            ],
+            [media_type],
+        )
+
         for entry in response["entries"]:
             try:
                 self._process_entry(entry, media_type, media_lookup, mapping_lookup)
@@ -320,16 +334,15 @@ class KitsuImporter:
 
         image_url = self._get_image_url(kitsu_metadata)
 
-        item, _ = app.models.Item.objects.get_or_create(
-            media_id=media_id,
-            source=source,
-            media_type=media_type,
-            defaults={
+        return self.item_resolver.resolve(
+            media_id,
+            source,
+            media_type,
+            {
                 "title": kitsu_metadata["attributes"]["canonicalTitle"],
                 "image": image_url,
             },
         )
-        return item
 
     def _get_image_url(self, media):
         """Get the image URL for a media item."""
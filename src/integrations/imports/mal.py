@@ -48,6 +48,9 @@ class MyAnimeListImporter:
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
         logger.info(
             "Initialized MyAnimeList importer for user %s with mode %s",
             username,
@@ -59,6 +62,7 @@ class MyAnimeListImporter:
         self._process_media_type(MediaTypes.ANIME.value)
         self._process_media_type(MediaTypes.MANGA.value)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -91,6 +95,12 @@ class MyAnimeListImporter:
                 raise MediaImportError(msg) from error
             raise
 
+        self.item_resolver.prefetch(
+            Sources.MAL.value,
+            [content["node"]["id"] for content in response["data"]],
+            [media_type],
+        )
+
         for content in response["data"]:
             try:
                 self._process_entry(content, media_type)
@@ -145,11 +155,11 @@ class MyAnimeListImporter:
         ):
             return
 
-        item, _ = app.models.Item.objects.get_or_create(
-            media_id=str(content["node"]["id"]),
-            source=Sources.MAL.value,
-            media_type=media_type,
-            defaults={
+        item = self.item_resolver.resolve(
+            content["node"]["id"],
+            Sources.MAL.value,
+            media_type,
+            {
                 "title": content["node"]["title"],
                 "image": image_url,
             },
@@ -1,5 +1,6 @@
 import logging
 from collections import defaultdict
+from functools import partial
 
 import requests
 from django.conf import settings
@@ -104,11 +105,24 @@ class SimklImporter:
         self.existing_media = helpers.get_existing_media(user)
 
         # Track media IDs to delete in overwrite mode
-        self.to_delete = defaultdict(lambda: defaultdict(set))
+        self.to_delete = defaultdict(partial(defaultdict, set))
 
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
+        # Resolve items in bulk instead of one query per entry
+        self.item_resolver = helpers.ItemResolver()
+
+        # Track IDs already imported per media type to skip duplicates
+        self.imported_ids = defaultdict(set)
+
+        # Resume from the last checkpoint if the task was redelivered
+        self.checkpoint = helpers.ImportCheckpoint(
+            self,
+            ["warnings", "to_delete", "bulk_media", "item_resolver", "imported_ids"],
+            ["shows", "movies", "anime"],
+        )
+
         logger.info(
             "Initialized Simkl importer for user %s with mode %s",
             user.username,
@@ -117,15 +131,17 @@ class SimklImporter:
 
     def import_data(self):
         """Import all user data from Simkl."""
-        data = self._get_user_list()
+        data = self.checkpoint.fetch("list", self._get_user_list)
 
         if not data:
             return {}, ""
 
         self._process_media_lists(data)
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
+        self.checkpoint.clear()
 
         imported_counts = {
             media_type: len(media_list)
@@ -158,6 +174,8 @@ class SimklImporter:
 
     def _process_media_lists(self, data):
         """Process all media types from Simkl."""
+        self._prefetch_items(data)
+
         if "shows" in data:
             self._process_tv_list(data["shows"])
         if "movies" in data:
@@ -165,12 +183,42 @@ class SimklImporter:
         if "anime" in data:
             self._process_anime_list(data["anime"])
 
+    def _prefetch_items(self, data):
+        """Load the existing items of all the entries in bulk."""
+        self.item_resolver.prefetch(
+            Sources.TMDB.value,
+            self._get_ids(data.get("shows", []), "show", "tmdb"),
+            [
+                MediaTypes.TV.value,
+                MediaTypes.SEASON.value,
+                MediaTypes.EPISODE.value,
+            ],
+        )
+        self.item_resolver.prefetch(
+            Sources.TMDB.value,
+            self._get_ids(data.get("movies", []), "movie", "tmdb"),
+            [MediaTypes.MOVIE.value],
+        )
+        self.item_resolver.prefetch(
+            Sources.MAL.value,
+            self._get_ids(data.get("anime", []), "show", "mal"),
+            [MediaTypes.ANIME.value],
+        )
+
+    def _get_ids(self, entries, entry_key, id_key):
+        """Return the provider IDs present in a list of Simkl entries."""
+        return {
+            entry[entry_key]["ids"][id_key]
+            for entry in entries
+            if id_key in entry[entry_key].get("ids", {})
+        }
+
     def _process_tv_list(self, tv_list):
         """Process TV list from Simkl."""
         logger.info("Processing tv shows")
-        existing_tv_ids = set()
+        existing_tv_ids = self.imported_ids[MediaTypes.TV.value]
 
-        for tv in tv_list:
+        for tv in self.checkpoint.iterate("shows", tv_list):
             try:
                 title = tv["show"]["title"]
                 logger.debug("Processing %s", title)
@@ -206,7 +254,7 @@ class SimklImporter:
                     season_numbers = []
 
                 try:
-                    metadata = app.providers.tmdb.tv_with_seasons(
+                    metadata = services.get_provider("tmdb").tv_with_seasons(
                         tmdb_id,
                         season_numbers,
                     )
@@ -219,11 +267,11 @@ class SimklImporter:
                         continue
                     raise
 
-                tv_item, _ = app.models.Item.objects.get_or_create(
-                    media_id=tmdb_id,
-                    source=Sources.TMDB.value,
-                    media_type=MediaTypes.TV.value,
-                    defaults={
+                tv_item = self.item_resolver.resolve(
+                    tmdb_id,
+                    Sources.TMDB.value,
+                    MediaTypes.TV.value,
+                    {
                         "title": metadata["title"],
                         "image": metadata["image"],
                     },
@@ -262,15 +310,15 @@ class SimklImporter:
             episodes = season["episodes"]
             season_metadata = metadata[f"season/{season_number}"]
 
-            season_item, _ = app.models.Item.objects.get_or_create(
-                media_id=tmdb_id,
-                source=Sources.TMDB.value,
-                media_type=MediaTypes.SEASON.value,
-                season_number=season_number,
-                defaults={
+            season_item = self.item_resolver.resolve(
+                tmdb_id,
+                Sources.TMDB.value,
+                MediaTypes.SEASON.value,
+                {
                     "title": metadata["title"],
                     "image": season_metadata["image"],
                 },
+                season_number,
             )
 
             if episodes[-1]["number"] == season_metadata["max_progress"]:
@@ -288,18 +336,26 @@ class SimklImporter:
             self.bulk_media[MediaTypes.SEASON.value].append(season_instance)
 
             # Process episodes
+            episodes_metadata = self.item_resolver.get_episodes(
+                tmdb_id,
+                Sources.TMDB.value,
+                season_number,
+                season_metadata,
+            )
             for episode in episodes:
-                ep_img = self._get_episode_image(episode, season_number, metadata)
-                episode_item, _ = app.models.Item.objects.get_or_create(
-                    media_id=tmdb_id,
-                    source=Sources.TMDB.value,
-                    media_type=MediaTypes.EPISODE.value,
-                    season_number=season_number,
-                    episode_number=episode["number"],
-                    defaults={
+                ep_img = self._get_episode_image(
+                    episodes_metadata.get(episode["number"]),
+                )
+                episode_item = self.item_resolver.resolve(
+                    tmdb_id,
+                    Sources.TMDB.value,
+                    MediaTypes.EPISODE.value,
+                    {
                         "title": metadata["title"],
                         "image": ep_img,
                     },
+                    season_number,
+                    episode["number"],
                 )
 
                 episode_instance = app.models.Episode(
@@ -315,21 +371,18 @@ class SimklImporter:
                 )
                 self.bulk_media[MediaTypes.EPISODE.value].append(episode_instance)
 
-    def _get_episode_image(self, episode, season_number, metadata):
+    def _get_episode_image(self, episode_metadata):
         """Get the image for the episode."""
-        for episode_metadata in metadata[f"season/{season_number}"]["episodes"]:
-            if episode_metadata["episode_number"] == episode["number"]:
-                return (
-                    f"https://image.tmdb.org/t/p/w500{episode_metadata['still_path']}"
-                )
-        return settings.IMG_NONE
+        if episode_metadata is None:
+            return settings.IMG_NONE
+        return f"https://image.tmdb.org/t/p/w500{episode_metadata['still_path']}"
 
     def _process_movie_list(self, movie_list):
         """Process movie list from Simkl."""
         logger.info("Processing movies")
-        existing_movie_ids = set()
+        existing_movie_ids = self.imported_ids[MediaTypes.MOVIE.value]
 
-        for movie in movie_list:
+        for movie in self.checkpoint.iterate("movies", movie_list):
             try:
                 title = movie["movie"]["title"]
                 logger.debug("Processing %s", title)
@@ -360,7 +413,7 @@ class SimklImporter:
                 movie_status = self._get_status(movie["status"])
 
                 try:
-                    metadata = app.providers.tmdb.movie(tmdb_id)
+                    metadata = services.get_provider("tmdb").movie(tmdb_id)
                 except services.ProviderAPIError as error:
                     if error.status_code == requests.codes.not_found:
                         self.warnings.append(
@@ -370,11 +423,11 @@ class SimklImporter:
                         continue
                     raise
 
-                movie_item, _ = app.models.Item.objects.get_or_create(
-                    media_id=tmdb_id,
-                    source=Sources.TMDB.value,
-                    media_type=MediaTypes.MOVIE.value,
-                    defaults={
+                movie_item = self.item_resolver.resolve(
+                    tmdb_id,
+                    Sources.TMDB.value,
+                    MediaTypes.MOVIE.value,
+                    {
                         "title": metadata["title"],
                         "image": metadata["image"],
                     },
@@ -402,9 +455,9 @@ class SimklImporter:
     def _process_anime_list(self, anime_list):
         """Process anime list from Simkl."""
         logger.info("Processing anime")
-        existing_anime_ids = set()
+        existing_anime_ids = self.imported_ids[MediaTypes.ANIME.value]
 
-        for anime in anime_list:
+        for anime in self.checkpoint.iterate("anime", anime_list):
             try:
                 title = anime["show"]["title"]
                 logger.debug("Processing %s", title)
@@ -435,7 +488,7 @@ class SimklImporter:
                 anime_status = self._get_status(anime["status"])
 
                 try:
-                    metadata = app.providers.mal.anime(mal_id)
+                    metadata = services.get_provider("mal").anime(mal_id)
                 except services.ProviderAPIError as error:
                     if error.status_code == requests.codes.not_found:
                         self.warnings.append(
@@ -445,11 +498,11 @@ class SimklImporter:
                         continue
                     raise
 
-                anime_item, _ = app.models.Item.objects.get_or_create(
-                    media_id=mal_id,
-                    source=Sources.MAL.value,
-                    media_type=MediaTypes.ANIME.value,
-                    defaults={
+                anime_item = self.item_resolver.resolve(
+                    mal_id,
+                    Sources.MAL.value,
+                    MediaTypes.ANIME.value,
+                    {
                         "title": metadata["title"],
                         "image": metadata["image"],
                     },
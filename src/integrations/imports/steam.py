@@ -8,7 +8,6 @@ from django.conf import settings
 import app
 from app.models import Item, MediaTypes, Sources, Status
 from app.providers import services
-from app.providers.igdb import ExternalGameSource, external_game
 from integrations.imports import helpers
 from integrations.imports.helpers import MediaImportError, MediaImportUnexpectedError
 
@@ -50,6 +49,10 @@ class SteamImporter:
 
         self.bulk_media = defaultdict(list)
 
+        self.item_resolver = helpers.ItemResolver()
+
+        self.igdb_lookup = helpers.ConcurrentLookup(self._match_with_igdb)
+
         logger.info(
             "Initialized Steam importer for Steam ID %s with mode %s",
             steam_id,
@@ -65,9 +68,15 @@ class SteamImporter:
                 logger.info("No games found for Steam user %s", self.steam_id)
                 return {}, ""
 
+            self.igdb_lookup.resolve(
+                (self._get_game_name(game_data), str(game_data["appid"]))
+                for game_data in owned_games
+            )
+
             for game_data in owned_games:
                 self._process_game(game_data)
 
+            self.item_resolver.create_pending()
             helpers.cleanup_existing_media(self.to_delete, self.user)
             helpers.bulk_create_media(self.bulk_media, self.user)
 
@@ -172,13 +181,13 @@ class SteamImporter:
     def _process_game(self, game_data):
         """Process a single game from Steam API response."""
         appid = str(game_data["appid"])
-        name = game_data.get("name", f"Unknown Game {appid}")
+        name = self._get_game_name(game_data)
         playtime_forever = game_data.get("playtime_forever", 0)  # in minutes
         playtime_2weeks = game_data.get("playtime_2weeks", 0)  # in minutes
 
         try:
             # Try to match with IGDB
-            igdb_game = self._match_with_igdb(name, appid)
+            igdb_game = self.igdb_lookup.get(name, appid)
 
             if igdb_game:
                 if not helpers.should_process_media(
@@ -192,11 +201,11 @@ class SteamImporter:
                     return
 
                 # Use IGDB data if found
-                item, _ = app.models.Item.objects.get_or_create(
-                    media_id=str(igdb_game["media_id"]),
-                    source=Sources.IGDB.value,
-                    media_type=MediaTypes.GAME.value,
-                    defaults={
+                item = self.item_resolver.resolve(
+                    igdb_game["media_id"],
+                    Sources.IGDB.value,
+                    MediaTypes.GAME.value,
+                    {
                         "title": igdb_game["title"],
                         "image": igdb_game["image"],
                     },
@@ -251,6 +260,10 @@ class SteamImporter:
             logger.warning("Failed to process Steam game %s (%s): %s", name, appid, e)
             self.warnings.append(f"{name} ({appid}): {e!s}")
 
+    def _get_game_name(self, game_data):
+        """Return the name of the game, with a fallback for unnamed apps."""
+        return game_data.get("name", f"Unknown Game {game_data['appid']}")
+
     def _determine_game_status(self, playtime_forever, playtime_2weeks):
         """Determine game status based on Steam playtime data.
 
@@ -275,13 +288,16 @@ class SteamImporter:
     def _match_with_igdb(self, game_name, steam_appid):
         """Try to match Steam game with IGDB using External Game endpoint."""
         try:
+            igdb = services.get_provider("igdb")
             # Try to find IGDB game by Steam App ID using external_game endpoint
-
-            igdb_game_id = external_game(steam_appid, ExternalGameSource.STEAM)
+            igdb_game_id = igdb.external_game(
+                steam_appid,
+                igdb.ExternalGameSource.STEAM,
+            )
 
             if igdb_game_id:
                 # Get the game details using the IGDB ID
-                game_details = services.get_media_metadata(
+                game_details = self.item_resolver.get_metadata(
                     MediaTypes.GAME.value,
                     str(igdb_game_id),
                     Sources.IGDB.value,
@@ -1,6 +1,7 @@
 import json
 import logging
 from collections import defaultdict
+from functools import partial
 
 import requests
 from django.conf import settings
@@ -154,13 +155,31 @@ class TraktImporter:
         self.existing_media = helpers.get_existing_media(user)
 
         # Track media IDs to delete in overwrite mode
-        self.to_delete = defaultdict(lambda: defaultdict(set))
+        self.to_delete = defaultdict(partial(defaultdict, set))
 
         # Track bulk creation lists for each media type
         self.bulk_media = defaultdict(list)
 
         # Track media instances being created
-        self.media_instances = defaultdict(lambda: defaultdict(list))
+        self.media_instances = defaultdict(partial(defaultdict, list))
+
+        # Resolve items and metadata once per media
+        self.item_resolver = helpers.ItemResolver()
+
+        # Resume from the last checkpoint if the task was redelivered
+        self.checkpoint = helpers.ImportCheckpoint(
+            self,
+            [
+                "warnings",
+                "to_delete",
+                "bulk_media",
+                "media_instances",
+                "item_resolver",
+            ],
+            ["history", "watchlist", "ratings", "comments"],
+            # the refresh token is single use, the access token is kept to resume
+            secret_attrs=["access_token"],
+        )
 
         logger.info(
             "Initialized Trakt importer for user %s with mode %s",
@@ -175,8 +194,10 @@ class TraktImporter:
         self.process_ratings()
         self.process_comments()
 
+        self.item_resolver.create_pending()
         helpers.cleanup_existing_media(self.to_delete, self.user)
         helpers.bulk_create_media(self.bulk_media, self.user)
+        self.checkpoint.clear()
 
         imported_counts = {
             media_type: len(media_list)
@@ -252,10 +273,14 @@ class TraktImporter:
         """Process watch history from Trakt."""
         logger.info("Importing watch history for user %s", self.username)
         history_endpoint = f"{self.user_base_url}/history"
-        full_history = self._get_paginated_data(history_endpoint, "history entries")
+        full_history = self.checkpoint.fetch(
+            "history",
+            lambda: self._get_paginated_data(history_endpoint, "history entries"),
+        )
+        self._prefetch_items(full_history)
 
         # Process in chronological order (oldest first)
-        for entry in reversed(full_history):
+        for entry in self.checkpoint.iterate("history", full_history[::-1]):
             watched_at = entry["watched_at"]
             try:
                 if entry["type"] == "movie":
@@ -278,6 +303,25 @@ class TraktImporter:
                 msg = f"Error processing history entry: {entry}"
                 raise MediaImportUnexpectedError(msg) from e
 
+    def _prefetch_items(self, entries):
+        """Load the existing items of all the entries in bulk."""
+        tmdb_ids = set()
+        for entry in entries:
+            media_data = entry.get("movie") or entry.get("show")
+            if media_data and media_data.get("ids", {}).get("tmdb"):
+                tmdb_ids.add(media_data["ids"]["tmdb"])
+
+        self.item_resolver.prefetch(
+            Sources.TMDB.value,
+            tmdb_ids,
+            [
+                MediaTypes.MOVIE.value,
+                MediaTypes.TV.value,
+                MediaTypes.SEASON.value,
+                MediaTypes.EPISODE.value,
+            ],
+        )
+
     def _get_tmdb_id(self, entry_data):
         """Extract TMDB ID from entry data."""
         if (
@@ -295,15 +339,11 @@ class TraktImporter:
     def _get_metadata(self, media_type, tmdb_id, title, season_number=None):
         """Get metadata for a media item."""
         try:
-            kwargs = {}
-            if season_number is not None:
-                kwargs["season_numbers"] = [season_number]
-
-            return services.get_media_metadata(
+            return self.item_resolver.get_metadata(
                 media_type,
                 tmdb_id,
                 Sources.TMDB.value,
-                **kwargs,
+                [season_number] if season_number is not None else None,
             )
         except services.ProviderAPIError as error:
             if error.status_code == requests.codes.not_found:
@@ -323,31 +363,19 @@ class TraktImporter:
         season_number=None,
         episode_number=None,
     ):
-        """Get or create an item in the database."""
-        item_kwargs = {
-            "media_id": tmdb_id,
-            "source": Sources.TMDB.value,
-            "media_type": media_type,
-        }
-
-        if season_number is not None:
-            item_kwargs["season_number"] = season_number
-
-        if episode_number is not None:
-            item_kwargs["episode_number"] = episode_number
-
-        defaults = {
-            "title": metadata["title"],
-            "image": metadata["image"],
-        }
-
-        item, _ = app.models.Item.objects.get_or_create(
-            **item_kwargs,
-            defaults=defaults,
+        """Get or create an item, created in bulk at the end of the import."""
+        return self.item_resolver.resolve(
+            tmdb_id,
+            Sources.TMDB.value,
+            media_type,
+            {
+                "title": metadata["title"],
+                "image": metadata["image"],
+            },
+            season_number,
+            episode_number,
         )
 
-        return item
-
     def process_watched_movie(self, entry):
         """Process a single movie watch event."""
         movie = entry["movie"]
@@ -386,13 +414,10 @@ class TraktImporter:
         self.media_instances[MediaTypes.MOVIE.value][key].append(movie_obj)
         self.bulk_media[MediaTypes.MOVIE.value].append(movie_obj)
 
-    def _get_episode_image(self, episode_number, season_metadata):
-        """Extract episode image URL from season metadata."""
-        for episode in season_metadata["episodes"]:
-            if episode["episode_number"] == episode_number:
-                if episode.get("still_path"):
-                    return f"https://image.tmdb.org/t/p/w500{episode['still_path']}"
-                break
+    def _get_episode_image(self, episode_metadata):
+        """Extract episode image URL from its metadata."""
+        if episode_metadata.get("still_path"):
+            return f"https://image.tmdb.org/t/p/w500{episode_metadata['still_path']}"
         return settings.IMG_NONE
 
     def process_watched_episode(self, entry):
@@ -433,18 +458,21 @@ class TraktImporter:
             return
 
         # Validate episode number exists in TMDB
-        episode_exists = any(
-            ep["episode_number"] == episode_number for ep in season_metadata["episodes"]
-        )
+        episode_metadata = self.item_resolver.get_episodes(
+            tmdb_id,
+            Sources.TMDB.value,
+            season_number,
+            season_metadata,
+        ).get(episode_number)
 
-        if not episode_exists:
+        if episode_metadata is None:
             item_identifier = f"{show['title']} S{season_number}E{episode_number}"
             self.warnings.append(
                 f"{item_identifier}: not found in TMDB with ID {tmdb_id}.",
             )
             return
 
-        episode_image = self._get_episode_image(episode_number, season_metadata)
+        episode_image = self._get_episode_image(episode_metadata)
         watched_at = entry["watched_at"]
 
         # Create or get TV show
@@ -486,14 +514,10 @@ class TraktImporter:
             season_obj = self.media_instances[MediaTypes.SEASON.value][season_key][0]
 
         # Create Episode item and object
-        episode_metadata = {
-            "title": tv_metadata["title"],
-            "image": episode_image,
-        }
         episode_item = self._get_or_create_item(
             MediaTypes.EPISODE.value,
             tmdb_id,
-            episode_metadata,
+            {"title": tv_metadata["title"], "image": episode_image},
             season_number,
             episode_number,
         )
@@ -540,9 +564,13 @@ class TraktImporter:
         """Process watchlist from Trakt."""
         logger.info("Importing watchlist for user %s", self.username)
         watchlist_endpoint = f"{self.user_base_url}/watchlist"
-        watchlist_data = self._make_api_request(watchlist_endpoint)
+        watchlist_data = self.checkpoint.fetch(
+            "watchlist",
+            lambda: self._make_api_request(watchlist_endpoint),
+        )
+        self._prefetch_items(watchlist_data)
 
-        for entry in watchlist_data:
+        for entry in self.checkpoint.iterate("watchlist", watchlist_data):
             try:
                 self._process_generic_entry(
                     entry,
@@ -557,9 +585,13 @@ class TraktImporter:
         """Process ratings from Trakt."""
         logger.info("Importing ratings for user %s", self.username)
         ratings_endpoint = f"{self.user_base_url}/ratings"
-        ratings_data = self._make_api_request(ratings_endpoint)
+        ratings_data = self.checkpoint.fetch(
+            "ratings",
+            lambda: self._make_api_request(ratings_endpoint),
+        )
+        self._prefetch_items(ratings_data)
 
-        for entry in ratings_data:
+        for entry in self.checkpoint.iterate("ratings", ratings_data):
             try:
                 self._process_generic_entry(
                     entry,
@@ -574,9 +606,13 @@ class TraktImporter:
         """Process comments from Trakt."""
         logger.info("Importing comments for user %s", self.username)
         comments_endpoint = f"{self.user_base_url}/comments"
-        full_comments = self._get_paginated_data(comments_endpoint, "comments")
+        full_comments = self.checkpoint.fetch(
+            "comments",
+            lambda: self._get_paginated_data(comments_endpoint, "comments"),
+        )
+        self._prefetch_items(full_comments)
 
-        for entry in full_comments:
+        for entry in self.checkpoint.iterate("comments", full_comments):
             try:
                 self._process_generic_entry(
                     entry,
@@ -24,6 +24,9 @@ from integrations.imports import (
 logger = logging.getLogger(__name__)
 ERROR_TITLE = "\n\n\n Couldn't import the following media: \n\n"
 
+# Redeliver the imports that resume from a checkpoint if the worker dies
+RESUMABLE_IMPORT_OPTIONS = {"acks_late": True, "reject_on_worker_lost": True}
+
 
 def format_media_type_display(count, media_type):
     """Format media type display with proper pluralization."""
@@ -76,13 +79,13 @@ def import_media(importer_func, identifier, user_id, mode, oauth_username=None):
     return format_import_message(imported_counts, warnings)
 
 
-@shared_task(name="Import from Trakt")
+@shared_task(name="Import from Trakt", **RESUMABLE_IMPORT_OPTIONS)
 def import_trakt(user_id, mode, token=None, username=None):
     """Celery task for importing media data from Trakt."""
     return import_media(trakt.importer, token, user_id, mode, username)
 
 
-@shared_task(name="Import from SIMKL")
+@shared_task(name="Import from SIMKL", **RESUMABLE_IMPORT_OPTIONS)
 def import_simkl(token, user_id, mode, username=None):  # noqa: ARG001
     """Celery task for importing media data from SIMKL."""
     return import_media(simkl.importer, token, user_id, mode)
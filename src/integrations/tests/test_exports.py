@@ -1,13 +1,17 @@
 import csv
+import gzip
+import json
 from datetime import UTC, datetime
 from io import StringIO
 
+import zstandard
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from django.test import TestCase
 from django.urls import reverse
 
 from app.models import (
+    TV,
     Anime,
     Book,
     Episode,
@@ -174,3 +178,76 @@ class ExportCSVTest(TestCase):
         for row in reader:
             media_id = row["media_id"]
             self.assertIn(media_id, db_media_ids)
+
+    def test_export_jsonl_gzip(self):
+        """Test exporting media to gzip compressed JSON lines."""
+        response = self.client.get(
+            reverse("export_csv"),
+            {"format": "jsonl", "compression": "gzip"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(".jsonl.gz", response["Content-Disposition"])
+
+        content = gzip.decompress(b"".join(response.streaming_content))
+        records = [json.loads(line) for line in content.decode().splitlines()]
+
+        movie = next(
+            record
+            for record in records
+            if record["media_type"] == MediaTypes.MOVIE.value
+        )
+        self.assertEqual(movie["title"], "Perfect Blue")
+        self.assertEqual(movie["score"], "9.0")
+        self.assertEqual(movie["notes"], "Nice")
+
+        season = next(
+            record
+            for record in records
+            if record["media_type"] == MediaTypes.SEASON.value
+        )
+        self.assertEqual(season["progress"], 1)
+        self.assertEqual(season["end_date"], "2023-06-01T00:00:00Z")
+
+    def test_export_tv_without_seasons(self):
+        """Test that a TV show without seasons is exported with no progress."""
+        item_tv = Item.objects.create(
+            media_id="1396",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.TV.value,
+            title="Breaking Bad",
+            image="https://image.url",
+        )
+        TV.objects.create(
+            item=item_tv,
+            user=self.user,
+            status=Status.PLANNING.value,
+        )
+
+        response = self.client.get(reverse("export_csv"))
+        content = b"".join(response.streaming_content).decode("utf-8")
+
+        tv = next(
+            row
+            for row in csv.DictReader(StringIO(content))
+            if row["media_type"] == MediaTypes.TV.value
+        )
+        self.assertEqual(tv["progress"], "0")
+        self.assertEqual(tv["end_date"], "")
+
+    def test_export_csv_zstd(self):
+        """Test that the zstd export matches the plain CSV export."""
+        plain = self.client.get(reverse("export_csv"))
+        compressed = self.client.get(reverse("export_csv"), {"compression": "zstd"})
+
+        self.assertEqual(compressed["Content-Type"], "application/zstd")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        content = decompressor.decompress(b"".join(compressed.streaming_content))
+        self.assertEqual(content, b"".join(plain.streaming_content))
+
+    def test_export_invalid_format(self):
+        """Test that unknown export formats are rejected."""
+        response = self.client.get(reverse("export_csv"), {"format": "xml"})
+
+        self.assertEqual(response.status_code, 400)
@@ -1,10 +1,16 @@
 import json
+import os
+import subprocess
+import sys
+import textwrap
 from datetime import UTC, datetime
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 from django_celery_beat.models import CrontabSchedule, PeriodicTask
@@ -25,6 +31,8 @@ from app.models import (
     Sources,
     Status,
 )
+from config.celery import app as celery_app
+from integrations import tasks
 from integrations.imports import (
     anilist,
     goodreads,
@@ -805,6 +813,66 @@ class ImportSimkl(TestCase):
         for episode in season1_episodes:
             self.assertIsNotNone(episode.end_date)
 
+    def test_anime_in_fresh_process(self):
+        """Test the anime are imported by a worker that never loaded MAL."""
+        # Providers are imported on first use, the test modules import them all
+        script = textwrap.dedent(
+            """
+            import sys
+            from unittest.mock import patch
+
+            import django
+
+            django.setup()
+
+            import config.urls
+            from config.celery import app
+
+            app.loader.import_default_modules()
+            assert "app.providers.mal" not in sys.modules
+
+            from django.contrib.auth import get_user_model
+            from django.core.cache import cache
+
+            from app.models import Item
+            from integrations.imports import helpers, simkl
+
+            cache.set("mal_anime_1", {"title": "Example Anime", "image": ""})
+            existing = {"anime": {"mal": set()}}
+            with patch.object(helpers, "get_existing_media", return_value=existing):
+                importer = simkl.SimklImporter(
+                    helpers.encrypt("token"),
+                    get_user_model()(username="test"),
+                    "new",
+                )
+            with patch.object(importer.item_resolver, "resolve", return_value=Item()):
+                importer._process_anime_list(
+                    [
+                        {
+                            "show": {"title": "Example Anime", "ids": {"mal": 1}},
+                            "status": "plantowatch",
+                            "user_rating": 7,
+                            "watched_episodes_count": 0,
+                            "last_watched_at": None,
+                            "memo": {},
+                        },
+                    ],
+                )
+            assert len(importer.bulk_media["anime"]) == 1
+            """,
+        )
+
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.test_settings"},
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+
 
 class ImportIMDB(TestCase):
     """Test importing media from IMDB CSV."""
@@ -1045,6 +1113,182 @@ class HelpersTest(TestCase):
         # Check if reference was updated
         self.assertEqual(new_episode.related_season.id, season.id)
 
+    def test_item_resolver_bulk_creates_pending_items(self):
+        """Test that the resolver reuses existing items and creates the rest."""
+        existing = Item.objects.create(
+            media_id="1",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="Existing",
+            image="existing.jpg",
+        )
+        resolver = helpers.ItemResolver()
+
+        with self.assertNumQueries(1):
+            resolver.prefetch(
+                Sources.TMDB.value,
+                ["1", "2"],
+                [MediaTypes.MOVIE.value],
+            )
+
+        with self.assertNumQueries(0):
+            existing_item = resolver.resolve(
+                "1",
+                Sources.TMDB.value,
+                MediaTypes.MOVIE.value,
+                {"title": "Existing", "image": "existing.jpg"},
+            )
+            new_item = resolver.resolve(
+                "2",
+                Sources.TMDB.value,
+                MediaTypes.MOVIE.value,
+                {"title": "New", "image": "new.jpg"},
+            )
+            repeated_item = resolver.resolve(
+                2,
+                Sources.TMDB.value,
+                MediaTypes.MOVIE.value,
+                {"title": "New", "image": "new.jpg"},
+            )
+
+        self.assertEqual(existing_item.pk, existing.pk)
+        self.assertIsNone(new_item.pk)
+        self.assertIs(new_item, repeated_item)
+
+        resolver.create_pending()
+
+        self.assertIsNotNone(new_item.pk)
+        self.assertEqual(Item.objects.count(), 2)
+
+    def test_item_resolver_updates_existing_items(self):
+        """Test that the resolver refreshes title and image when asked to."""
+        Item.objects.create(
+            media_id="1",
+            source=Sources.IGDB.value,
+            media_type=MediaTypes.GAME.value,
+            title="Old Title",
+            image="old.jpg",
+        )
+        resolver = helpers.ItemResolver()
+        resolver.resolve(
+            "1",
+            Sources.IGDB.value,
+            MediaTypes.GAME.value,
+            {"title": "New Title", "image": "new.jpg"},
+            update=True,
+        )
+        resolver.create_pending()
+
+        item = Item.objects.get(media_id="1", source=Sources.IGDB.value)
+        self.assertEqual(item.title, "New Title")
+        self.assertEqual(item.image, "new.jpg")
+
+    @patch("app.providers.services.get_media_metadata")
+    def test_item_resolver_memoizes_metadata(self, mock_get_metadata):
+        """Test that metadata is only requested once per media."""
+        mock_get_metadata.return_value = {"title": "Show", "image": "show.jpg"}
+        resolver = helpers.ItemResolver()
+
+        for _ in range(3):
+            resolver.get_metadata(MediaTypes.TV.value, "1", Sources.TMDB.value)
+        resolver.get_metadata(MediaTypes.SEASON.value, "1", Sources.TMDB.value, [1])
+
+        self.assertEqual(mock_get_metadata.call_count, 2)
+
+    def test_concurrent_lookup(self):
+        """Test that each distinct key is looked up once and errors are kept."""
+        calls = []
+
+        def lookup(title, year):
+            calls.append(title)
+            if title == "Missing":
+                msg = "Not found"
+                raise ValueError(msg)
+            return f"{title} ({year})"
+
+        lookup_results = helpers.ConcurrentLookup(lookup, max_workers=3)
+        lookup_results.resolve(
+            [("Dune", 2021), ("Alien", 1979), ("Dune", 2021), ("Missing", 2000)],
+        )
+
+        self.assertEqual(lookup_results.get("Dune", 2021), "Dune (2021)")
+        self.assertEqual(lookup_results.get("Heat", 1995), "Heat (1995)")
+        with self.assertRaises(ValueError):
+            lookup_results.get("Missing", 2000)
+        self.assertEqual(sorted(calls), ["Alien", "Dune", "Heat", "Missing"])
+
+    @patch("integrations.imports.helpers.time.monotonic")
+    @patch("integrations.imports.helpers.current_task")
+    def test_import_checkpoint_resume(self, mock_task, mock_monotonic):
+        """Test that a redelivered import resumes from the last checkpoint."""
+        mock_task.request.id = "import-task"
+        mock_monotonic.return_value = 0
+        entries = list(range(helpers.IMPORT_PROGRESS_INTERVAL + 10))
+        saved, lost = 100, 150
+        token = "trakt-access-token"  # noqa: S105
+
+        importer = SimpleNamespace(warnings=[], access_token=token)
+        checkpoint = helpers.ImportCheckpoint(
+            importer,
+            ["warnings"],
+            ["entries"],
+            secret_attrs=["access_token"],
+        )
+        fetched = checkpoint.fetch("entries", lambda: entries)
+        for entry in checkpoint.iterate("entries", fetched):
+            importer.warnings.append(entry)
+            if entry == saved - 1:
+                # the interval passed while processing this entry
+                mock_monotonic.return_value = helpers.IMPORT_CHECKPOINT_INTERVAL
+            if entry == lost:
+                break  # worker died before the next checkpoint
+
+        state = cache.get("import_checkpoint_import-task")
+        self.assertNotIn(token, str(state))
+
+        resumed = SimpleNamespace(warnings=[])
+        checkpoint = helpers.ImportCheckpoint(
+            resumed,
+            ["warnings"],
+            ["entries"],
+            secret_attrs=["access_token"],
+        )
+        fetch_func = Mock()
+        fetched = checkpoint.fetch("entries", fetch_func)
+        remaining = list(checkpoint.iterate("entries", fetched))
+
+        fetch_func.assert_not_called()
+        self.assertEqual(resumed.warnings, entries[:saved])
+        self.assertEqual(resumed.access_token, token)
+        self.assertEqual(remaining, entries[saved:])
+        mock_task.update_state.assert_called_with(
+            state="PROGRESS",
+            meta={"progress": 100, "stage": "entries"},
+        )
+
+        checkpoint.clear()
+        self.assertIsNone(cache.get("import_checkpoint_import-task"))
+        self.assertIsNone(cache.get("import_checkpoint_import-task_entries"))
+
+    @patch("integrations.imports.helpers.current_task")
+    def test_import_checkpoint_max_deliveries(self, mock_task):
+        """Test that an import killing its worker isn't redelivered forever."""
+        mock_task.request.id = "import-task-lost"
+
+        for _ in range(helpers.IMPORT_MAX_DELIVERIES):
+            helpers.ImportCheckpoint(SimpleNamespace(), [], ["entries"])
+
+        with self.assertRaises(helpers.MediaImportError):
+            helpers.ImportCheckpoint(SimpleNamespace(), [], ["entries"])
+        self.assertIsNone(cache.get("import_checkpoint_import-task-lost_deliveries"))
+
+    def test_resumable_import_tasks(self):
+        """Test that only the imports resuming from a checkpoint are redelivered."""
+        self.assertTrue(tasks.import_trakt.acks_late)
+        self.assertTrue(tasks.import_simkl.acks_late)
+        self.assertFalse(tasks.import_mal.acks_late)
+        self.assertFalse(tasks.import_yamtrack.reject_on_worker_lost)
+
     @patch("django.contrib.messages.error")
     def test_create_import_schedule(self, mock_messages):
         """Test creating import schedule."""
@@ -1128,7 +1372,7 @@ class ImportSteam(TestCase):
         self.user = get_user_model().objects.create_user(**self.credentials)
 
     @patch("integrations.imports.steam.services.api_request")
-    @patch("integrations.imports.steam.external_game")
+    @patch("app.providers.igdb.external_game")
     @patch("integrations.imports.steam.services.get_media_metadata")
     def test_import_steam_games(
         self,
@@ -1217,7 +1461,7 @@ class ImportSteam(TestCase):
         self.assertIn("private or invalid", str(context.exception))
 
     @patch("integrations.imports.steam.services.api_request")
-    @patch("integrations.imports.steam.external_game")
+    @patch("app.providers.igdb.external_game")
     def test_import_steam_game_not_found_in_igdb(
         self,
         mock_external_game,
@@ -1287,3 +1531,19 @@ class ImportSteam(TestCase):
                 steam.importer("76561198000000000", self.user, "new")
 
             self.assertIn("Steam API key not configured", str(context.exception))
+
+
+class ImportTaskRouting(TestCase):
+    """Test that import tasks run on their own queue."""
+
+    def test_import_tasks_use_imports_queue(self):
+        """Test routing of import tasks and latency sensitive tasks."""
+        router = celery_app.amqp.router
+
+        for task_name in ("Import from Trakt", "Import from GoodReads"):
+            route = router.route({}, task_name)
+            self.assertEqual(route["queue"].name, settings.IMPORTS_QUEUE)
+
+        for task_name in ("Reload calendar", "Send release notifications"):
+            route = router.route({}, task_name)
+            self.assertEqual(route["queue"].name, settings.CELERY_TASK_DEFAULT_QUEUE)
@@ -323,14 +323,42 @@ def import_goodreads(request):
 
 @require_GET
 def export_csv(request):
-    """View for exporting all media data to a CSV file."""
+    """View for exporting all media data to a CSV or JSONL file.
+
+    The file can optionally be compressed with gzip or zstd.
+    """
+    export_format = request.GET.get("format", "csv")
+    compression = request.GET.get("compression", "")
+
+    if export_format not in exports.EXPORT_FORMATS or (
+        compression and compression not in exports.EXPORT_COMPRESSIONS
+    ):
+        return HttpResponse("Invalid export format", status=400)
+
+    if export_format == "jsonl":
+        streaming_content = exports.generate_jsonl(request.user)
+    else:
+        streaming_content = exports.generate_rows(request.user)
+
     now = timezone.localtime()
+    filename = f"yamtrack_{now}.{export_format}"
+    content_type = exports.EXPORT_FORMATS[export_format]
+
+    if compression:
+        streaming_content = exports.compress(streaming_content, compression)
+        extension, content_type = exports.EXPORT_COMPRESSIONS[compression]
+        filename = f"{filename}.{extension}"
+
     response = StreamingHttpResponse(
-        streaming_content=exports.generate_rows(request.user),
-        content_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="yamtrack_{now}.csv"'},
+        streaming_content=streaming_content,
+        content_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+    logger.info(
+        "User %s started %s export",
+        request.user.username,
+        export_format.upper(),
     )
-    logger.info("User %s started CSV export", request.user.username)
     return response
 
 
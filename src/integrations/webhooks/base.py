@@ -5,6 +5,7 @@ from django.utils import timezone
 
 import app
 from app.models import MediaTypes, Sources, Status
+from app.providers import services
 
 logger = logging.getLogger(__name__)
 
@@ -62,9 +63,10 @@ class BaseWebhookProcessor:
             logger.warning("No matching TMDB ID found for TV show")
             return
 
-        tvdb_id = app.providers.tmdb.tv_with_seasons(media_id, [season_number])[
-            "tvdb_id"
-        ]
+        tvdb_id = services.get_provider("tmdb").tv_with_seasons(
+            media_id,
+            [season_number],
+        )["tvdb_id"]
 
         if not tvdb_id:
             logger.warning("No TVDB ID found for TMDB ID: %s", media_id)
@@ -111,7 +113,7 @@ class BaseWebhookProcessor:
         elif ids["imdb_id"]:
             logger.debug("No TMDB ID found, looking up via IMDB ID: %s", ids["imdb_id"])
 
-            response = app.providers.tmdb.find(ids["imdb_id"], "imdb_id")
+            response = services.get_provider("tmdb").find(ids["imdb_id"], "imdb_id")
             if response.get("movie_results"):
                 media_id = response["movie_results"][0]["id"]
                 logger.info("Found matching TMDB ID: %s", media_id)
@@ -132,7 +134,7 @@ class BaseWebhookProcessor:
             (ids["tvdb_id"], "tvdb_id"),
         ]:
             if ext_id:
-                response = app.providers.tmdb.find(ext_id, ext_type)
+                response = services.get_provider("tmdb").find(ext_id, ext_type)
                 if response.get("tv_episode_results"):
                     result = response["tv_episode_results"][0]
                     return (
@@ -147,7 +149,7 @@ class BaseWebhookProcessor:
         data = cache.get("anime_mapping_data")
         if data is None:
             url = "https://raw.githubusercontent.com/Kometa-Team/Anime-IDs/refs/heads/master/anime_ids.json"
-            data = app.providers.services.api_request("GITHUB", "GET", url)
+            data = services.api_request("GITHUB", "GET", url)
             cache.set("anime_mapping_data", data)
         return data
 
@@ -202,7 +204,7 @@ class BaseWebhookProcessor:
 
     def _handle_movie(self, media_id, payload, user):
         """Handle movie playback event."""
-        movie_metadata = app.providers.tmdb.movie(media_id)
+        movie_metadata = services.get_provider("tmdb").movie(media_id)
         movie_item, _ = app.models.Item.objects.get_or_create(
             media_id=media_id,
             source=Sources.TMDB.value,
@@ -267,7 +269,10 @@ class BaseWebhookProcessor:
         user,
     ):
         """Handle TV episode playback event."""
-        tv_metadata = app.providers.tmdb.tv_with_seasons(media_id, [season_number])
+        tv_metadata = services.get_provider("tmdb").tv_with_seasons(
+            media_id,
+            [season_number],
+        )
         season_metadata = tv_metadata[f"season/{season_number}"]
 
         tv_item, _ = app.models.Item.objects.get_or_create(
@@ -383,7 +388,7 @@ class BaseWebhookProcessor:
 
     def _handle_anime(self, media_id, episode_number, payload, user):
         """Handle anime playback event."""
-        anime_metadata = app.providers.mal.anime(media_id)
+        anime_metadata = services.get_provider("mal").anime(media_id)
         anime_item, _ = app.models.Item.objects.get_or_create(
             media_id=media_id,
             source=Sources.MAL.value,
@@ -1,32 +1,64 @@
+from collections import defaultdict
+
 from django.conf import settings
 from django.db import models
-from django.db.models import Prefetch, Q
+from django.db.models import Count, F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
 
 from app.models import Item
 
+# Images of the last added items shown as the cover of a list
+LIST_COVERS = 1
+
 
 class CustomListManager(models.Manager):
     """Manager for custom lists."""
 
     def get_user_lists(self, user):
-        """Return the custom lists that the user owns or collaborates on."""
+        """Return the custom lists that the user owns or collaborates on.
+
+        Only the number of items is annotated, use `attach_covers` for the
+        images of the lists that are displayed.
+        """
+        items_count = (
+            CustomListItem.objects.filter(custom_list=OuterRef("pk"))
+            .order_by()
+            .values("custom_list")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
         return (
             self.filter(Q(owner=user) | Q(collaborators=user))
             .select_related("owner")
-            .prefetch_related(
-                "collaborators",
-                Prefetch(
-                    "items",
-                    queryset=Item.objects.order_by("-customlistitem__date_added"),
-                ),
-                Prefetch(
-                    "customlistitem_set",
-                    queryset=CustomListItem.objects.order_by("-date_added"),
+            .prefetch_related("collaborators")
+            .annotate(items_count=Coalesce(Subquery(items_count), 0))
+            .distinct()
+        )
+
+    def attach_covers(self, custom_lists, count=LIST_COVERS):
+        """Set the images of the last items added to each of the lists."""
+        custom_lists = list(custom_lists)
+        latest_items = (
+            CustomListItem.objects.filter(custom_list__in=custom_lists)
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("custom_list_id"),
+                    order_by=[F("date_added").desc(), F("id").desc()],
                 ),
             )
-            .distinct()
+            .filter(position__lte=count)
+            .order_by("custom_list_id", "position")
+            .values_list("custom_list_id", "item__image")
         )
 
+        covers = defaultdict(list)
+        for custom_list_id, image in latest_items:
+            covers[custom_list_id].append(image)
+
+        for custom_list in custom_lists:
+            custom_list.covers = covers[custom_list.id]
+
     def get_user_lists_with_item(self, user, item):
         """Return user lists with item membership status."""
         return (
@@ -88,8 +120,12 @@ class CustomList(models.Model):
 
     @property
     def image(self):
-        """Return the image of the first item in the list."""
-        return self.items.first().image if self.items.first() else settings.IMG_NONE
+        """Return the cover image of the list."""
+        if hasattr(self, "covers"):
+            return self.covers[0] if self.covers else settings.IMG_NONE
+
+        first_item = self.items.first()
+        return first_item.image if first_item else settings.IMG_NONE
 
 
 class CustomListItemManager(models.Manager):
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from django.test import TestCase
@@ -105,3 +106,40 @@ class CustomListManagerTest(TestCase):
         self.assertEqual(user_lists.count(), 2)
         self.assertIn(self.list1, user_lists)
         self.assertIn(self.list2, user_lists)
+
+    def test_get_user_lists_items_count(self):
+        """Test the lists are annotated with their number of items."""
+        item = Item.objects.create(
+            media_id="1",
+            source=Sources.TMDB.value,
+            media_type=MediaTypes.MOVIE.value,
+            title="Test Movie",
+        )
+        CustomListItem.objects.create(custom_list=self.list1, item=item)
+
+        counts = {
+            custom_list.id: custom_list.items_count
+            for custom_list in CustomList.objects.get_user_lists(self.user)
+        }
+        self.assertEqual(counts, {self.list1.id: 1, self.list2.id: 0})
+
+    def test_attach_covers(self):
+        """Test the cover of each list is its most recently added item."""
+        items = [
+            Item.objects.create(
+                media_id=str(number),
+                source=Sources.TMDB.value,
+                media_type=MediaTypes.MOVIE.value,
+                title=f"Movie {number}",
+                image=f"http://example.com/{number}.jpg",
+            )
+            for number in range(3)
+        ]
+        for item in items:
+            CustomListItem.objects.create(custom_list=self.list1, item=item)
+
+        CustomList.objects.attach_covers([self.list1, self.list2])
+        self.assertEqual(self.list1.covers, [items[-1].image])
+        self.assertEqual(self.list1.image, items[-1].image)
+        self.assertEqual(self.list2.covers, [])
+        self.assertEqual(self.list2.image, settings.IMG_NONE)
@@ -168,6 +168,41 @@ class ListsViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context["custom_lists"]), 7)  # 7 remaining items
 
+    @patch.object(get_user_model(), "update_preference")
+    def test_lists_view_counts_and_covers(self, mock_update_preference):
+        """Test the lists page annotates counts and covers without edit forms."""
+        mock_update_preference.return_value = "name"
+        self.client.login(**self.credentials)
+
+        response = self.client.get(reverse("lists"))
+        lists = {
+            custom_list.id: custom_list
+            for custom_list in response.context["custom_lists"]
+        }
+        self.assertEqual(lists[self.list1.id].items_count, 1)
+        self.assertEqual(lists[self.list1.id].covers, [self.item1.image])
+        self.assertEqual(lists[self.list2.id].covers, [self.item2.image])
+        self.assertNotContains(response, f'id="id_{self.list1.id}_name"')
+        self.assertContains(response, reverse("list_form", args=[self.list1.id]))
+
+    def test_list_form_view(self):
+        """Test the edit form of a list is loaded on demand."""
+        self.client.login(**self.collaborator_credentials)
+        response = self.client.get(
+            reverse("list_form", args=[self.list1.id]) + "?next=/lists",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "lists/components/list_form.html")
+        self.assertEqual(response.context["custom_list"], self.list1)
+        self.assertContains(response, f'id="id_{self.list1.id}_name"')
+        self.assertContains(response, "?next=/lists")
+
+    def test_list_form_view_unauthorized(self):
+        """Test the edit form is not shown to users who can't edit the list."""
+        self.client.login(**self.collaborator_credentials)
+        response = self.client.get(reverse("list_form", args=[self.list2.id]))
+        self.assertEqual(response.status_code, 404)
+
 
 class ListDetailViewTests(TestCase):
     """Tests for the list_detail view."""
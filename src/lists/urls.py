@@ -20,6 +20,7 @@ urlpatterns = [
         name="lists_modal",
     ),
     path("list/<int:list_id>", views.list_detail, name="list_detail"),
+    path("list/<int:list_id>/form", views.list_form, name="list_form"),
     path("list/create", views.create, name="list_create"),
     path("list/edit", views.edit, name="list_edit"),
     path("list/delete", views.delete, name="list_delete"),
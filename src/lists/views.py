@@ -3,7 +3,7 @@ import logging
 from django.apps import apps
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models import F, OuterRef, Q, Subquery
 from django.http import Http404
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.http import require_GET, require_POST
@@ -11,6 +11,7 @@ from django.views.decorators.http import require_GET, require_POST
 from app import helpers
 from app.models import Item, MediaManager, MediaTypes
 from app.providers import services
+from app.search import title_contains
 from lists.forms import CustomListForm
 from lists.models import CustomList, CustomListItem
 from users.models import ListDetailSortChoices, ListSortChoices
@@ -36,9 +37,7 @@ def lists(request):
     if sort_by == "name":
         custom_lists = custom_lists.order_by("name")
     elif sort_by == "items_count":
-        custom_lists = custom_lists.annotate(
-            items_count=Count("items", distinct=True),
-        ).order_by("-items_count")
+        custom_lists = custom_lists.order_by("-items_count")
     elif sort_by == "newest_first":
         custom_lists = custom_lists.order_by("-id")
     else:  # last_item_added is the default
@@ -57,13 +56,8 @@ def lists(request):
     paginator = Paginator(custom_lists, items_per_page)
     lists_page = paginator.get_page(page)
 
-    # Create a form for each list
-    # needs unique id for django-select2
-    for i, custom_list in enumerate(lists_page, start=1):
-        custom_list.form = CustomListForm(
-            instance=custom_list,
-            auto_id=f"id_{i}_%s",
-        )
+    # the edit forms are loaded when opened, see list_form
+    CustomList.objects.attach_covers(lists_page)
 
     if request.headers.get("HX-Request"):
         return render(
@@ -114,7 +108,7 @@ def list_detail(request, list_id):
     # Build and filter base queryset
     items = custom_list.items.all()
     if params["search_query"]:
-        items = items.filter(title__icontains=params["search_query"])
+        items = items.filter(title_contains(params["search_query"]))
     if params["media_type"] != "all":
         items = items.filter(media_type=params["media_type"])
 
@@ -211,6 +205,30 @@ def create(request):
     return helpers.redirect_back(request)
 
 
+@require_GET
+def list_form(request, list_id):
+    """Return the edit form of a custom list, loaded when it's opened."""
+    custom_list = get_object_or_404(
+        CustomList.objects.select_related("owner").prefetch_related("collaborators"),
+        id=list_id,
+    )
+
+    if not custom_list.user_can_edit(request.user):
+        msg = "List not found"
+        raise Http404(msg)
+
+    return render(
+        request,
+        "lists/components/list_form.html",
+        {
+            # needs unique id for django-select2
+            "form": CustomListForm(instance=custom_list, auto_id=f"id_{list_id}_%s"),
+            "custom_list": custom_list,
+            "next": request.GET.get("next", request.path),
+        },
+    )
+
+
 @require_POST
 def edit(request):
     """Edit an existing custom list."""
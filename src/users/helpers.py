@@ -3,9 +3,18 @@ import zoneinfo
 from datetime import datetime
 
 import croniter
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
 
 import integrations
+from users import tasks
+
+PENDING_PREFERENCES_KEY = "user_preferences_{}"
+# Keep unsaved preferences around if the flush task is lost
+PENDING_PREFERENCES_TIMEOUT = 60 * 60 * 24
 
 
 def get_client_ip(request):
@@ -25,6 +34,8 @@ def get_client_ip(request):
 
 def process_task_result(task):
     """Process task result based on status and format appropriately."""
+    task.progress = None
+
     if task.status == "FAILURE":
         result_json = json.loads(task.result)
         if result_json["exc_type"] == "MediaImportError":
@@ -36,6 +47,11 @@ def process_task_result(task):
     elif task.status == "STARTED":
         task.summary = "This task is currently running."
         task.errors = None
+    elif task.status == "PROGRESS":
+        result_json = json.loads(task.result)
+        task.progress = result_json["progress"]
+        task.summary = f"This task is currently running ({task.progress}% done)."
+        task.errors = None
     elif task.status == "SUCCESS":
         result_json = json.loads(task.result)
         # Split by the error indicator
@@ -95,3 +111,52 @@ def get_next_run_info(periodic_task):
         "frequency": frequency,
         "mode": mode,
     }
+
+
+def buffer_preference(user_id, field_name, value):
+    """Buffer a preference change and schedule a single write for it.
+
+    Returns False when Redis is unavailable and the caller should save it.
+    """
+    key = PENDING_PREFERENCES_KEY.format(user_id)
+    delay = settings.PREFERENCES_FLUSH_DELAY
+
+    try:
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.hset(key, field_name, json.dumps(value))
+        pipeline.expire(key, PENDING_PREFERENCES_TIMEOUT)
+        pipeline.execute()
+
+        if cache.add(f"{key}_flush", 1, delay):
+            tasks.save_preferences.apply_async(args=[user_id], countdown=delay)
+    except RedisError:
+        return False
+
+    return True
+
+
+def get_pending_preferences(user_id):
+    """Return the preference changes of a user that are not saved yet."""
+    try:
+        pending = get_redis_connection("default").hgetall(
+            PENDING_PREFERENCES_KEY.format(user_id),
+        )
+    except RedisError:
+        return {}
+
+    return {field.decode(): json.loads(value) for field, value in pending.items()}
+
+
+def pop_pending_preferences(user_id):
+    """Return and clear the preference changes of a user that are not saved yet."""
+    key = PENDING_PREFERENCES_KEY.format(user_id)
+
+    # changes buffered from now on schedule their own flush
+    cache.delete(f"{key}_flush")
+
+    pipeline = get_redis_connection("default").pipeline()
+    pipeline.hgetall(key)
+    pipeline.delete(key)
+    pending, _ = pipeline.execute()
+
+    return {field.decode(): json.loads(value) for field, value in pending.items()}
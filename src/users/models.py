@@ -408,9 +408,14 @@ class User(AbstractUser):
             field_name: The name of the field to update
             new_value: The new value to set
 
+        Changes are buffered and saved in the background, so that pages
+        reading the preferences from GET parameters don't write to the database.
+
         Returns:
             The value that was set (or the original value if invalid)
         """
+        self.apply_pending_preferences()
+
         # If no new value provided, return current value
         if new_value is None:
             return getattr(self, field_name)
@@ -435,10 +440,20 @@ class User(AbstractUser):
         # Update if different
         if new_value != current_value:
             setattr(self, field_name, new_value)
-            self.save(update_fields=[field_name])
+            if not helpers.buffer_preference(self.id, field_name, new_value):
+                self.save(update_fields=[field_name])
 
         return new_value
 
+    def apply_pending_preferences(self):
+        """Apply the buffered preference changes that are not saved yet."""
+        if getattr(self, "_pending_preferences_applied", False):
+            return
+
+        for field_name, value in helpers.get_pending_preferences(self.id).items():
+            setattr(self, field_name, value)
+        self._pending_preferences_applied = True
+
     def get_enabled_media_types(self):
         """Return a list of enabled media type values based on user preferences."""
         enabled_types = []
@@ -507,6 +522,7 @@ class User(AbstractUser):
                     "status": task.status,
                     "summary": processed_task.summary,
                     "errors": processed_task.errors,
+                    "progress": processed_task.progress,
                 },
             )
 
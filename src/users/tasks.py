@@ -0,0 +1,16 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from users import helpers
+
+
+@shared_task(name="Save user preferences", ignore_result=True)
+def save_preferences(user_id):
+    """Write the buffered preference changes of a user in a single update."""
+    preferences = helpers.pop_pending_preferences(user_id)
+
+    if not preferences:
+        return "No preferences to save"
+
+    get_user_model().objects.filter(id=user_id).update(**preferences)
+    return f"Saved {', '.join(preferences)}"
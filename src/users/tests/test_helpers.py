@@ -87,6 +87,22 @@ class HelpersTest(TestCase):
         self.assertEqual(processed_task.summary, "This task is currently running.")
         self.assertIsNone(processed_task.errors)
 
+    def test_process_task_result_progress(self):
+        """Test processing a running task that reported its progress."""
+        task = Mock()
+        task.status = "PROGRESS"
+        task.result = json.dumps({"progress": 40, "stage": "history"})
+        task.traceback = None
+
+        processed_task = helpers.process_task_result(task)
+
+        self.assertEqual(
+            processed_task.summary,
+            "This task is currently running (40% done).",
+        )
+        self.assertEqual(processed_task.progress, 40)
+        self.assertIsNone(processed_task.errors)
+
     def test_process_task_result_pending(self):
         """Test processing a pending task."""
         task = Mock()
@@ -7,6 +7,7 @@ from django.utils import timezone
 from django_celery_beat.models import CrontabSchedule, PeriodicTask
 from django_celery_results.models import TaskResult
 
+from users import helpers, tasks
 from users.models import (
     HomeSortChoices,
     MediaTypes,
@@ -165,6 +166,32 @@ class UserUpdatePreferenceTests(TestCase):
         self.user.refresh_from_db()
         self.assertEqual(self.user.release_notifications_enabled, False)
 
+    @patch("users.tasks.save_preferences.apply_async")
+    def test_update_preference_buffered(self, mock_apply_async):
+        """Test update_preference buffers the change instead of saving it."""
+        self.user.update_preference("home_sort", HomeSortChoices.TITLE)
+        self.user.update_preference("movie_layout", "table")
+
+        # Only one write is scheduled for both changes
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.kwargs["args"], [self.user.id])
+
+        # Not saved yet, but applied to freshly loaded users
+        user = get_user_model().objects.get(id=self.user.id)
+        self.assertNotEqual(user.home_sort, HomeSortChoices.TITLE)
+        self.assertEqual(
+            user.update_preference("home_sort", None),
+            HomeSortChoices.TITLE,
+        )
+        self.assertEqual(user.movie_layout, "table")
+
+        tasks.save_preferences(self.user.id)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.home_sort, HomeSortChoices.TITLE)
+        self.assertEqual(self.user.movie_layout, "table")
+        self.assertEqual(helpers.get_pending_preferences(self.user.id), {})
+
 
 class UserGetImportTasksTests(TestCase):
     """Tests for the User.get_import_tasks method."""
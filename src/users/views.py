@@ -6,13 +6,13 @@ from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.core.cache import cache
 from django.db import IntegrityError
-from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.defaultfilters import pluralize
 from django.views.decorators.http import require_GET, require_http_methods, require_POST
 from django_celery_beat.models import PeriodicTask
 
 from app.models import Item, MediaTypes
+from app.search import title_contains
 from users.forms import NotificationSettingsForm, PasswordChangeForm, UserUpdateForm
 
 logger = logging.getLogger(__name__)
@@ -116,7 +116,7 @@ def search_items(request):
     # Search for items that match the query
     items = (
         Item.objects.filter(
-            Q(title__icontains=query),
+            title_contains(query),
         )
         .exclude(
             id__in=request.user.notification_excluded_items.values_list(